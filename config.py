@@ -1,20 +1,91 @@
-# DATABASE_URL = "sqlite:///C:/Мария/Учеба/Диплом/miospore_data/db/miospores.db"
-
-# DATABASE_URL = "sqlite:///miospores.db"
-
-import os
-import sys
-
-# Возвращает правильный путь к БД в EXE или из исходного кода
-def get_db_path():
-    if getattr(sys, 'frozen', False):
-        # Если приложение 'заморожено' в EXE
-        base_dir = sys._MEIPASS
-    else:
-        # При обычном запуске из кода
-        # base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        base_dir = ""
-    return os.path.join(base_dir, 'miospores.db')
-
-
-DATABASE_URL = f"sqlite:///{get_db_path()}"
\ No newline at end of file
+# DATABASE_URL = "sqlite:///C:/Мария/Учеба/Диплом/miospore_data/db/miospores.db"
+
+# DATABASE_URL = "sqlite:///miospores.db"
+
+import os
+import sys
+
+# Возвращает правильный путь к БД в EXE или из исходного кода
+def get_db_path():
+    if getattr(sys, 'frozen', False):
+        # Если приложение 'заморожено' в EXE
+        base_dir = sys._MEIPASS
+    else:
+        # При обычном запуске из кода
+        # base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        base_dir = ""
+    return os.path.join(base_dir, 'miospores.db')
+
+
+DATABASE_URL = f"sqlite:///{get_db_path()}"
+
+
+# Каталог для файлов, которые пишет приложение (журналы): в собранном EXE каталог
+# с БД (sys._MEIPASS) временный и может быть недоступен для записи
+def get_user_data_dir():
+    base_dir = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base_dir, "miospores")
+
+# Профиль производительности SQLite (см. PERFORMANCE_PROFILES в db/session.py):
+# "default", "wal" или "performance"
+DB_PERFORMANCE_PROFILE = "performance"
+
+# Держать копию БД в памяти (sqlite :memory:) для всех операций чтения
+USE_MEMORY_REPLICA = False
+
+# Резервные копии: каталог (рядом с БД), сколько последних копий хранить,
+# сколько страниц копировать за один шаг backup API и делать ли копию при запуске
+BACKUP_DIR_NAME = "backups"
+BACKUP_RETENTION = 10
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_ON_STARTUP = True
+
+# Учет SQL-запросов по действиям пользователя (db/instrumentation.py):
+# журнал с ротацией и кнопка панели отладки на панели инструментов.
+# Выключен по умолчанию: курсор со счетчиком строк замедляет каждый запрос
+SQL_INSTRUMENTATION = False
+SQL_LOG_PATH = os.path.join(get_user_data_dir(), "logs", "sql_actions.log")
+SQL_DEBUG_PANEL = False
+
+# Движок расширенного поиска: "bitmap" - битовый индекс признаков в памяти
+# (db/bitmap_index.py), "sql" - запрос filter_genera к БД
+SEARCH_ENGINE = "bitmap"
+
+# Кэш результатов расширенного поиска (db/search_cache.py): сколько фильтров хранить
+# и до скольких найденных родов уточнять результат запросом с их списком id
+SEARCH_CACHE_SIZE = 64
+SEARCH_REFINE_MAX_IDS = 10000
+
+# Определение по частичному совпадению (db/identification.py): веса признаков по полям
+# панели поиска (и "Длина", "Ширина"; по умолчанию 1), допустимое по умолчанию число
+# несовпадений и сколько родов показывать
+IDENTIFICATION_WEIGHTS = {}
+IDENTIFICATION_MAX_MISMATCHES = 2
+IDENTIFICATION_TOP_K = 50
+
+# Матрица сходства родов (db/similarity.py): файл рядом с БД и сколько похожих родов
+# показывать на вкладке описания
+SIMILARITY_PATH = os.path.join(os.path.dirname(get_db_path()), "similarity.npz")
+SIMILAR_GENERA_COUNT = 10
+
+# Главная таблица загружается страницами по столько строк: следующая - при прокрутке
+# к концу таблицы (см. get_genus_table_page в db/search.py)
+GENUS_TABLE_PAGE_SIZE = 200
+
+# Поиск видов: сколько строк передавать в таблицу результатов за раз
+SPECIES_BATCH_SIZE = 500
+
+# Быстрый поиск из строки над таблицей (полнотекстовый индекс, db/fulltext.py):
+# сколько родов показывать, до скольких совпадений ранжировать по BM25
+# и для скольких первых родов показывать фрагмент с совпадением
+QUICK_SEARCH_LIMIT = 200
+QUICK_SEARCH_RANK_MAX = 500
+QUICK_SEARCH_SNIPPETS = 20
+
+# Запрос к главной таблице (текст строки поиска вместе с фильтрами панели, см. run_genus_query
+# в db/search.py) выполняется, когда ввод затих на столько миллисекунд
+QUERY_DEBOUNCE_MS = 150
+
+# Подсказки названий при опечатках (триграммный индекс, db/name_index.py):
+# сколько названий показывать под строкой поиска
+NAME_SUGGESTIONS = 10
@@ -0,0 +1,522 @@
+import copy
+import threading
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import text, bindparam
+
+from .crud import get_genus_table_rows, _stratigraphy_conditions, _location_names
+from .chronostratigraphy import age_bounds, ages_overlap
+from .events import genus_changes
+from .size_index import build_size_index
+
+# Число родов в маске (единичных битов). Не int.bit_count: он есть только с Python 3.10,
+# а сборка для Windows 7 работает на более старом Python
+def count_bits(mask):
+    return bin(mask).count("1")
+
+
+# Значения признаков по родам для каждого поля панели поиска: SQL, возвращающий (id рода, значение).
+# Соответствует соединениям filter_genera для того же поля
+FIELD_SOURCES = {
+    "Инфратурма": """
+        SELECT d.genus_id, i.name FROM diagnosis d JOIN infraturma i ON i.id = d.infraturma_id""",
+    "Характер щели разверзания": """
+        SELECT d.genus_id, c.name FROM diagnosis d JOIN infraturma i ON i.id = d.infraturma_id
+        JOIN character_of_laesurae c ON c.id = i.character_of_laesurae_id""",
+    "Строение экзины": """
+        SELECT d.genus_id, es.name FROM diagnosis d JOIN infraturma i ON i.id = d.infraturma_id
+        JOIN exine_stratification es ON es.id = i.exine_stratification_id""",
+    "Наличие оторочки": """
+        SELECT d.genus_id, et.name FROM diagnosis d JOIN infraturma i ON i.id = d.infraturma_id
+        JOIN exine_type et ON et.id = i.exine_type_id""",
+    "Форма споры": """
+        SELECT d.genus_id, f.name FROM diagnosis d JOIN form f ON f.id = d.form_id""",
+    "Очертание": """
+        SELECT l.diagnosis_id, v.amb FROM spore_diagnosis_amb l JOIN spore_amb v ON v.id = l.amb_id""",
+    "Форма сторон": """
+        SELECT l.diagnosis_id, v.side_shape FROM spore_diagnosis_sides_shape l
+        JOIN spore_sides_shape v ON v.id = l.side_shape_id""",
+    "Форма углов": """
+        SELECT d.genus_id, a.name FROM diagnosis d JOIN angles_shape a ON a.id = d.angles_shape_id""",
+    "Форма щели разверзания": """
+        SELECT l.diagnosis_id, v.laesurae_shape FROM spore_diagnosis_laesurae l
+        JOIN spore_laesurae v ON v.id = l.laesurae_shape_id""",
+    "Форма лучей щели": """
+        SELECT l.diagnosis_id, v.rays_shape FROM spore_diagnosis_laesurae_rays l
+        JOIN spore_laesurae_rays v ON v.id = l.rays_shape_id""",
+    "Выраженность ареа": """
+        SELECT d.genus_id, a.name FROM diagnosis d JOIN area_presence a ON a.id = d.area_presence_id""",
+    "Толщина экзины": """
+        SELECT l.diagnosis_id, t.value FROM spore_diagnosis_exine_thickness l
+        JOIN thickness t ON t.id = l.thickness_id""",
+    "Структура экзины": """
+        SELECT l.diagnosis_id, v.exine_structure FROM spore_diagnosis_exine_structure l
+        JOIN spore_exine_structure v ON v.id = l.exine_structure_id""",
+    "Форма контура споры": """
+        SELECT d.genus_id, o.name FROM diagnosis d JOIN outline o ON o.id = d.outline_id""",
+    "Тип": """
+        SELECT g.diagnosis_id, t.name FROM exine_growth_form g JOIN exine_growth_type t ON t.id = g.type_id""",
+    "Толщина": """
+        SELECT g.diagnosis_id, t.value FROM exine_growth_form g JOIN thickness t ON t.id = g.thickness_id""",
+    "Ширина": """
+        SELECT g.diagnosis_id, w.value FROM exine_growth_form g JOIN width w ON w.id = g.width_id""",
+    "Строение": """
+        SELECT g.diagnosis_id, g.structure FROM exine_growth_form g WHERE g.structure IS NOT NULL""",
+    "Экзоэкзина (толщина)": """
+        SELECT e.diagnosis_id, t.value FROM exoexine e JOIN thickness t ON t.id = e.thickness_id""",
+    "Интэкзина (толщина)": """
+        SELECT e.diagnosis_id, t.value FROM intexine e JOIN thickness t ON t.id = e.thickness_id""",
+}
+
+# Пары (сторона, значение): SQL, возвращающий (id рода, сторона или NULL, значение)
+PAIR_SOURCES = {
+    "Скульптура": """
+        SELECT l.diagnosis_id, s.name, v.sculpture FROM spore_diagnosis_sculpture l
+        JOIN spore_sculpture v ON v.id = l.sculpture_id LEFT JOIN spore_side s ON s.id = l.side_id""",
+    "Орнаментация": """
+        SELECT l.diagnosis_id, s.name, v.ornamentation FROM spore_diagnosis_ornamentation l
+        JOIN spore_ornamentation v ON v.id = l.ornamentation_id LEFT JOIN spore_side s ON s.id = l.side_id""",
+}
+
+# Роды, которые вообще может вернуть filter_genera (есть диагноз с инфратурмой)
+UNIVERSE_SOURCE = """
+    SELECT d.genus_id FROM diagnosis d JOIN infraturma i ON i.id = d.infraturma_id"""
+
+# Периоды и их роды; локации и роды, включая роды вложенных локаций (таблица замыкания)
+PERIODS_SOURCE = "SELECT id, period, epoch, stage, age_base, age_top FROM stratigraphic_periods"
+PERIOD_GENERA_SOURCE = """
+    SELECT gs.genus_id, gs.period_id FROM genus_stratigraphy gs
+    JOIN stratigraphic_periods p ON p.id = gs.period_id"""
+LOCATIONS_SOURCE = "SELECT id, name FROM geographic_location"
+LOCATION_GENERA_SOURCE = """
+    SELECT gg.genus_id, c.ancestor_id FROM genus_geography gg
+    JOIN geographic_location_closure c ON c.descendant_id = gg.geographic_location_id"""
+
+# Сколько измененных родов индекс принимает без перестроения: размеры
+# измененных родов проверяются по одному (SizeIntervalIndex.patched)
+PATCH_LIMIT = 1000
+
+ANY_SIDE = "не указана/любая"
+STRATIGRAPHY = "Стратиграфическое распространение"
+GEOGRAPHY = "Географическое распространение"
+AGE = "Возраст"
+
+
+# Фильтр, который индекс не умеет вычислять: поиск выполняется через SQL
+class UnsupportedFilter(Exception):
+    pass
+
+
+# lower() SQLite: меняет регистр только латинских букв
+def ascii_lower(value):
+    if value is None:
+        return None
+    return "".join(chr(ord(ch) + 32) if "A" <= ch <= "Z" else ch for ch in value)
+
+
+# Те же строки источника только для родов :ids (первый столбец - id рода).
+# SQLite подставляет условие внутрь подзапроса и читает связующие таблицы по индексу
+def _rows_of_genera(sql, columns):
+    names = ", ".join(columns)
+    return text(
+        f"WITH source({names}) AS ({sql}) SELECT {names} FROM source WHERE {columns[0]} IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+
+
+# Собирает битовые маски (int) из позиций родов
+class _MaskBuilder:
+    def __init__(self, size):
+        self.size = size
+        self.bits = defaultdict(lambda: bytearray((size + 7) // 8))
+
+    def add(self, key, position):
+        self.bits[key][position >> 3] |= 1 << (position & 7)
+
+    def masks(self):
+        return {key: int.from_bytes(bits, "little") for key, bits in self.bits.items()}
+
+
+# Битовый индекс признаков: для каждой пары (поле, значение) - маска родов (int),
+# бит i соответствует i-му роду по возрастанию id. Фильтр вычисляется как
+# OR масок внутри поля и AND между полями, результат совпадает с filter_genera
+class CharacterIndex:
+    def __init__(self, rows, field_masks, pair_masks, universe, sizes, periods, period_ages, period_masks,
+                 locations, location_masks):
+        self.rows = rows
+        self.positions = {row[0]: position for position, row in enumerate(rows)}
+        self.field_masks = field_masks
+        self.pair_masks = pair_masks
+        self.universe = universe
+        self.sizes = sizes
+        self.periods = periods
+        self.period_ages = period_ages
+        self.period_masks = period_masks
+        self.locations = locations
+        self.location_masks = location_masks
+        self._option_masks = {}
+        self._described_masks = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    # Маска родов, удовлетворяющих фильтрам (формат фильтров - как у filter_genera)
+    def filter_mask(self, filters):
+        mask = self.universe
+        for label, values in filters.items():
+            mask &= self._field_mask(label, values)
+            if not mask:
+                break
+        return mask
+
+    def _field_mask(self, label, values):
+        if label in self.field_masks:
+            masks = self.field_masks[label]
+            return self._union(masks.get(value, 0) for value in values)
+
+        if label in self.pair_masks:
+            masks = self.pair_masks[label]
+            mask = self.universe
+            for side, value in values:
+                mask &= masks.get((None if side == ANY_SIDE else side, value), 0)
+            return mask
+
+        if label == "Размеры":
+            return self._size_mask(values)
+
+        if label == STRATIGRAPHY:
+            period_ids = self.periods.keys()
+            conditions = _stratigraphy_conditions(values)
+            if conditions:
+                period_ids = [period_id for period_id, parts in self.periods.items()
+                              if any(self._period_matches(parts, condition) for condition in conditions)]
+            return self._union(self.period_masks.get(period_id, 0) for period_id in period_ids)
+
+        if label == AGE:
+            base, top = age_bounds(values)
+            return self._union(self.period_masks.get(period_id, 0)
+                               for period_id, (age_base, age_top) in self.period_ages.items()
+                               if ages_overlap(age_base, age_top, base, top))
+
+        if label == GEOGRAPHY:
+            location_ids = self.locations.keys()
+            names = _location_names(values)
+            if names:
+                names = set(names)
+                location_ids = [location_id for location_id, name in self.locations.items()
+                                if ascii_lower(name) in names]
+            return self._union(self.location_masks.get(location_id, 0) for location_id in location_ids)
+
+        raise UnsupportedFilter(label)
+
+    # Условие по периоду: None - часть не задана, "null" - IS NULL, иначе lower(столбец) = значение
+    @staticmethod
+    def _period_matches(parts, condition):
+        for column_value, expected in zip(parts, condition):
+            if expected is None:
+                continue
+            if expected == "null":
+                if column_value is not None:
+                    return False
+            elif ascii_lower(column_value) != expected:
+                return False
+        return True
+
+    # Размеры проверяются интервальным индексом (db/size_index.py) с учетом режима
+    def _size_mask(self, size_filters):
+        matching = self.sizes.matching_genera(size_filters)
+        return int.from_bytes(np.packbits(matching, bitorder="little").tobytes(), "little")
+
+    @staticmethod
+    def _union(masks):
+        result = 0
+        for mask in masks:
+            result |= mask
+        return result
+
+    # Позиции установленных битов по возрастанию
+    @staticmethod
+    def positions_of(mask):
+        bits = bin(mask)[:1:-1]
+        return [position for position, bit in enumerate(bits) if bit == "1"]
+
+    # Маска одного варианта поля (для стратиграфии и географии вычисляется и запоминается)
+    def _option_mask(self, label, value):
+        if label in self.field_masks:
+            return self.field_masks[label].get(value, 0)
+        key = (label, value)
+        if key not in self._option_masks:
+            self._option_masks[key] = self._field_mask(label, [value])
+        return self._option_masks[key]
+
+    # Маски состояний признака; для скульптуры и орнаментации - значения без учета стороны
+    def state_masks(self, label):
+        if label in self.field_masks:
+            return list(self.field_masks[label].values())
+        return [mask for (side, _), mask in self.pair_masks[label].items() if side is None]
+
+    # Роды, у которых признак описан (есть хоть одно состояние)
+    def described_mask(self, label):
+        if label not in self._described_masks:
+            self._described_masks[label] = self._union(self.state_masks(label))
+        return self._described_masks[label]
+
+    # Сколько родов дал бы каждый вариант каждого поля при текущих фильтрах.
+    # field_values: {поле: [варианты]} - поля с условием OR внутри поля: вариант
+    # считается по фильтрам без этого поля (выбор еще одного варианта расширяет результат).
+    # pair_values: {"Скульптура"/"Орнаментация": ([стороны], [значения])} - каждая пара
+    # добавляется к фильтрам через AND, поэтому считается по полному результату.
+    # Возвращает ({поле: {вариант: число}}, {поле пар: {(сторона, значение): число}})
+    def facet_counts(self, filters, field_values, pair_values=None):
+        active = [(label, self._field_mask(label, values)) for label, values in filters.items()]
+
+        # Пересечение всех полей, кроме i-го: префиксы и суффиксы пересечений
+        prefix = [self.universe]
+        for _, mask in active:
+            prefix.append(prefix[-1] & mask)
+        suffix = [self.universe]
+        for _, mask in reversed(active):
+            suffix.append(suffix[-1] & mask)
+        suffix.reverse()
+        full = prefix[-1]
+        excluding = {label: prefix[i] & suffix[i + 1] for i, (label, _) in enumerate(active)}
+
+        counts = {}
+        for label, values in field_values.items():
+            base = excluding.get(label, full)
+            counts[label] = {value: count_bits(base & self._option_mask(label, value)) for value in values}
+
+        pair_counts = {}
+        for label, (sides, values) in (pair_values or {}).items():
+            masks = self.pair_masks.get(label, {})
+            pair_counts[label] = {
+                (side, value): count_bits(full & masks.get((None if side == ANY_SIDE else side, value), 0))
+                for side in sides for value in values
+            }
+        return counts, pair_counts
+
+    # Маска родов с указанными id (id, которых нет в индексе, пропускаются)
+    def mask_of(self, genus_ids):
+        builder = _MaskBuilder(len(self.rows))
+        for genus_id in genus_ids:
+            position = self.positions.get(genus_id)
+            if position is not None:
+                builder.add(True, position)
+        return builder.masks().get(True, 0)
+
+    # within_ids - искать только среди этих родов
+    def filter_rows(self, filters, within_ids=None):
+        mask = self.filter_mask(filters)
+        if within_ids is not None:
+            mask &= self.mask_of(within_ids)
+        return [self.rows[position] for position in self.positions_of(mask)]
+
+    def filter_ids(self, filters):
+        return [self.rows[position][0] for position in self.positions_of(self.filter_mask(filters))]
+
+    # Копия индекса с обновленными родами genus_ids (см. _apply_changes) или None,
+    # если индекс нужно построить заново. Сам индекс не меняется: им может
+    # пользоваться поиск в другом потоке
+    def with_changes(self, session, genus_ids):
+        if len(self.sizes.patched) + len(genus_ids) > PATCH_LIMIT:
+            return None
+        index = copy.copy(self)
+        index.rows = list(self.rows)
+        index.positions = dict(self.positions)
+        index.field_masks = {label: dict(masks) for label, masks in self.field_masks.items()}
+        index.pair_masks = {label: dict(masks) for label, masks in self.pair_masks.items()}
+        index.period_masks = dict(self.period_masks)
+        index.location_masks = dict(self.location_masks)
+        index._option_masks = {}
+        index._described_masks = {}
+        return index if index._apply_changes(session, sorted(genus_ids)) else None
+
+    # Биты измененных родов снимаются во всех масках и ставятся заново по их строкам в БД.
+    # Новый род получает следующую позицию: порядок позиций по id сохраняется, только
+    # если его id больше всех (иначе - False). Позиция удаленного рода остается пустой
+    def _apply_changes(self, session, genus_ids):
+        rows = {row[0]: tuple(row) for row in get_genus_table_rows(session, genus_ids)}
+        last_id = self.rows[-1][0] if self.rows else 0
+        for genus_id in genus_ids:
+            if genus_id in rows and genus_id not in self.positions:
+                if genus_id < last_id:
+                    return False
+                self.positions[genus_id] = len(self.rows)
+                self.rows.append(rows[genus_id])
+                last_id = genus_id
+            elif genus_id in rows:
+                self.rows[self.positions[genus_id]] = rows[genus_id]
+
+        positions = {genus_id: self.positions[genus_id] for genus_id in genus_ids if genus_id in self.positions}
+        if not positions:
+            return True
+        builder = _MaskBuilder(len(self.rows))
+        for position in positions.values():
+            builder.add(True, position)
+        changed = builder.masks()[True]
+        keep = ~changed
+        for masks in [*self.field_masks.values(), *self.pair_masks.values(), self.period_masks, self.location_masks]:
+            for key, mask in masks.items():
+                if mask & changed:
+                    masks[key] = mask & keep
+        self.universe &= keep
+
+        def execute(sql, *columns):
+            return session.execute(_rows_of_genera(sql, columns), {"ids": list(positions)}).all()
+
+        def add(masks, key, genus_id):
+            masks[key] = masks.get(key, 0) | (1 << positions[genus_id])
+
+        for label, sql in FIELD_SOURCES.items():
+            for genus_id, value in execute(sql, "genus_id", "value"):
+                add(self.field_masks[label], value, genus_id)
+        for label, sql in PAIR_SOURCES.items():
+            for genus_id, side, value in execute(sql, "genus_id", "side", "value"):
+                add(self.pair_masks[label], (None, value), genus_id)
+                if side is not None:
+                    add(self.pair_masks[label], (side, value), genus_id)
+        for (genus_id,) in execute(UNIVERSE_SOURCE, "genus_id"):
+            self.universe |= 1 << positions[genus_id]
+
+        # Справочники периодов и локаций невелики и могли пополниться: читаются целиком
+        self.periods, self.period_ages = _read_periods(session)
+        for genus_id, period_id in execute(PERIOD_GENERA_SOURCE, "genus_id", "period_id"):
+            add(self.period_masks, period_id, genus_id)
+        self.locations = dict(session.execute(text(LOCATIONS_SOURCE)).all())
+        for genus_id, location_id in execute(LOCATION_GENERA_SOURCE, "genus_id", "location_id"):
+            add(self.location_masks, location_id, genus_id)
+
+        self.sizes = self.sizes.with_changes(session, positions, len(self.rows))
+        return True
+
+
+# Периоды: ({id: (период, отдел, ярус)}, {id: (начало, конец) в млн лет})
+def _read_periods(session):
+    periods = {}
+    period_ages = {}
+    for period_id, period, epoch, stage, age_base, age_top in session.execute(text(PERIODS_SOURCE)):
+        periods[period_id] = (period, epoch, stage)
+        period_ages[period_id] = (age_base, age_top)
+    return periods, period_ages
+
+
+# Строит индекс по текущему содержимому БД
+def build_character_index(session):
+    rows = [tuple(row) for row in get_genus_table_rows(session)]
+    positions = {row[0]: position for position, row in enumerate(rows)}
+
+    def execute(sql):
+        return session.execute(text(sql)).all()
+
+    def position_of(genus_id):
+        return positions.get(genus_id)
+
+    field_masks = {}
+    for label, sql in FIELD_SOURCES.items():
+        builder = _MaskBuilder(len(rows))
+        for genus_id, value in execute(sql):
+            position = position_of(genus_id)
+            if position is not None:
+                builder.add(value, position)
+        field_masks[label] = builder.masks()
+
+    pair_masks = {}
+    for label, sql in PAIR_SOURCES.items():
+        builder = _MaskBuilder(len(rows))
+        for genus_id, side, value in execute(sql):
+            position = position_of(genus_id)
+            if position is None:
+                continue
+            builder.add((None, value), position)
+            if side is not None:
+                builder.add((side, value), position)
+        pair_masks[label] = builder.masks()
+
+    universe_builder = _MaskBuilder(len(rows))
+    for (genus_id,) in execute(UNIVERSE_SOURCE):
+        position = position_of(genus_id)
+        if position is not None:
+            universe_builder.add(True, position)
+    universe = universe_builder.masks().get(True, 0)
+
+    sizes = build_size_index(session, positions)
+
+    periods, period_ages = _read_periods(session)
+    period_builder = _MaskBuilder(len(rows))
+    for genus_id, period_id in execute(PERIOD_GENERA_SOURCE):
+        position = position_of(genus_id)
+        if position is not None:
+            period_builder.add(period_id, position)
+
+    locations = dict(execute(LOCATIONS_SOURCE))
+    location_builder = _MaskBuilder(len(rows))
+    # Маска локации включает роды всех вложенных в нее локаций (таблица замыкания)
+    for genus_id, location_id in execute(LOCATION_GENERA_SOURCE):
+        position = position_of(genus_id)
+        if position is not None:
+            location_builder.add(location_id, position)
+
+    return CharacterIndex(rows, field_masks, pair_masks, universe, sizes, periods, period_ages,
+                          period_builder.masks(), locations, location_builder.masks())
+
+
+# Хранит актуальный индекс. Измененные роды приходят с шиной изменений (db/events.py)
+# и применяются при следующем поиске: индекс с методом with_changes обновляется
+# по этим родам, остальные (и при изменениях, не отнесенных к родам) строятся заново.
+# build(session) - функция построения (по умолчанию build_character_index)
+class CharacterIndexHolder:
+    def __init__(self, build=build_character_index):
+        self._build = build
+        self._index = None
+        self._stale = True
+        self._lock = threading.Lock()
+        # Отдельная блокировка: фиксация записи не ждет построения индекса
+        self._changed = set()
+        self._changed_lock = threading.Lock()
+
+    def invalidate(self):
+        self._stale = True
+
+    def mark_changed(self, genus_ids):
+        with self._changed_lock:
+            self._changed.update(genus_ids)
+
+    def on_changes(self, changes):
+        if changes.complete:
+            self.mark_changed(changes.genus_ids)
+        else:
+            self.invalidate()
+
+    def _take_changed(self):
+        with self._changed_lock:
+            changed, self._changed = self._changed, set()
+        return changed
+
+    def get(self, session):
+        with self._lock:
+            if self._stale or self._index is None:
+                # Запись, зафиксированная во время построения, снова отметит свои роды
+                self._stale = False
+                self._take_changed()
+                try:
+                    self._index = self._build(session)
+                except Exception:
+                    self._stale = True
+                    raise
+            else:
+                changed = self._take_changed()
+                if changed:
+                    patch = getattr(self._index, "with_changes", None)
+                    try:
+                        index = patch(session, changed) if patch is not None else None
+                        self._index = index if index is not None else self._build(session)
+                    except Exception:
+                        self._stale = True
+                        raise
+            return self._index
+
+    def attach(self, bus=genus_changes):
+        bus.subscribe(self.on_changes)
+
+
+character_index = CharacterIndexHolder()
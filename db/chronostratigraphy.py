@@ -0,0 +1,185 @@
+from sqlalchemy import text
+
+# Числовой возраст стратиграфических подразделений: (нижняя граница, верхняя граница)
+# в млн лет назад, нижняя граница древнее. Глобальные подразделения - по Международной
+# стратиграфической шкале, региональные (западноевропейские намюр, вестфал, стефан, отэн
+# и ярусы перми Русской платформы) - по их приблизительной корреляции с ней
+PERIOD_AGES = {
+    "кембрий": (538.8, 485.4),
+    "ордовик": (485.4, 443.8),
+    "силур": (443.8, 419.2),
+    "девон": (419.2, 358.9),
+    "карбон": (358.9, 298.9),
+    "пермь": (298.9, 251.902),
+    "триас": (251.902, 201.4),
+    "юра": (201.4, 145.0),
+    "мел": (145.0, 66.0),
+    "палеоген": (66.0, 23.03),
+    "неоген": (23.03, 2.58),
+    "четвертичный": (2.58, 0.0),
+}
+
+# Отделы по периодам. Карбон и пермь - по общей шкале России
+# (трехчленный карбон, двучленная пермь: верхняя - от уфимского яруса до триаса,
+# как в описаниях родов; среднего отдела перми нет)
+EPOCH_AGES = {
+    ("кембрий", "нижний"): (538.8, 509.0),
+    ("кембрий", "средний"): (509.0, 497.0),
+    ("кембрий", "верхний"): (497.0, 485.4),
+    ("ордовик", "нижний"): (485.4, 470.0),
+    ("ордовик", "средний"): (470.0, 458.4),
+    ("ордовик", "верхний"): (458.4, 443.8),
+    ("силур", "нижний"): (443.8, 427.4),
+    ("силур", "верхний"): (427.4, 419.2),
+    ("девон", "нижний"): (419.2, 393.3),
+    ("девон", "средний"): (393.3, 382.7),
+    ("девон", "верхний"): (382.7, 358.9),
+    ("карбон", "нижний"): (358.9, 323.2),
+    ("карбон", "средний"): (323.2, 307.0),
+    ("карбон", "верхний"): (307.0, 298.9),
+    ("пермь", "нижний"): (298.9, 273.01),
+    ("пермь", "верхний"): (273.01, 251.902),
+    ("триас", "нижний"): (251.902, 247.2),
+    ("триас", "средний"): (247.2, 237.0),
+    ("триас", "верхний"): (237.0, 201.4),
+    ("юра", "нижний"): (201.4, 174.7),
+    ("юра", "средний"): (174.7, 161.5),
+    ("юра", "верхний"): (161.5, 145.0),
+    ("мел", "нижний"): (145.0, 100.5),
+    ("мел", "верхний"): (100.5, 66.0),
+}
+
+# Отделы и подотделы со своим названием: определяются без учета периода
+NAMED_EPOCH_AGES = {
+    "миссисипий": (358.9, 323.2),
+    "пенсильваний": (323.2, 298.9),
+    "палеоцен": (66.0, 56.0),
+    "эоцен": (56.0, 33.9),
+    "олигоцен": (33.9, 23.03),
+    "миоцен": (23.03, 5.333),
+    "плиоцен": (5.333, 2.58),
+    "плейстоцен": (2.58, 0.0117),
+    "голоцен": (0.0117, 0.0),
+}
+
+# Части отделов с собственным названием ("миссисипий верхний")
+SUBEPOCH_AGES = {
+    ("миссисипий", "нижний"): (358.9, 346.7),
+    ("миссисипий", "средний"): (346.7, 330.9),
+    ("миссисипий", "верхний"): (330.9, 323.2),
+    ("пенсильваний", "нижний"): (323.2, 315.2),
+    ("пенсильваний", "средний"): (315.2, 307.0),
+    ("пенсильваний", "верхний"): (307.0, 298.9),
+}
+
+STAGE_AGES = {
+    # Девон
+    "жединский": (419.2, 410.8),
+    "зигенский": (410.8, 407.6),
+    "пражский": (410.8, 407.6),
+    "эмсский": (407.6, 393.3),
+    "эйфельский": (393.3, 387.7),
+    "живетский": (387.7, 382.7),
+    "франский": (382.7, 372.2),
+    "фаменский": (372.2, 358.9),
+    # Карбон
+    "турнейский": (358.9, 346.7),
+    "визейский": (346.7, 330.9),
+    "серпуховский": (330.9, 323.2),
+    "башкирский": (323.2, 315.2),
+    "московский": (315.2, 307.0),
+    "касимовский": (307.0, 303.7),
+    "гжельский": (303.7, 298.9),
+    "намюр": (330.9, 315.2),
+    "намюрский": (330.9, 315.2),
+    "намюр a": (330.9, 323.2),
+    "намюр b": (323.2, 319.0),
+    "намюр c": (319.0, 315.2),
+    "вестфал": (315.2, 305.5),
+    "вестфальский": (315.2, 305.5),
+    "вестфал a": (315.2, 313.0),
+    "вестфал b": (313.0, 310.5),
+    "вестфал c": (310.5, 308.0),
+    "вестфал d": (308.0, 305.5),
+    "стефан": (305.5, 298.9),
+    "стефанский": (305.5, 298.9),
+    "стефан a": (305.5, 303.7),
+    "стефан b": (303.7, 301.3),
+    "стефан c": (301.3, 298.9),
+    # Пермь
+    "ассельский": (298.9, 293.52),
+    "сакмарский": (293.52, 290.51),
+    "артинский": (290.51, 283.5),
+    "кунгурский": (283.5, 273.01),
+    "отэн": (298.9, 290.1),
+    "уфимский": (273.01, 268.8),
+    "казанский": (268.8, 265.1),
+    "уржумский": (265.1, 259.51),
+    "северодвинский": (259.51, 255.0),
+    "вятский": (255.0, 251.902),
+    "татарский": (265.1, 251.902),
+}
+
+# Названия отделов записаны в БД в роде периода ("пермь нижняя", "юра верхняя")
+_EPOCH_FORMS = {"нижняя": "нижний", "средняя": "средний", "верхняя": "верхний"}
+
+AGE_INDEX = ("ix_stratigraphic_periods_age", "stratigraphic_periods", ["age_base", "age_top"])
+
+
+def _normalize(name):
+    if not name:
+        return None
+    name = " ".join(name.lower().split())
+    return _EPOCH_FORMS.get(name, name)
+
+
+# Возраст периода (период, отдел, ярус): берется самое дробное известное подразделение.
+# Возвращает (нижняя граница, верхняя граница) или (None, None)
+def period_ages(period, epoch=None, stage=None):
+    period, epoch, stage = _normalize(period), _normalize(epoch), _normalize(stage)
+    ages = PERIOD_AGES.get(period)
+    if epoch:
+        ages = NAMED_EPOCH_AGES.get(epoch) or EPOCH_AGES.get((period, epoch)) or ages
+    if stage:
+        ages = SUBEPOCH_AGES.get((epoch, stage)) or STAGE_AGES.get(stage) or ages
+    return ages or (None, None)
+
+
+# Пересекается ли интервал периода с интервалом фильтра "Возраст" (см. age_bounds).
+# Общая граница не считается пересечением: турнейский ярус не попадает в "визейский - московский"
+def ages_overlap(age_base, age_top, base, top):
+    if age_base is None or age_top is None:
+        return False
+    return (top is None or age_base > top) and (base is None or age_top < base)
+
+
+# Границы фильтра "Возраст": {"base": древняя граница, "top": молодая граница}, обе необязательны
+def age_bounds(age_filter):
+    return age_filter.get("base"), age_filter.get("top")
+
+
+# Заполняет возраст нового или измененного периода при записи через ORM
+# (событие before_insert/before_update модели StratigraphicPeriod)
+def assign_period_ages(mapper, connection, target):
+    target.age_base, target.age_top = period_ages(target.period, target.epoch, target.stage)
+
+
+# Добавляет в справочник периодов столбцы возраста, заполняет их и индексирует
+def add_period_ages(connection):
+    existing = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(stratigraphic_periods)")}
+    for column in ("age_base", "age_top"):
+        if column not in existing:
+            connection.execute(text(f"ALTER TABLE stratigraphic_periods ADD COLUMN {column} REAL"))
+
+    rows = connection.execute(text("SELECT id, period, epoch, stage FROM stratigraphic_periods")).all()
+    updates = []
+    for period_id, period, epoch, stage in rows:
+        age_base, age_top = period_ages(period, epoch, stage)
+        updates.append({"id": period_id, "age_base": age_base, "age_top": age_top})
+    if updates:
+        connection.execute(text(
+            "UPDATE stratigraphic_periods SET age_base = :age_base, age_top = :age_top WHERE id = :id"
+        ), updates)
+
+    index_name, table_name, columns = AGE_INDEX
+    connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})"))
@@ -1,568 +1,883 @@
-from operator import and_, or_
-from typing import Dict, List
-
-from sqlalchemy.orm import Session, aliased, selectinload
-from sqlalchemy import select, func
-from .models import Genus, Infraturma, CharacterOfLaesurae, ExineStratification, ExineType, Diagnosis, AreaPresence, \
-    Outline, AnglesShape, SporeSidesShape, SporeLaesurae, SporeLaesuraeRays, Thickness, SporeExineStructure, SporeAmb, \
-    ExineGrowthForm, Width, ExineGrowthType, SporeSide, SporeSculpture, SporeOrnamentation, \
-    SporeDiagnosisExineThickness, SporeDiagnosisSculpture, SporeDiagnosisOrnamentation, Species, GeographicLocation, \
-    Exoexine, Intexine, GenusStratigraphy, StratigraphicPeriod, GenusGeography, Form
-
-def get_all_genera(session):
-    stmt = select(Genus).options(
-        selectinload(Genus.synonyms),
-        selectinload(Genus.diagnosis)
-            .selectinload(Diagnosis.infraturma)
-    )
-
-    result = session.execute(stmt)
-    return result.scalars().all()
-
-
-def get_genus_by_name(session, genus_name):
-    return session.query(Genus).filter(Genus.name == genus_name).first()
-
-def get_genus_data(session, genus_name):
-    genus = get_genus_by_name(session, genus_name)
-    if not genus:
-        return None
-
-    return {
-        'name': genus.name,
-        'full_name': genus.full_name,
-        'type_species': genus.type_species
-    }
-
-
-def get_full_genus_data(session, genus_name):
-    genus = session.query(Genus).options(
-        selectinload(Genus.synonyms),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.infraturma),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.form),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.angles_shape),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.area_presence),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.outline),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exoexine),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.intexine),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.amb),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.sides_shape),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.laesurae),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.laesurae_rays),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_structure),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.sculpture).selectinload(SporeDiagnosisSculpture.side),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.sculpture).selectinload(SporeDiagnosisSculpture.sculpture),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.ornamentation).selectinload(SporeDiagnosisOrnamentation.side),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.ornamentation).selectinload(SporeDiagnosisOrnamentation.ornamentation),
-        selectinload(Genus.geographic_locations).joinedload(GeographicLocation.parent),
-        selectinload(Genus.stratigraphic_periods),
-        selectinload(Genus.species).options(
-            selectinload(Species.geographic_locations).joinedload(GeographicLocation.parent),
-            selectinload(Species.stratigraphic_periods)
-        )
-    ).filter(Genus.name == genus_name).first()
-
-    if not genus:
-        return None
-
-    return genus
-
-
-def get_all_options(session) -> Dict[str, List[str]]:
-    queries = [
-        ("infraturma", select(Infraturma.name)),
-        ("character_of_laesurae", select(CharacterOfLaesurae.name)),
-        ("exine_stratification", select(ExineStratification.name)),
-        ("exine_type", select(ExineType.name)),
-        ("form", select(Form.name)),
-        ("amb", select(SporeAmb.amb)),
-        ("sides_shape", select(SporeSidesShape.side_shape)),
-        ("angles_shape", select(AnglesShape.name)),
-        ("laesurae_shape", select(SporeLaesurae.laesurae_shape)),
-        ("laesurae_rays", select(SporeLaesuraeRays.rays_shape)),
-        ("area_presence", select(AreaPresence.name)),
-        ("exine_structure", select(SporeExineStructure.exine_structure)),
-        ("outline", select(Outline.name)),
-        ("exine_growth_type", select(ExineGrowthType.name)),
-        ("exine_growth_structure", select(ExineGrowthForm.structure).distinct()),
-        ("sculpture_values", select(SporeSculpture.sculpture)),
-        ("ornamentation_values", select(SporeOrnamentation.ornamentation))
-    ]
-
-    # Для запросов с join создаем отдельные подзапросы
-    join_queries = [
-        ("exine_thickness",
-         select(Thickness.value)
-         .join(Thickness.spore_diagnosis_exine_thickness)
-         .distinct()
-         .order_by(Thickness.value)),
-
-        ("exine_growth_thickness",
-         select(Thickness.value)
-         .join(Thickness.exine_growth_form)
-         .distinct()
-         .order_by(Thickness.value)),
-
-        ("exine_growth_width", select(Width.value)),
-
-        ("intexine_thickness",
-         select(Thickness.value)
-         .join(Thickness.intexine)
-         .distinct()
-         .order_by(Thickness.value)),
-
-        ("exoexine_thickness",
-         select(Thickness.value)
-         .join(Thickness.exoexine)
-         .distinct()
-         .order_by(Thickness.value)),
-
-        ("sculpture_sides",
-         select(SporeSide.name)
-         .join(SporeSide.sculpture)
-         .distinct()
-         .order_by(SporeSide.name)),
-
-        ("ornamentation_sides",
-         select(SporeSide.name)
-         .join(SporeSide.ornamentation)
-         .distinct()
-         .order_by(SporeSide.name))
-    ]
-
-    results = {}
-
-    # Выполняем простые запросы
-    for name, stmt in queries:
-        try:
-            result = session.execute(stmt)
-            results[name] = [row[0] for row in result.all()]
-        except Exception as e:
-            print(f"Error loading {name}: {e}")
-            results[name] = []
-
-    # Выполняем запросы с join
-    for name, stmt in join_queries:
-        try:
-            result = session.execute(stmt)
-            results[name] = [row[0] for row in result.all()]
-        except Exception as e:
-            print(f"Error loading {name}: {e}")
-            results[name] = []
-
-    # Стратиграфическое распространение родов
-    try:
-        stmt = (
-            select(
-                StratigraphicPeriod.period,
-                StratigraphicPeriod.epoch,
-                StratigraphicPeriod.stage
-            )
-            .join(GenusStratigraphy, StratigraphicPeriod.id == GenusStratigraphy.period_id)
-            .distinct()
-            .order_by(StratigraphicPeriod.period)
-        )
-
-        result = session.execute(stmt)
-        results["stratigraphic_periods"] = []
-
-        for period, epoch, stage in result:
-            parts = []
-            if period:
-                parts.append(period)
-            if epoch:
-                parts.append(epoch)
-            if stage:
-                if parts:
-                    parts[-1] = parts[-1] + f", {stage}"
-                else:
-                    parts.append(stage)
-
-            formatted = " ".join(parts)
-            if formatted:
-                results["stratigraphic_periods"].append(formatted)
-
-    except Exception as e:
-        print(f"Error loading stratigraphic periods: {e}")
-        results["stratigraphic_periods"] = []
-
-    # Стратиграфическое распространение все
-    try:
-        stmt = (
-            select(
-                StratigraphicPeriod.period,
-                StratigraphicPeriod.epoch,
-                StratigraphicPeriod.stage
-            )
-            .distinct()
-            .order_by(StratigraphicPeriod.period, StratigraphicPeriod.epoch)
-        )
-
-        result = session.execute(stmt)
-        results["stratigraphic_periods_all"] = []
-
-        for period, epoch, stage in result:
-            parts = []
-            if period:
-                parts.append(period)
-            if epoch:
-                parts.append(epoch)
-            if stage:
-                if parts:
-                    parts[-1] = parts[-1] + f", {stage}"
-                else:
-                    parts.append(stage)
-
-            formatted = " ".join(parts)
-            if formatted:
-                results["stratigraphic_periods_all"].append(formatted)
-
-    except Exception as e:
-        print(f"Error loading stratigraphic periods: {e}")
-        results["stratigraphic_periods_all"] = []
-
-    # Географическое распространение у родов
-    try:
-        parent = aliased(GeographicLocation)
-        stmt = (
-            select(
-                func.coalesce(parent.name + ': ', '') + GeographicLocation.name
-            )
-            .select_from(GeographicLocation)
-            .join(GenusGeography)
-            .outerjoin(parent, GeographicLocation.parent)
-            .distinct()
-            .order_by(func.coalesce(parent.name, ''), GeographicLocation.name)
-        )
-        result = session.execute(stmt)
-        results["geographic_locations"] = [row[0] for row in result.all()]
-
-    except Exception as e:
-        print(f"Error loading geographic locations: {e}")
-        results["geographic_locations"] = []
-
-
-
-    # Географическое распространение все
-    try:
-        parent = aliased(GeographicLocation)
-        stmt = (
-            select(
-                func.coalesce(parent.name + ': ', '') + GeographicLocation.name
-            )
-            .select_from(GeographicLocation)
-            .outerjoin(parent, GeographicLocation.parent)
-            .distinct()
-            .order_by(func.coalesce(parent.name, ''), GeographicLocation.name)
-        )
-        result = session.execute(stmt)
-        results["geographic_locations_all"] = [row[0] for row in result.all()]
-
-    except Exception as e:
-        print(f"Error loading geographic locations: {e}")
-        results["geographic_locations_all"] = []
-
-
-    return results
-
-def filter_genera(session, filters):
-    stmt = select(Genus).join(Genus.diagnosis).join(Diagnosis.infraturma)
-
-    exine_growth_thickness = aliased(Thickness)
-    exoexine_thickness = aliased(Thickness)
-    intexine_thickness = aliased(Thickness)
-
-    if "Инфратурма" in filters:
-        stmt = stmt.where(Infraturma.name.in_(filters["Инфратурма"]))
-
-    if "Характер щели разверзания" in filters:
-        stmt = stmt.join(Infraturma.character_of_laesurae).where(
-            CharacterOfLaesurae.name.in_(filters["Характер щели разверзания"])
-        )
-
-    if "Строение экзины" in filters:
-        stmt = stmt.join(Infraturma.exine_stratification).where(
-            ExineStratification.name.in_(filters["Строение экзины"])
-        )
-
-    if "Наличие оторочки" in filters:
-        stmt = stmt.join(Infraturma.exine_type).where(
-            ExineType.name.in_(filters["Наличие оторочки"])
-        )
-
-    if "Форма споры" in filters:
-        stmt = stmt.join(Diagnosis.form).where(
-            Form.name.in_(filters["Форма споры"])
-        )
-
-    if "Очертание" in filters:
-        stmt = stmt.join(Diagnosis.amb).where(
-            SporeAmb.amb.in_(filters["Очертание"])
-        )
-
-    if "Форма сторон" in filters:
-        stmt = stmt.join(Diagnosis.sides_shape).where(
-            SporeSidesShape.side_shape.in_(filters["Форма сторон"])
-        )
-
-    if "Форма углов" in filters:
-        stmt = stmt.join(Diagnosis.angles_shape).where(
-           AnglesShape.name.in_(filters["Форма углов"])
-        )
-
-    if "Форма щели разверзания" in filters:
-        stmt = stmt.join(Diagnosis.laesurae).where(
-            SporeLaesurae.laesurae_shape.in_(filters["Форма щели разверзания"])
-        )
-
-    if "Форма лучей щели" in filters:
-        stmt = stmt.join(Diagnosis.laesurae_rays).where(
-            SporeLaesuraeRays.rays_shape.in_(filters["Форма лучей щели"])
-        )
-
-    if "Выраженность ареа" in filters:
-        stmt = stmt.join(Diagnosis.area_presence).where(
-            AreaPresence.name.in_(filters["Выраженность ареа"])
-        )
-
-    if "Толщина экзины" in filters:
-        stmt = stmt.join(Diagnosis.exine_thickness).join(SporeDiagnosisExineThickness.thickness).where(
-            Thickness.value.in_(filters["Толщина экзины"])
-        )
-
-    if "Структура экзины" in filters:
-        stmt = stmt.join(Diagnosis.exine_structure).where(
-            SporeExineStructure.exine_structure.in_(filters["Структура экзины"])
-        )
-
-    if "Форма контура споры" in filters:
-        stmt = stmt.join(Diagnosis.outline).where(
-            Outline.name.in_(filters["Форма контура споры"])
-        )
-
-    if "Тип" in filters:
-        stmt = stmt.join(Diagnosis.exine_growth_form).join(ExineGrowthForm.exine_growth_type).where(
-            ExineGrowthType.name.in_(filters["Тип"])
-        )
-
-    if "Толщина" in filters:
-        stmt = stmt.join(Diagnosis.exine_growth_form).join(ExineGrowthForm.thickness.of_type(exine_growth_thickness)).where(
-            exine_growth_thickness.value.in_(filters["Толщина"])
-        )
-
-    if "Ширина" in filters:
-        stmt = stmt.join(Diagnosis.exine_growth_form).join(ExineGrowthForm.width).where(
-            Width.value.in_(filters["Ширина"])
-        )
-
-    if "Строение" in filters:
-        stmt = stmt.join(Diagnosis.exine_growth_form).where(
-            ExineGrowthForm.structure.in_(filters["Строение"])
-        )
-
-    if "Экзоэкзина (толщина)" in filters:
-        stmt = stmt.join(Diagnosis.exoexine).join(Exoexine.thickness.of_type(exoexine_thickness)).where(
-            exoexine_thickness.value.in_(filters["Экзоэкзина (толщина)"])
-        )
-
-    if "Интэкзина (толщина)" in filters:
-        stmt = stmt.join(Diagnosis.intexine).join(Intexine.thickness.of_type(intexine_thickness)).where(
-            intexine_thickness.value.in_(filters["Интэкзина (толщина)"])
-        )
-
-
-    if "Скульптура" in filters:
-        for side, sculpture_value in filters["Скульптура"]:
-            sculpture_condition = SporeDiagnosisSculpture.sculpture.has(
-                SporeSculpture.sculpture == sculpture_value
-            )
-
-            if side != "не указана/любая":
-                sculpture_condition = and_(
-                    SporeDiagnosisSculpture.side.has(SporeSide.name == side),
-                    sculpture_condition
-                )
-
-            subq = select(1).where(
-                SporeDiagnosisSculpture.diagnosis_id == Diagnosis.genus_id,
-                sculpture_condition
-            ).exists()
-
-            stmt = stmt.where(subq)
-
-    if "Орнаментация" in filters:
-        for side, ornamentation_value in filters["Орнаментация"]:
-            # Базовое условие по значению
-            ornamentation_condition = SporeDiagnosisOrnamentation.ornamentation.has(
-                SporeOrnamentation.ornamentation == ornamentation_value
-            )
-
-            if side != "не указана/любая":  # Явная проверка на специальное значение
-                ornamentation_condition = and_(
-                    SporeDiagnosisOrnamentation.side.has(SporeSide.name == side),
-                    ornamentation_condition
-                )
-            # Иначе - оставляем только условие по значению (ищем в любой стороне)
-
-            subq = select(1).where(
-                SporeDiagnosisOrnamentation.diagnosis_id == Diagnosis.genus_id,
-                ornamentation_condition
-            ).exists()
-
-            stmt = stmt.where(subq)
-
-    if "Размеры" in filters:
-        size_filters = filters["Размеры"]
-
-        if "length_min" in size_filters:
-            stmt = stmt.where(Genus.length_min >= size_filters["length_min"])
-        if "length_max" in size_filters:
-            stmt = stmt.where(Genus.length_max <= size_filters["length_max"])
-
-        if "width_min" in size_filters:
-            stmt = stmt.where(Genus.width_min >= size_filters["width_min"])
-        if "width_max" in size_filters:
-            stmt = stmt.where(Genus.width_max <= size_filters["width_max"])
-
-    if "Стратиграфическое распространение" in filters:
-        stmt = stmt.join(Genus.stratigraphic_periods)
-        strat_filters = []
-
-        for value in filters["Стратиграфическое распространение"]:
-            value = value.strip()
-            if not value:
-                continue
-
-            main_part, *stage_parts = [p.strip() for p in value.split(",", 1)]
-            stage = stage_parts[0] if stage_parts else None
-
-            period_parts = main_part.split()
-            period = period_parts[0] if period_parts else None
-            epoch = " ".join(period_parts[1:]) if len(period_parts) > 1 else None
-
-            conds = []
-
-            if period:
-                conds.append(StratigraphicPeriod.period.is_(None) if period.lower() == "null"
-                             else func.lower(StratigraphicPeriod.period) == period.lower())
-
-            if epoch:
-                conds.append(StratigraphicPeriod.epoch.is_(None) if epoch.lower() == "null"
-                             else func.lower(StratigraphicPeriod.epoch) == epoch.lower())
-
-            if stage:
-                conds.append(StratigraphicPeriod.stage.is_(None) if stage.lower() == "null"
-                             else func.lower(StratigraphicPeriod.stage) == stage.lower())
-
-            # Убираем None/False и собираем условие
-            conds = [c for c in conds if c is not None and c is not False]
-
-            if conds:
-                # Для объединения нескольких условий используем последовательное AND
-                combined_cond = conds[0]
-                for c in conds[1:]:
-                    combined_cond = and_(combined_cond, c)
-                strat_filters.append(combined_cond)
-
-        if strat_filters:
-            stmt = stmt.where(or_(*strat_filters) if len(strat_filters) > 1 else strat_filters[0])
-
-    if "Географическое распространение" in filters:
-        stmt = stmt.join(Genus.geographic_locations)
-        location_names = []
-
-        for location_str in filters["Географическое распространение"]:
-            if ":" in location_str:
-                location_name = location_str.split(":")[-1].strip()
-            else:
-                location_name = location_str.strip()
-
-            if location_name:
-                location_names.append(location_name)
-
-        if location_names:
-            stmt = stmt.where(func.lower(GeographicLocation.name).in_(location_names))
-
-
-    stmt = stmt.distinct()
-
-    stmt = stmt.options(
-        selectinload(Genus.synonyms),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.infraturma),
-        selectinload(Genus.stratigraphic_periods)
-    )
-
-    result = session.execute(stmt)
-    return result.scalars().all()
-
-# Удаление рода
-def delete_genus(session: Session, genus_name: str) -> bool:
-    genus = session.query(Genus).filter(Genus.name == genus_name).first()
-    if genus:
-        session.delete(genus)
-        session.commit()
-        return True
-    return False
-
-
-# Получает данные о родах спор для экспорта
-def get_export_data(session, source, fields, genus_ids=None):
-    stmt = select(Genus)
-
-    if source == 'current' and genus_ids:
-        stmt = stmt.where(Genus.id.in_(genus_ids))
-
-    # selectinload-опции
-    options = [
-        selectinload(Genus.synonyms),
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.infraturma) if "Инфратурма" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.form) if "Форма споры" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.amb) if "Очертание" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.sides_shape) if "Форма сторон" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.angles_shape) if "Форма углов" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.laesurae) if "Форма щели разверзания" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.laesurae_rays) if "Форма лучей щели" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.area_presence) if "Выраженность ареа" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.outline) if "Форма контура споры" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_structure) if "Структура экзины" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_thickness).selectinload(
-            SporeDiagnosisExineThickness.thickness) if "Толщина экзины" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form) if any(f in fields for f in ["Тип", "Толщина", "Ширина", "Строение"]) else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form).selectinload(ExineGrowthForm.exine_growth_type) if "Тип" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form).selectinload(ExineGrowthForm.thickness) if "Толщина" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form).selectinload(ExineGrowthForm.width) if "Ширина" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exoexine) if any(f in fields for f in ["Экзоэкзина (толщина)", "Экзоэкзина (описание)"]) else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.exoexine).selectinload(Exoexine.thickness) if "Экзоэкзина (толщина)" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.intexine) if any(f in fields for f in ["Интэкзина (толщина)", "Интэкзина (описание)"]) else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.intexine).selectinload(Intexine.thickness) if "Интэкзина (толщина)" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.sculpture).selectinload(SporeDiagnosisSculpture.side) if "Скульптура" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.sculpture).selectinload(SporeDiagnosisSculpture.sculpture) if "Скульптура" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.ornamentation).selectinload(SporeDiagnosisOrnamentation.side) if "Орнаментация" in fields else None,
-        selectinload(Genus.diagnosis).selectinload(Diagnosis.ornamentation).selectinload(SporeDiagnosisOrnamentation.ornamentation) if "Орнаментация" in fields else None,
-        selectinload(Genus.stratigraphic_periods) if any(f in fields for f in ["Период", "Эпоха", "Ярус"]) else None,
-        selectinload(Genus.geographic_locations) if any(f in fields for f in ["Страна и регион", "Регион"]) else None,
-        selectinload(Genus.species) if "Виды" in fields else None,
-    ]
-
-    stmt = stmt.options(*[opt for opt in options if opt is not None])
-
-    result = session.execute(stmt)
-    return result.scalars().all()
-
-
-# Получает данные о видах для экспорта
-def get_export_species_data(session, source, genus_ids=None):
-    stmt = select(Species)
-
-    if source == 'current' and genus_ids:
-        stmt = stmt.where(Species.genus_id.in_(genus_ids))
-
-    options = [
-        selectinload(Species.stratigraphic_periods),
-        selectinload(Species.geographic_locations)
-    ]
-
-    stmt = stmt.options(*options)
-    result = session.execute(stmt)
+from typing import Dict, List
+
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy import select, func, and_, or_, bindparam, table, column, tuple_
+from .models import Genus, Infraturma, CharacterOfLaesurae, ExineStratification, ExineType, Diagnosis, AreaPresence, \
+    Outline, AnglesShape, SporeSidesShape, SporeLaesurae, SporeLaesuraeRays, Thickness, SporeExineStructure, SporeAmb, \
+    ExineGrowthForm, Width, ExineGrowthType, SporeSide, SporeSculpture, SporeOrnamentation, \
+    SporeDiagnosisExineThickness, SporeDiagnosisSculpture, SporeDiagnosisOrnamentation, Species, GeographicLocation, \
+    Exoexine, Intexine, GenusStratigraphy, StratigraphicPeriod, GenusGeography, Form, Synonym, GeneraSynonym, \
+    SpeciesStratigraphy, SpeciesGeography, GeographicLocationClosure
+from .chronostratigraphy import age_bounds
+from .size_index import SIZE_DIMENSIONS, size_conditions, rtree_bound, rtree_coordinate, size_rtrees_available
+from .statement_cache import StatementCache
+
+# Геологический порядок периодов для списков вариантов: от древних к молодым,
+# периоды без известного возраста - в конце по названию
+_PERIOD_ORDER = (StratigraphicPeriod.age_base.desc(), StratigraphicPeriod.age_top,
+                 StratigraphicPeriod.period, StratigraphicPeriod.epoch, StratigraphicPeriod.stage)
+
+def get_all_genera(session):
+    stmt = select(Genus).options(
+        selectinload(Genus.synonyms),
+        selectinload(Genus.diagnosis)
+            .selectinload(Diagnosis.infraturma)
+    )
+
+    result = session.execute(stmt)
+    return result.scalars().all()
+
+
+# Запрос строк главной таблицы: (id, название, синонимы через ", ", инфратурма).
+# Одна выборка с GROUP_CONCAT вместо загрузки родов со связанными объектами
+def _genus_table_rows_statement():
+    return (
+        select(
+            Genus.id,
+            Genus.name,
+            func.coalesce(func.group_concat(Synonym.name, ", "), "-"),
+            func.coalesce(Infraturma.name, "-"),
+        )
+        .select_from(Genus)
+        .outerjoin(GeneraSynonym, GeneraSynonym.genus_id == Genus.id)
+        .outerjoin(Synonym, Synonym.id == GeneraSynonym.synonym_id)
+        .outerjoin(Diagnosis, Diagnosis.genus_id == Genus.id)
+        .outerjoin(Infraturma, Infraturma.id == Diagnosis.infraturma_id)
+        .group_by(Genus.id)
+    )
+
+
+# Порядок строк главной таблицы: по названию, при равных названиях - по id.
+# Этот же ключ (название, id) отделяет страницы таблицы (см. filter_genus_table_page)
+def table_order_key(row):
+    return row[1], row[0]
+
+
+# Строки главной таблицы для всех родов (или только для genus_ids), без создания ORM-объектов
+def get_genus_table_rows(session, genus_ids=None):
+    stmt = _genus_table_rows_statement()
+    if genus_ids is not None:
+        stmt = stmt.where(Genus.id.in_(genus_ids))
+    return session.execute(stmt).all()
+
+
+# Запрос строк таблицы видов: (id, вид, род, длина мин, длина макс, ширина мин, ширина макс,
+# стратиграфия через "; ", география через ", "). Виды идут по id без сортировки,
+# чтобы первые строки были готовы до окончания всей выборки
+def _species_table_rows_statement():
+    period_text = (StratigraphicPeriod.period + func.coalesce(" " + StratigraphicPeriod.epoch, "")
+                   + func.coalesce(", " + StratigraphicPeriod.stage, ""))
+    stratigraphy = (
+        select(func.group_concat(period_text, "; "))
+        .select_from(SpeciesStratigraphy)
+        .join(StratigraphicPeriod, StratigraphicPeriod.id == SpeciesStratigraphy.period_id)
+        .where(SpeciesStratigraphy.species_id == Species.id)
+        .scalar_subquery()
+    )
+    geography = (
+        select(func.group_concat(GeographicLocation.name, ", "))
+        .select_from(SpeciesGeography)
+        .join(GeographicLocation, GeographicLocation.id == SpeciesGeography.geographic_location_id)
+        .where(SpeciesGeography.species_id == Species.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Species.id,
+            Species.name,
+            Genus.name,
+            Species.length_min,
+            Species.length_max,
+            Species.width_min,
+            Species.width_max,
+            func.coalesce(stratigraphy, "-"),
+            func.coalesce(geography, "-"),
+        )
+        .join(Genus, Genus.id == Species.genus_id)
+        .order_by(Species.id)
+    )
+
+
+def get_genus_by_name(session, genus_name):
+    return session.query(Genus).filter(Genus.name == genus_name).first()
+
+def get_genus_data(session, genus_name):
+    genus = get_genus_by_name(session, genus_name)
+    if not genus:
+        return None
+
+    return {
+        'name': genus.name,
+        'full_name': genus.full_name,
+        'type_species': genus.type_species
+    }
+
+
+def get_full_genus_data(session, genus_name):
+    return _load_full_genus(session, Genus.name == genus_name)
+
+
+# То же по id рода: обновление открытой вкладки после изменения (и переименования) рода
+def get_full_genus_data_by_id(session, genus_id):
+    return _load_full_genus(session, Genus.id == genus_id)
+
+
+# Род со всеми связанными данными для вкладки описания и формы изменения
+def _load_full_genus(session, condition):
+    genus = session.query(Genus).options(
+        selectinload(Genus.synonyms),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.infraturma).options(
+            selectinload(Infraturma.character_of_laesurae),
+            selectinload(Infraturma.exine_stratification),
+            selectinload(Infraturma.exine_type)
+        ),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.form),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.angles_shape),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.area_presence),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.outline),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form).options(
+            selectinload(ExineGrowthForm.exine_growth_type),
+            selectinload(ExineGrowthForm.thickness),
+            selectinload(ExineGrowthForm.width)
+        ),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exoexine).selectinload(Exoexine.thickness),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.intexine).selectinload(Intexine.thickness),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_thickness).selectinload(
+            SporeDiagnosisExineThickness.thickness),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.amb),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.sides_shape),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.laesurae),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.laesurae_rays),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_structure),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.sculpture).selectinload(SporeDiagnosisSculpture.side),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.sculpture).selectinload(SporeDiagnosisSculpture.sculpture),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.ornamentation).selectinload(SporeDiagnosisOrnamentation.side),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.ornamentation).selectinload(SporeDiagnosisOrnamentation.ornamentation),
+        selectinload(Genus.geographic_locations).joinedload(GeographicLocation.parent),
+        selectinload(Genus.stratigraphic_periods),
+        selectinload(Genus.species).options(
+            selectinload(Species.geographic_locations).joinedload(GeographicLocation.parent),
+            selectinload(Species.stratigraphic_periods)
+        )
+    ).filter(condition).first()
+
+    if not genus:
+        return None
+
+    return genus
+
+
+def get_all_options(session) -> Dict[str, List[str]]:
+    queries = [
+        ("infraturma", select(Infraturma.name)),
+        ("character_of_laesurae", select(CharacterOfLaesurae.name)),
+        ("exine_stratification", select(ExineStratification.name)),
+        ("exine_type", select(ExineType.name)),
+        ("form", select(Form.name)),
+        ("amb", select(SporeAmb.amb)),
+        ("sides_shape", select(SporeSidesShape.side_shape)),
+        ("angles_shape", select(AnglesShape.name)),
+        ("laesurae_shape", select(SporeLaesurae.laesurae_shape)),
+        ("laesurae_rays", select(SporeLaesuraeRays.rays_shape)),
+        ("area_presence", select(AreaPresence.name)),
+        ("exine_structure", select(SporeExineStructure.exine_structure)),
+        ("outline", select(Outline.name)),
+        ("exine_growth_type", select(ExineGrowthType.name)),
+        ("exine_growth_structure", select(ExineGrowthForm.structure).distinct()),
+        ("sculpture_values", select(SporeSculpture.sculpture)),
+        ("ornamentation_values", select(SporeOrnamentation.ornamentation))
+    ]
+
+    # Для запросов с join создаем отдельные подзапросы
+    join_queries = [
+        ("exine_thickness",
+         select(Thickness.value)
+         .join(Thickness.spore_diagnosis_exine_thickness)
+         .distinct()
+         .order_by(Thickness.value)),
+
+        ("exine_growth_thickness",
+         select(Thickness.value)
+         .join(Thickness.exine_growth_form)
+         .distinct()
+         .order_by(Thickness.value)),
+
+        ("exine_growth_width", select(Width.value)),
+
+        ("intexine_thickness",
+         select(Thickness.value)
+         .join(Thickness.intexine)
+         .distinct()
+         .order_by(Thickness.value)),
+
+        ("exoexine_thickness",
+         select(Thickness.value)
+         .join(Thickness.exoexine)
+         .distinct()
+         .order_by(Thickness.value)),
+
+        ("sculpture_sides",
+         select(SporeSide.name)
+         .join(SporeSide.sculpture)
+         .distinct()
+         .order_by(SporeSide.name)),
+
+        ("ornamentation_sides",
+         select(SporeSide.name)
+         .join(SporeSide.ornamentation)
+         .distinct()
+         .order_by(SporeSide.name))
+    ]
+
+    results = {}
+
+    # Выполняем простые запросы
+    for name, stmt in queries:
+        try:
+            result = session.execute(stmt)
+            results[name] = [row[0] for row in result.all()]
+        except Exception as e:
+            print(f"Error loading {name}: {e}")
+            results[name] = []
+
+    # Выполняем запросы с join
+    for name, stmt in join_queries:
+        try:
+            result = session.execute(stmt)
+            results[name] = [row[0] for row in result.all()]
+        except Exception as e:
+            print(f"Error loading {name}: {e}")
+            results[name] = []
+
+    # Стратиграфическое распространение родов - в геологическом порядке, от древних к молодым
+    # (см. PERIOD_ORDER в db/models.py); для фильтра "Возраст" - границы каждого варианта
+    try:
+        stmt = (
+            select(
+                StratigraphicPeriod.period,
+                StratigraphicPeriod.epoch,
+                StratigraphicPeriod.stage,
+                StratigraphicPeriod.age_base,
+                StratigraphicPeriod.age_top
+            )
+            # EXISTS, а не JOIN: иначе при сортировке по возрасту планировщик
+            # просматривает всю связующую таблицу, а не справочник периодов
+            .where(select(GenusStratigraphy.period_id)
+                   .where(GenusStratigraphy.period_id == StratigraphicPeriod.id).exists())
+            .distinct()
+            .order_by(*_PERIOD_ORDER)
+        )
+
+        result = session.execute(stmt)
+        results["stratigraphic_periods"] = []
+        results["stratigraphic_ages"] = {}
+
+        for period, epoch, stage, age_base, age_top in result:
+            parts = []
+            if period:
+                parts.append(period)
+            if epoch:
+                parts.append(epoch)
+            if stage:
+                if parts:
+                    parts[-1] = parts[-1] + f", {stage}"
+                else:
+                    parts.append(stage)
+
+            formatted = " ".join(parts)
+            if formatted:
+                results["stratigraphic_periods"].append(formatted)
+                if age_base is not None and age_top is not None:
+                    results["stratigraphic_ages"][formatted] = (age_base, age_top)
+
+    except Exception as e:
+        print(f"Error loading stratigraphic periods: {e}")
+        results["stratigraphic_periods"] = []
+        results["stratigraphic_ages"] = {}
+
+    # Стратиграфическое распространение все
+    try:
+        stmt = (
+            select(
+                StratigraphicPeriod.period,
+                StratigraphicPeriod.epoch,
+                StratigraphicPeriod.stage,
+                StratigraphicPeriod.age_base,
+                StratigraphicPeriod.age_top
+            )
+            .distinct()
+            .order_by(*_PERIOD_ORDER)
+        )
+
+        result = session.execute(stmt)
+        results["stratigraphic_periods_all"] = []
+
+        for period, epoch, stage, _, _ in result:
+            parts = []
+            if period:
+                parts.append(period)
+            if epoch:
+                parts.append(epoch)
+            if stage:
+                if parts:
+                    parts[-1] = parts[-1] + f", {stage}"
+                else:
+                    parts.append(stage)
+
+            formatted = " ".join(parts)
+            if formatted:
+                results["stratigraphic_periods_all"].append(formatted)
+
+    except Exception as e:
+        print(f"Error loading stratigraphic periods: {e}")
+        results["stratigraphic_periods_all"] = []
+
+    # Географическое распространение у родов: локации родов и все их предки
+    # (выбор региона находит роды из вложенных в него локаций)
+    try:
+        parent = aliased(GeographicLocation)
+        stmt = (
+            select(
+                func.coalesce(parent.name + ': ', '') + GeographicLocation.name
+            )
+            .select_from(GeographicLocation)
+            .join(GeographicLocationClosure, GeographicLocationClosure.ancestor_id == GeographicLocation.id)
+            .join(GenusGeography, GenusGeography.geographic_location_id == GeographicLocationClosure.descendant_id)
+            .outerjoin(parent, GeographicLocation.parent)
+            .distinct()
+            .order_by(func.coalesce(parent.name, ''), GeographicLocation.name)
+        )
+        result = session.execute(stmt)
+        results["geographic_locations"] = [row[0] for row in result.all()]
+
+    except Exception as e:
+        print(f"Error loading geographic locations: {e}")
+        results["geographic_locations"] = []
+
+
+
+    # Географическое распространение все
+    try:
+        parent = aliased(GeographicLocation)
+        stmt = (
+            select(
+                func.coalesce(parent.name + ': ', '') + GeographicLocation.name
+            )
+            .select_from(GeographicLocation)
+            .outerjoin(parent, GeographicLocation.parent)
+            .distinct()
+            .order_by(func.coalesce(parent.name, ''), GeographicLocation.name)
+        )
+        result = session.execute(stmt)
+        results["geographic_locations_all"] = [row[0] for row in result.all()]
+
+    except Exception as e:
+        print(f"Error loading geographic locations: {e}")
+        results["geographic_locations_all"] = []
+
+
+    return results
+
+# Поля панели поиска, которые фильтруются простым условием IN по справочнику:
+# подпись поля -> функция (запрос, псевдонимы Thickness, bindparam) -> запрос
+_IN_FILTERS = {
+    "Инфратурма": lambda stmt, t, values: stmt.where(Infraturma.name.in_(values)),
+    "Характер щели разверзания": lambda stmt, t, values: stmt.join(Infraturma.character_of_laesurae).where(
+        CharacterOfLaesurae.name.in_(values)),
+    "Строение экзины": lambda stmt, t, values: stmt.join(Infraturma.exine_stratification).where(
+        ExineStratification.name.in_(values)),
+    "Наличие оторочки": lambda stmt, t, values: stmt.join(Infraturma.exine_type).where(
+        ExineType.name.in_(values)),
+    "Форма споры": lambda stmt, t, values: stmt.join(Diagnosis.form).where(Form.name.in_(values)),
+    "Очертание": lambda stmt, t, values: stmt.join(Diagnosis.amb).where(SporeAmb.amb.in_(values)),
+    "Форма сторон": lambda stmt, t, values: stmt.join(Diagnosis.sides_shape).where(
+        SporeSidesShape.side_shape.in_(values)),
+    "Форма углов": lambda stmt, t, values: stmt.join(Diagnosis.angles_shape).where(AnglesShape.name.in_(values)),
+    "Форма щели разверзания": lambda stmt, t, values: stmt.join(Diagnosis.laesurae).where(
+        SporeLaesurae.laesurae_shape.in_(values)),
+    "Форма лучей щели": lambda stmt, t, values: stmt.join(Diagnosis.laesurae_rays).where(
+        SporeLaesuraeRays.rays_shape.in_(values)),
+    "Выраженность ареа": lambda stmt, t, values: stmt.join(Diagnosis.area_presence).where(
+        AreaPresence.name.in_(values)),
+    "Толщина экзины": lambda stmt, t, values: stmt.join(Diagnosis.exine_thickness).join(
+        SporeDiagnosisExineThickness.thickness).where(Thickness.value.in_(values)),
+    "Структура экзины": lambda stmt, t, values: stmt.join(Diagnosis.exine_structure).where(
+        SporeExineStructure.exine_structure.in_(values)),
+    "Форма контура споры": lambda stmt, t, values: stmt.join(Diagnosis.outline).where(Outline.name.in_(values)),
+    "Тип": lambda stmt, t, values: stmt.join(Diagnosis.exine_growth_form).join(
+        ExineGrowthForm.exine_growth_type).where(ExineGrowthType.name.in_(values)),
+    "Толщина": lambda stmt, t, values: stmt.join(Diagnosis.exine_growth_form).join(
+        ExineGrowthForm.thickness.of_type(t["exine_growth"])).where(t["exine_growth"].value.in_(values)),
+    "Ширина": lambda stmt, t, values: stmt.join(Diagnosis.exine_growth_form).join(ExineGrowthForm.width).where(
+        Width.value.in_(values)),
+    "Строение": lambda stmt, t, values: stmt.join(Diagnosis.exine_growth_form).where(
+        ExineGrowthForm.structure.in_(values)),
+    "Экзоэкзина (толщина)": lambda stmt, t, values: stmt.join(Diagnosis.exoexine).join(
+        Exoexine.thickness.of_type(t["exoexine"])).where(t["exoexine"].value.in_(values)),
+    "Интэкзина (толщина)": lambda stmt, t, values: stmt.join(Diagnosis.intexine).join(
+        Intexine.thickness.of_type(t["intexine"])).where(t["intexine"].value.in_(values)),
+}
+
+_ANY_SIDE = "не указана/любая"
+
+# R-tree по размерам (создаются миграцией, см. db/size_index.py)
+_GENUS_SIZE_RTREE, _SPECIES_SIZE_RTREE = (
+    table(name, column("id"), *(column(f"{dimension}_{end}") for dimension in SIZE_DIMENSIONS
+                                for end in ("lo", "hi")))
+    for name in ("genus_size_rtree", "species_size_rtree")
+)
+
+# Построенные запросы filter_genera по форме фильтра (см. _filter_shape)
+filter_statement_cache = StatementCache()
+
+
+# Разбирает значение стратиграфии "Период Эпоха, Ярус" на части.
+# Для каждой части возвращает None (не задана), "null" (IS NULL) или значение в нижнем регистре
+def _parse_stratigraphy_value(value):
+    main_part, *stage_parts = [p.strip() for p in value.split(",", 1)]
+    stage = stage_parts[0] if stage_parts else None
+
+    period_parts = main_part.split()
+    period = period_parts[0] if period_parts else None
+    epoch = " ".join(period_parts[1:]) if len(period_parts) > 1 else None
+
+    return [part.lower() if part else None for part in (period, epoch, stage)]
+
+
+# Условия по стратиграфии для каждого непустого значения фильтра: [период, эпоха, ярус]
+def _stratigraphy_conditions(values):
+    conditions = []
+    for value in values:
+        value = value.strip()
+        if not value:
+            continue
+        parts = _parse_stratigraphy_value(value)
+        if any(parts):
+            conditions.append(parts)
+    return conditions
+
+
+# Названия локаций из значений фильтра ("Регион: Локация" -> "Локация")
+def _location_names(values):
+    location_names = []
+    for location_str in values:
+        if ":" in location_str:
+            location_name = location_str.split(":")[-1].strip()
+        else:
+            location_name = location_str.strip()
+
+        if location_name:
+            location_names.append(location_name)
+    return location_names
+
+
+# Делит фильтры на форму (какие поля заданы и сколько условий в каждом) и значения.
+# Форма определяет структуру SQL-запроса, значения передаются в его bindparam
+def _filter_shape(filters):
+    params = {}
+
+    in_labels = []
+    for index, label in enumerate(_IN_FILTERS):
+        if label in filters:
+            in_labels.append(label)
+            params[f"in_{index}"] = list(filters[label])
+
+    side_shapes = {}
+    for label, prefix in (("Скульптура", "sculpture"), ("Орнаментация", "ornamentation")):
+        sides = []
+        for number, (side, value) in enumerate(filters.get(label, [])):
+            params[f"{prefix}_value_{number}"] = value
+            if side != _ANY_SIDE:
+                params[f"{prefix}_side_{number}"] = side
+            sides.append(side != _ANY_SIDE)
+        side_shapes[label] = tuple(sides) if label in filters else None
+
+    size_shape = None
+    if "Размеры" in filters:
+        conditions, include_species = size_conditions(filters["Размеры"])
+        for number, (_, _, op, value) in enumerate(conditions):
+            params[f"size_{number}"] = value
+            params[f"size_{number}_rtree"] = rtree_bound(op, value)
+        size_shape = (tuple(condition[:3] for condition in conditions), include_species)
+
+    strat_shape = None
+    if "Стратиграфическое распространение" in filters:
+        strat_shape = []
+        for number, parts in enumerate(_stratigraphy_conditions(filters["Стратиграфическое распространение"])):
+            for name, part in zip(("period", "epoch", "stage"), parts):
+                if part and part != "null":
+                    params[f"strat_{number}_{name}"] = part
+            strat_shape.append(tuple(None if part is None else part == "null" for part in parts))
+        strat_shape = tuple(strat_shape)
+
+    geo_shape = None
+    if "Географическое распространение" in filters:
+        location_names = _location_names(filters["Географическое распространение"])
+        geo_shape = bool(location_names)
+        if location_names:
+            params["locations"] = location_names
+
+    age_shape = None
+    if "Возраст" in filters:
+        base, top = age_bounds(filters["Возраст"])
+        if base is not None:
+            params["age_base"] = base
+        if top is not None:
+            params["age_top"] = top
+        age_shape = (base is not None, top is not None)
+
+    shape = (tuple(in_labels), side_shapes["Скульптура"], side_shapes["Орнаментация"],
+             size_shape, strat_shape, geo_shape, age_shape)
+    return shape, params
+
+
+# Подзапрос IN для пары (сторона, значение) скульптуры или орнаментации
+def _side_value_subquery(link, value_relation, value_column, prefix, number, with_side):
+    subq = (
+        select(link.diagnosis_id)
+        .join(value_relation)
+        .where(value_column == bindparam(f"{prefix}_value_{number}"))
+    )
+    if with_side:
+        subq = subq.join(link.side).where(SporeSide.name == bindparam(f"{prefix}_side_{number}"))
+    return subq
+
+
+# Строит запрос расширенного поиска для ключа (вид результата, форма фильтра);
+# вместо значений - bindparam. Вид "genera" - роды (ORM), "rows" - строки главной таблицы,
+# "rows_within" - строки главной таблицы только среди родов из bindparam within_ids,
+# "rows_page" - страница строк главной таблицы (форма None - без фильтров),
+# "species_rows" - строки таблицы видов
+def _build_filter_statement(key):
+    mode, shape = key
+    if mode == "species_rows":
+        return _apply_species_filter_shape(_species_table_rows_statement(), shape)
+    if mode == "rows_page":
+        # Страница выбирается по индексу ix_genera_name, начиная с ключа предыдущей страницы;
+        # синонимы и инфратурма собираются только для ее родов
+        page = (
+            select(Genus.id)
+            .where(tuple_(Genus.name, Genus.id) > tuple_(bindparam("after_name"), bindparam("after_id")))
+            .order_by(Genus.name, Genus.id)
+            .limit(bindparam("limit"))
+        )
+        if shape is not None:
+            page = page.where(Genus.id.in_(_apply_filter_shape(select(Genus.id), shape)))
+        page = page.subquery()
+        return (_genus_table_rows_statement()
+                .join(page, page.c.id == Genus.id)
+                .order_by(Genus.name, Genus.id))
+    if mode in ("rows", "rows_within"):
+        genus_ids = _apply_filter_shape(select(Genus.id), shape)
+        if mode == "rows_within":
+            genus_ids = genus_ids.where(Genus.id.in_(bindparam("within_ids", expanding=True)))
+        return _genus_table_rows_statement().where(Genus.id.in_(genus_ids))
+
+    stmt = _apply_filter_shape(select(Genus), shape).distinct()
+
+    return stmt.options(
+        selectinload(Genus.synonyms),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.infraturma),
+        selectinload(Genus.stratigraphic_periods)
+    )
+
+
+# Границы интервала размеров модели по концу из size_conditions
+def _size_endpoint(model, dimension, endpoint):
+    min_column, max_column = (getattr(model, name) for name in SIZE_DIMENSIONS[dimension])
+    return {
+        "min": min_column,
+        "max": max_column,
+        "lo": func.coalesce(min_column, max_column),
+        "hi": func.coalesce(max_column, min_column),
+    }[endpoint]
+
+
+# Условия на строки model (Genus или Species) по размерам: кандидаты берутся
+# из R-tree (db/size_index.py) по ослабленным границам прямоугольника, затем условия
+# проверяются точно по столбцам таблицы. Если модуля R-tree в сборке SQLite нет,
+# остается только проверка по столбцам (у родов - по индексам ix_genera_length и ix_genera_width)
+def _size_matching_ids(model, rtree, conditions):
+    rtree_ids = select(rtree.c.id)
+    exact = []
+    for number, (dimension, endpoint, op) in enumerate(conditions):
+        coordinate = rtree.c[rtree_coordinate(dimension, op)]
+        value = _size_endpoint(model, dimension, endpoint)
+        if op == "<=":
+            rtree_ids = rtree_ids.where(coordinate <= bindparam(f"size_{number}_rtree"))
+            exact.append(value <= bindparam(f"size_{number}"))
+        else:
+            rtree_ids = rtree_ids.where(coordinate >= bindparam(f"size_{number}_rtree"))
+            exact.append(value >= bindparam(f"size_{number}"))
+    if not size_rtrees_available():
+        return [and_(*exact)]
+    return [model.id.in_(rtree_ids), and_(*exact)]
+
+
+# Условие по размерам: подходит сам род или (include_species) хотя бы один его вид
+def _size_condition(conditions, include_species):
+    condition = and_(*_size_matching_ids(Genus, _GENUS_SIZE_RTREE, conditions))
+    if include_species:
+        condition = or_(condition, Genus.id.in_(
+            select(Species.genus_id).where(*_size_matching_ids(Species, _SPECIES_SIZE_RTREE, conditions))))
+    return condition
+
+
+# Подзапрос id родов или видов (owner_column связующей таблицы) с подходящим периодом
+def _stratigraphy_subquery(owner_column, period_column, strat_shape):
+    strat_subq = select(owner_column).join(StratigraphicPeriod, StratigraphicPeriod.id == period_column)
+    columns = (("period", StratigraphicPeriod.period), ("epoch", StratigraphicPeriod.epoch),
+               ("stage", StratigraphicPeriod.stage))
+    strat_filters = []
+    for number, parts in enumerate(strat_shape):
+        conds = []
+        for (name, column), is_null in zip(columns, parts):
+            if is_null is None:
+                continue
+            conds.append(column.is_(None) if is_null
+                         else func.lower(column) == bindparam(f"strat_{number}_{name}"))
+        strat_filters.append(and_(*conds))
+
+    if strat_filters:
+        strat_subq = strat_subq.where(or_(*strat_filters))
+    return strat_subq
+
+
+# Подзапрос id родов или видов (owner_column связующей таблицы) с периодом, пересекающим
+# интервал фильтра "Возраст" (см. ages_overlap): вместо сравнения названий - два сравнения
+# чисел по индексу возраста. Периоды с неизвестным возрастом не подходят
+def _age_subquery(owner_column, period_column, age_shape):
+    has_base, has_top = age_shape
+    conds = [StratigraphicPeriod.age_base.is_not(None), StratigraphicPeriod.age_top.is_not(None)]
+    if has_top:
+        conds.append(StratigraphicPeriod.age_base > bindparam("age_top"))
+    if has_base:
+        conds.append(StratigraphicPeriod.age_top < bindparam("age_base"))
+    return (
+        select(owner_column)
+        .join(StratigraphicPeriod, StratigraphicPeriod.id == period_column)
+        .where(*conds)
+    )
+
+
+# Подзапрос id родов или видов (owner_column связующей таблицы) с подходящей локацией.
+# Локация фильтра подходит вместе со всеми вложенными в нее: связь сопоставляется
+# со всеми предками своей локации через таблицу замыкания
+def _geography_subquery(owner_column, location_column, geo_shape):
+    geo_subq = (
+        select(owner_column)
+        .join(GeographicLocationClosure, GeographicLocationClosure.descendant_id == location_column)
+        .join(GeographicLocation, GeographicLocation.id == GeographicLocationClosure.ancestor_id)
+    )
+    if geo_shape:
+        geo_subq = geo_subq.where(
+            func.lower(GeographicLocation.name).in_(bindparam("locations", expanding=True))
+        )
+    return geo_subq
+
+
+# Добавляет к запросу соединения и условия для формы фильтра
+def _apply_filter_shape(stmt, shape):
+    in_labels, sculpture_sides, ornamentation_sides, size_shape, strat_shape, geo_shape, age_shape = shape
+
+    stmt = stmt.join(Genus.diagnosis).join(Diagnosis.infraturma)
+
+    thickness_aliases = {
+        "exine_growth": aliased(Thickness),
+        "exoexine": aliased(Thickness),
+        "intexine": aliased(Thickness),
+    }
+
+    labels = list(_IN_FILTERS)
+    for label in in_labels:
+        values = bindparam(f"in_{labels.index(label)}", expanding=True)
+        stmt = _IN_FILTERS[label](stmt, thickness_aliases, values)
+
+    # Скульптура и орнаментация: каждая пара (сторона, значение) - отдельное условие.
+    # Подзапрос IN вместо коррелированного EXISTS позволяет планировщику начинать
+    # с индекса по значению, а не перебирать все роды
+    for number, with_side in enumerate(sculpture_sides or ()):
+        subq = _side_value_subquery(SporeDiagnosisSculpture, SporeDiagnosisSculpture.sculpture,
+                                    SporeSculpture.sculpture, "sculpture", number, with_side)
+        stmt = stmt.where(Diagnosis.genus_id.in_(subq))
+
+    for number, with_side in enumerate(ornamentation_sides or ()):
+        subq = _side_value_subquery(SporeDiagnosisOrnamentation, SporeDiagnosisOrnamentation.ornamentation,
+                                    SporeOrnamentation.ornamentation, "ornamentation", number, with_side)
+        stmt = stmt.where(Diagnosis.genus_id.in_(subq))
+
+    if size_shape is not None and size_shape[0]:
+        stmt = stmt.where(_size_condition(*size_shape))
+
+    # Стратиграфия и география тоже проверяются подзапросом IN: планировщик
+    # начинает со справочника периодов/локаций и связующей таблицы
+    if strat_shape is not None:
+        stmt = stmt.where(Genus.id.in_(
+            _stratigraphy_subquery(GenusStratigraphy.genus_id, GenusStratigraphy.period_id, strat_shape)))
+
+    if geo_shape is not None:
+        stmt = stmt.where(Genus.id.in_(
+            _geography_subquery(GenusGeography.genus_id, GenusGeography.geographic_location_id, geo_shape)))
+
+    if age_shape is not None:
+        stmt = stmt.where(Genus.id.in_(
+            _age_subquery(GenusStratigraphy.genus_id, GenusStratigraphy.period_id, age_shape)))
+
+    return stmt
+
+
+# Условия формы фильтра для поиска видов: размеры, стратиграфия и география - самого вида,
+# признаки диагноза - его рода. Отметка "учитывать виды" в размерах здесь не нужна
+def _apply_species_filter_shape(stmt, shape):
+    in_labels, sculpture_sides, ornamentation_sides, size_shape, strat_shape, geo_shape, age_shape = shape
+
+    if in_labels or sculpture_sides or ornamentation_sides:
+        genus_shape = (in_labels, sculpture_sides, ornamentation_sides, None, None, None, None)
+        stmt = stmt.where(Species.genus_id.in_(_apply_filter_shape(select(Genus.id), genus_shape)))
+
+    if size_shape is not None and size_shape[0]:
+        stmt = stmt.where(*_size_matching_ids(Species, _SPECIES_SIZE_RTREE, size_shape[0]))
+
+    if strat_shape is not None:
+        stmt = stmt.where(Species.id.in_(
+            _stratigraphy_subquery(SpeciesStratigraphy.species_id, SpeciesStratigraphy.period_id, strat_shape)))
+
+    if geo_shape is not None:
+        stmt = stmt.where(Species.id.in_(
+            _geography_subquery(SpeciesGeography.species_id, SpeciesGeography.geographic_location_id, geo_shape)))
+
+    if age_shape is not None:
+        stmt = stmt.where(Species.id.in_(
+            _age_subquery(SpeciesStratigraphy.species_id, SpeciesStratigraphy.period_id, age_shape)))
+
+    return stmt
+
+
+# Расширенный поиск. Запрос строится один раз для каждой формы фильтра
+# и берется из filter_statement_cache, при следующих поисках меняются только значения
+def filter_genera(session, filters):
+    shape, params = _filter_shape(filters)
+    stmt = filter_statement_cache.get(("genera", shape), _build_filter_statement)
+
+    result = session.execute(stmt, params)
+    return result.scalars().all()
+
+
+# Расширенный поиск, результат - строки главной таблицы (см. get_genus_table_rows).
+# within_ids - проверять фильтры только для этих родов (уточнение уже найденного результата)
+def filter_genus_table_rows(session, filters, within_ids=None):
+    shape, params = _filter_shape(filters)
+    if within_ids is None:
+        stmt = filter_statement_cache.get(("rows", shape), _build_filter_statement)
+    else:
+        stmt = filter_statement_cache.get(("rows_within", shape), _build_filter_statement)
+        params["within_ids"] = list(within_ids)
+    return session.execute(stmt, params).all()
+
+
+# Страница строк главной таблицы (keyset-пагинация): роды, подходящие под фильтры
+# (пустые - все роды), с ключом table_order_key больше after, не больше limit.
+# after - ключ последней строки предыдущей страницы, None - первая страница.
+# Время первой страницы без фильтров не зависит от числа родов в БД
+def filter_genus_table_page(session, filters, after=None, limit=200):
+    if filters:
+        shape, params = _filter_shape(filters)
+    else:
+        shape, params = None, {}
+    stmt = filter_statement_cache.get(("rows_page", shape), _build_filter_statement)
+    # Пустое название и id 0 - меньше ключа любой строки
+    params["after_name"], params["after_id"] = after or ("", 0)
+    params["limit"] = limit
+    return session.execute(stmt, params).all()
+
+
+# Поиск видов по фильтрам панели поиска (см. _apply_species_filter_shape).
+# Строки (см. _species_table_rows_statement) выдаются частями по batch_size
+# по мере чтения из БД; прерванный перебор прекращает и чтение
+def iter_species_rows(session, filters, batch_size=1000):
+    shape, params = _filter_shape(filters)
+    stmt = filter_statement_cache.get(("species_rows", shape), _build_filter_statement)
+    result = session.execute(stmt.execution_options(yield_per=batch_size), params)
+    for partition in result.partitions():
+        yield partition
+
+
+# Все виды, подходящие под фильтры
+def filter_species_rows(session, filters):
+    return [row for batch in iter_species_rows(session, filters) for row in batch]
+
+
+# Счетчики попаданий и промахов кэша запросов расширенного поиска
+def get_filter_cache_stats():
+    return filter_statement_cache.stats()
+
+# Удаление рода
+def delete_genus(session: Session, genus_name: str) -> bool:
+    genus = session.query(Genus).filter(Genus.name == genus_name).first()
+    if genus:
+        session.delete(genus)
+        session.commit()
+        return True
+    return False
+
+
+# Получает данные о родах спор для экспорта
+def get_export_data(session, source, fields, genus_ids=None):
+    stmt = select(Genus)
+
+    if source == 'current' and genus_ids:
+        stmt = stmt.where(Genus.id.in_(genus_ids))
+
+    # selectinload-опции
+    options = [
+        selectinload(Genus.synonyms),
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.infraturma) if "Инфратурма" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.form) if "Форма споры" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.amb) if "Очертание" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.sides_shape) if "Форма сторон" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.angles_shape) if "Форма углов" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.laesurae) if "Форма щели разверзания" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.laesurae_rays) if "Форма лучей щели" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.area_presence) if "Выраженность ареа" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.outline) if "Форма контура споры" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_structure) if "Структура экзины" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_thickness).selectinload(
+            SporeDiagnosisExineThickness.thickness) if "Толщина экзины" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form) if any(f in fields for f in ["Тип", "Толщина", "Ширина", "Строение"]) else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form).selectinload(ExineGrowthForm.exine_growth_type) if "Тип" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form).selectinload(ExineGrowthForm.thickness) if "Толщина" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exine_growth_form).selectinload(ExineGrowthForm.width) if "Ширина" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exoexine) if any(f in fields for f in ["Экзоэкзина (толщина)", "Экзоэкзина (описание)"]) else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.exoexine).selectinload(Exoexine.thickness) if "Экзоэкзина (толщина)" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.intexine) if any(f in fields for f in ["Интэкзина (толщина)", "Интэкзина (описание)"]) else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.intexine).selectinload(Intexine.thickness) if "Интэкзина (толщина)" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.sculpture).selectinload(SporeDiagnosisSculpture.side) if "Скульптура" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.sculpture).selectinload(SporeDiagnosisSculpture.sculpture) if "Скульптура" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.ornamentation).selectinload(SporeDiagnosisOrnamentation.side) if "Орнаментация" in fields else None,
+        selectinload(Genus.diagnosis).selectinload(Diagnosis.ornamentation).selectinload(SporeDiagnosisOrnamentation.ornamentation) if "Орнаментация" in fields else None,
+        selectinload(Genus.stratigraphic_periods) if any(f in fields for f in ["Период", "Эпоха", "Ярус"]) else None,
+        selectinload(Genus.geographic_locations) if any(f in fields for f in ["Страна и регион", "Регион"]) else None,
+        selectinload(Genus.species) if "Виды" in fields else None,
+    ]
+
+    stmt = stmt.options(*[opt for opt in options if opt is not None])
+
+    result = session.execute(stmt)
+    return result.scalars().all()
+
+
+# Получает данные о видах для экспорта
+def get_export_species_data(session, source, genus_ids=None):
+    stmt = select(Species)
+
+    if source == 'current' and genus_ids:
+        stmt = stmt.where(Species.genus_id.in_(genus_ids))
+
+    options = [
+        selectinload(Species.stratigraphic_periods),
+        selectinload(Species.geographic_locations)
+    ]
+
+    stmt = stmt.options(*options)
+    result = session.execute(stmt)
     return result.scalars().all()
\ No newline at end of file
@@ -1,37 +1,158 @@
-import os
-import shutil
-from PySide6.QtWidgets import QMessageBox
-from config import get_db_path
-
-# Сброс БД до резервной копии
-def reset_database(parent_widget=None):
-    db_path = get_db_path()
-    backup_path = os.path.join(os.path.dirname(db_path), 'miospores_backup.db')
-
-    try:
-        # Проверяем существование резервной копии
-        if not os.path.exists(backup_path):
-            QMessageBox.critical(parent_widget, "Ошибка",
-                                 "Резервная копия базы данных не найдена!")
-            return False
-        from db.session import dispose_engine
-        dispose_engine()
-
-        if os.path.exists(db_path):
-            os.remove(db_path)
-        shutil.copy2(backup_path, db_path)
-
-        return True
-
-    except Exception as e:
-        QMessageBox.critical(parent_widget, "Ошибка",
-                             f"Не удалось восстановить базу данных:\n{str(e)}")
-        return False
-
-# Создает резервную копию при первом запуске, если ее нет
-def ensure_backup_exists():
-    db_path = get_db_path()
-    backup_path = os.path.join(os.path.dirname(db_path), 'miospores_backup.db')
-
-    if not os.path.exists(backup_path) and os.path.exists(db_path):
-        shutil.copy2(db_path, backup_path)
\ No newline at end of file
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+from PySide6.QtCore import QThread, Signal
+from config import get_db_path, BACKUP_DIR_NAME, BACKUP_RETENTION, BACKUP_PAGES_PER_STEP
+
+logger = logging.getLogger(__name__)
+
+
+# Исходная копия БД, до которой выполняется сброс
+def get_baseline_backup_path():
+    return os.path.join(os.path.dirname(get_db_path()), 'miospores_backup.db')
+
+
+def get_backup_dir():
+    return os.path.join(os.path.dirname(get_db_path()), BACKUP_DIR_NAME)
+
+
+# Копирует БД через backup API sqlite3 по pages страниц за шаг.
+# Копия согласована: незафиксированные изменения других соединений в нее не попадают,
+# а если файл изменился между шагами, копирование продолжается с учетом изменений.
+# progress(скопировано страниц, всего страниц) вызывается после каждого шага
+def backup_database(source_path, target_path, progress=None, pages=BACKUP_PAGES_PER_STEP):
+    temp_path = target_path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    def on_step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+
+    source = sqlite3.connect(source_path)
+    try:
+        target = sqlite3.connect(temp_path)
+        try:
+            source.backup(target, pages=pages, progress=on_step)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+    # Готовая копия появляется под своим именем только целиком
+    os.replace(temp_path, target_path)
+    return target_path
+
+
+# Список резервных копий с отметкой времени, от старых к новым
+def list_backups():
+    backup_dir = get_backup_dir()
+    if not os.path.isdir(backup_dir):
+        return []
+    names = sorted(name for name in os.listdir(backup_dir)
+                   if name.startswith("miospores_") and name.endswith(".db"))
+    return [os.path.join(backup_dir, name) for name in names]
+
+
+# Удаляет самые старые копии сверх лимита; возвращает удаленные пути
+def rotate_backups(retention=BACKUP_RETENTION):
+    backups = list_backups()
+    removed = backups[:max(len(backups) - retention, 0)]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+# Создает резервную копию с отметкой времени и удаляет устаревшие
+def create_backup(progress=None):
+    backup_dir = get_backup_dir()
+    os.makedirs(backup_dir, exist_ok=True)
+    # Микросекунды в имени: две копии за одну секунду не должны затирать друг друга
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    target_path = os.path.join(backup_dir, f"miospores_{timestamp}.db")
+    suffix = 1
+    while os.path.exists(target_path):
+        target_path = os.path.join(backup_dir, f"miospores_{timestamp}_{suffix}.db")
+        suffix += 1
+
+    backup_database(get_db_path(), target_path, progress)
+    rotate_backups()
+    return target_path
+
+
+# Загружает копию в рабочую БД через backup API: соединения приложения не закрываются,
+# после восстановления они видят новое содержимое при следующем запросе
+def restore_database(backup_path, progress=None, pages=BACKUP_PAGES_PER_STEP):
+    from db.migrations import migrate_database
+    from db.search import invalidate_search_caches
+    from db.session import engine, invalidate_memory_replica
+
+    def on_step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+
+    source = sqlite3.connect(backup_path)
+    target = engine.raw_connection()
+    try:
+        source.backup(target.driver_connection, pages=pages, progress=on_step)
+    finally:
+        target.close()
+        source.close()
+
+    invalidate_memory_replica()
+    # Длительность миграции заранее неизвестна: (0, 0) переводит индикатор в режим ожидания
+    if progress:
+        progress(0, 0)
+    # Копия может быть старой версии: доводим структуру до текущей
+    migrate_database(engine)
+    # Запись шла в обход сессий, события commit не было
+    invalidate_search_caches()
+
+
+# Создание резервной копии в фоновом потоке, чтобы не блокировать интерфейс
+class BackupThread(QThread):
+    progress = Signal(int, int)
+    succeeded = Signal(str)
+    failed = Signal(str)
+
+    def run(self):
+        try:
+            path = create_backup(progress=self.progress.emit)
+        except Exception as e:
+            logger.warning("Не удалось создать резервную копию: %s", e)
+            self.failed.emit(str(e))
+            return
+        self.succeeded.emit(path)
+
+
+# Сброс БД до исходной копии в фоновом потоке: и копирование, и миграция после него
+# занимают заметное время. Перед запуском фоновые задания JobRunner должны быть
+# остановлены (MainWindowLogic.close_session), иначе они читали бы файл во время записи
+class RestoreThread(QThread):
+    progress = Signal(int, int)
+    succeeded = Signal()
+    failed = Signal(str)
+
+    def __init__(self, backup_path, parent=None):
+        super().__init__(parent)
+        self.backup_path = backup_path
+
+    def run(self):
+        try:
+            restore_database(self.backup_path, progress=self.progress.emit)
+        except Exception as e:
+            logger.warning("Не удалось восстановить базу данных: %s", e)
+            self.failed.emit(str(e))
+            return
+        self.succeeded.emit()
+
+
+# Создает резервную копию при первом запуске, если ее нет
+def ensure_backup_exists():
+    db_path = get_db_path()
+    backup_path = get_baseline_backup_path()
+
+    if not os.path.exists(backup_path) and os.path.exists(db_path):
+        backup_database(db_path, backup_path)
@@ -0,0 +1,141 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .models import Genus, Species
+
+logger = logging.getLogger(__name__)
+
+# Виды изменений рода
+GENUS_CREATED = "created"
+GENUS_UPDATED = "updated"
+GENUS_DELETED = "deleted"
+
+# Ключи в session.info: измененные в сессии роды {id: вид изменения}, была ли запись,
+# которую нельзя отнести к роду, и отложена ли публикация до конца единицы работы
+_CHANGES_KEY = "genus_changes"
+_INCOMPLETE_KEY = "genus_changes_incomplete"
+_DEFERRED_KEY = "genus_changes_deferred"
+
+
+# Изменения родов, зафиксированные одной сессией.
+# complete=False - в сессии изменены данные, которые не удалось отнести к конкретному
+# роду (например, переименован справочник): структуры по родам нужно строить заново
+@dataclass
+class GenusChanges:
+    kinds: dict = field(default_factory=dict)
+    complete: bool = True
+
+    @property
+    def genus_ids(self):
+        return set(self.kinds)
+
+    def ids_of(self, *kinds):
+        return {genus_id for genus_id, kind in self.kinds.items() if kind in kinds}
+
+
+# Шина изменений: подписчики (индексы, кэши, интерфейс) получают GenusChanges после
+# фиксации сессии и обновляют только затронутые роды. Подписчик вызывается в потоке,
+# зафиксировавшем сессию; ошибка подписчика не мешает остальным
+class ChangeBus:
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, changes):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(changes)
+            except Exception:
+                logger.exception("Ошибка в подписчике на изменения родов")
+
+
+genus_changes = ChangeBus()
+
+
+# Отмечает род как измененный в сессии. Повторные отметки объединяются:
+# созданный и затем измененный род остается созданным, удаление важнее всего
+def mark_genus_changed(session, genus_id, kind=GENUS_UPDATED):
+    kinds = session.info.setdefault(_CHANGES_KEY, {})
+    previous = kinds.get(genus_id)
+    if previous == GENUS_DELETED and kind == GENUS_CREATED:
+        kind = GENUS_UPDATED
+    elif previous == GENUS_CREATED and kind == GENUS_UPDATED:
+        kind = GENUS_CREATED
+    kinds[genus_id] = kind
+
+
+# Единица работы (SessionManager.write) фиксирует данные несколько раз
+# (функции crud фиксируют каждый шаг), а публикует изменения один раз - в конце
+def defer_publishing(session):
+    session.info[_DEFERRED_KEY] = True
+
+
+# Публикует накопленные изменения сессии, если они есть
+def publish_changes(session):
+    kinds = session.info.pop(_CHANGES_KEY, None)
+    incomplete = session.info.pop(_INCOMPLETE_KEY, False)
+    if kinds or incomplete:
+        genus_changes.publish(GenusChanges(kinds or {}, not incomplete))
+
+
+# Род, к которому относится строка: сам род, строки с genus_id (диагноз, виды, связи)
+# или diagnosis_id (признаки диагноза, id диагноза равен id рода), связи видов
+def _owner_genus(session, instance):
+    if isinstance(instance, Genus):
+        return instance.id
+    for attribute in ("genus_id", "diagnosis_id"):
+        genus_id = getattr(instance, attribute, None)
+        if genus_id is not None:
+            return genus_id
+    species_id = getattr(instance, "species_id", None)
+    if species_id is not None:
+        species = session.get(Species, species_id)
+        return species.genus_id if species is not None else None
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    for instance in session.new:
+        genus_id = _owner_genus(session, instance)
+        if genus_id is not None:
+            mark_genus_changed(session, genus_id, GENUS_CREATED if isinstance(instance, Genus) else GENUS_UPDATED)
+    # Новые строки справочников сами по себе роды не меняют, а измененные
+    # или удаленные, не относящиеся к роду, - могут
+    for instance in session.deleted:
+        genus_id = _owner_genus(session, instance)
+        if genus_id is None:
+            session.info[_INCOMPLETE_KEY] = True
+        else:
+            mark_genus_changed(session, genus_id, GENUS_DELETED if isinstance(instance, Genus) else GENUS_UPDATED)
+    for instance in session.dirty:
+        # Только измененные столбцы: добавление в коллекцию (род -> синоним)
+        # помечает измененным и справочник на другой стороне связи
+        if not session.is_modified(instance, include_collections=False):
+            continue
+        genus_id = _owner_genus(session, instance)
+        if genus_id is None:
+            session.info[_INCOMPLETE_KEY] = True
+        else:
+            mark_genus_changed(session, genus_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if not session.info.get(_DEFERRED_KEY):
+        publish_changes(session)
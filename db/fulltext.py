@@ -0,0 +1,262 @@
+import html
+import re
+
+from sqlalchemy import text, bindparam
+
+from .indexes import sqlite_module_available
+
+# Полнотекстовый индекс FTS5 по родам: один документ на род (rowid = id рода).
+# Столбцы документа и их веса в BM25: совпадение в названии важнее, чем в тексте описания
+FULLTEXT_TABLE = "genus_fulltext"
+FULLTEXT_COLUMNS = (("name", 10.0), ("synonyms", 5.0), ("species", 3.0), ("description", 1.0))
+
+# Сколько слов показывать во фрагменте с совпадением
+SNIPPET_TOKENS = 12
+# Слова короче ищутся целиком: префикс из одной буквы совпал бы почти со всеми родами
+MIN_PREFIX_LENGTH = 2
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Документ рода: название, синонимы, виды с прежними названиями и описательный текст
+_DOCUMENT_SELECT = """
+    SELECT g.id, g.name,
+        (SELECT group_concat(s.name, ' ') FROM genera_synonyms gs
+         JOIN synonyms s ON s.id = gs.synonym_id WHERE gs.genus_id = g.id),
+        (SELECT group_concat(sp.name || coalesce(' ' || sp.old_name, ''), ' ') FROM species sp
+         WHERE sp.genus_id = g.id),
+        coalesce(g.comparison, '') || ' ' || coalesce(g.natural_affiliation, '') || ' ' ||
+        coalesce((SELECT group_concat(d.additional_features, ' ') FROM diagnosis d WHERE d.genus_id = g.id), '')
+    FROM genera g"""
+
+# Триггеры, поддерживающие индекс: (таблица, событие, выражение со списком id родов для IN (...)).
+# При любом изменении документ рода пересобирается целиком
+_TRIGGERS = [
+    ("genera", "INSERT", "NEW.id"),
+    ("genera", "UPDATE OF name, comparison, natural_affiliation", "OLD.id, NEW.id"),
+    ("genera", "DELETE", "OLD.id"),
+    ("genera_synonyms", "INSERT", "NEW.genus_id"),
+    ("genera_synonyms", "DELETE", "OLD.genus_id"),
+    ("synonyms", "UPDATE OF name", "SELECT genus_id FROM genera_synonyms WHERE synonym_id = NEW.id"),
+    ("species", "INSERT", "NEW.genus_id"),
+    ("species", "UPDATE OF name, old_name, genus_id", "OLD.genus_id, NEW.genus_id"),
+    ("species", "DELETE", "OLD.genus_id"),
+    ("diagnosis", "INSERT", "NEW.genus_id"),
+    ("diagnosis", "UPDATE OF additional_features, genus_id", "OLD.genus_id, NEW.genus_id"),
+    ("diagnosis", "DELETE", "OLD.genus_id"),
+]
+
+
+_COLUMN_NAMES = ", ".join(name for name, _ in FULLTEXT_COLUMNS)
+
+
+def _trigger_name(table, event):
+    return f"{FULLTEXT_TABLE}_{table}_{event.split()[0].lower()}"
+
+
+FULLTEXT_TRIGGERS = [_trigger_name(table, event) for table, event, _ in _TRIGGERS]
+
+
+# Есть ли модуль FTS5 в сборке SQLite; без него поиск идет по LIKE (см. _search_like)
+def fulltext_available():
+    return sqlite_module_available("fts5")
+
+
+# SQL удаления триггеров индекса: перед массовой загрузкой строк, чтобы документы
+# не пересобирались на каждую строку (затем - fulltext_rebuild_sql и fulltext_trigger_sql)
+def fulltext_drop_triggers_sql():
+    return [f"DROP TRIGGER IF EXISTS {name}" for name in FULLTEXT_TRIGGERS]
+
+
+def fulltext_trigger_sql():
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {_trigger_name(table, event)} AFTER {event} ON {table} BEGIN "
+        f"DELETE FROM {FULLTEXT_TABLE} WHERE rowid IN ({genus_ids}); "
+        f"INSERT INTO {FULLTEXT_TABLE} (rowid, {_COLUMN_NAMES}) {_DOCUMENT_SELECT} WHERE g.id IN ({genus_ids}); "
+        f"END"
+        for table, event, genus_ids in _TRIGGERS
+    ]
+
+
+# SQL заполнения индекса заново по всем родам
+def fulltext_rebuild_sql():
+    return [
+        f"DELETE FROM {FULLTEXT_TABLE}",
+        f"INSERT INTO {FULLTEXT_TABLE} (rowid, {_COLUMN_NAMES}) {_DOCUMENT_SELECT}",
+        f"INSERT INTO {FULLTEXT_TABLE} ({FULLTEXT_TABLE}) VALUES ('optimize')",
+    ]
+
+
+# Создает индекс с триггерами и заполняет его по всем родам.
+# Выполняется один раз (миграцией); дальше индекс поддерживают триггеры
+def create_fulltext_index(connection):
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FULLTEXT_TABLE} USING fts5("
+        f"{_COLUMN_NAMES}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    ))
+    # Веса столбцов сохраняются в самом индексе: ORDER BY rank использует их
+    weights = ", ".join(str(weight) for _, weight in FULLTEXT_COLUMNS)
+    connection.execute(text(
+        f"INSERT INTO {FULLTEXT_TABLE} ({FULLTEXT_TABLE}, rank) VALUES ('rank', 'bm25({weights})')"
+    ))
+    for sql in fulltext_drop_triggers_sql() + fulltext_trigger_sql() + fulltext_rebuild_sql():
+        connection.execute(text(sql))
+
+
+# Слова текста из строки поиска (в нижнем регистре)
+def query_tokens(search_text):
+    return _TOKEN_RE.findall(search_text.lower())
+
+
+# Уточняет ли текст search_text запрос broader_text: каждое слово прежнего запроса
+# следует из какого-то слова нового (префикс продолжен или короткое слово повторено).
+# Тогда роды, найденные по search_text, - среди найденных по broader_text
+def is_refinement(search_text, broader_text):
+    tokens = query_tokens(search_text)
+    broader = query_tokens(broader_text)
+    if not tokens or not broader:
+        return False
+    return all(any(token == old or (len(old) >= MIN_PREFIX_LENGTH and token.startswith(old)) for token in tokens)
+               for old in broader)
+
+
+# Запрос FTS5 по словам: все слова обязательны, слово от MIN_PREFIX_LENGTH букв - префикс.
+# Слова берутся в кавычки, поэтому операторы FTS5 в тексте пользователя не действуют.
+# Возвращает None, если слов нет
+def fulltext_query(tokens):
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' if len(token) >= MIN_PREFIX_LENGTH else f'"{token}"' for token in tokens)
+
+
+_MATCH_IDS = text(f"SELECT rowid FROM {FULLTEXT_TABLE} WHERE {FULLTEXT_TABLE} MATCH :query")
+_RANKED_IDS = text(f"SELECT rowid FROM {FULLTEXT_TABLE} WHERE {FULLTEXT_TABLE} MATCH :query ORDER BY rank")
+_DOCUMENTS = text(
+    f"SELECT rowid, {_COLUMN_NAMES} FROM {FULLTEXT_TABLE} WHERE rowid IN :ids"
+).bindparams(bindparam("ids", expanding=True))
+
+
+# Роды одного запроса: до needed id, кроме exclude, только из within (если задан).
+# Совпадения сначала перебираются по rowid; если их не больше rank_max, они ранжируются
+# по BM25, иначе остаются в порядке rowid - ранжирование всех совпадений слишком общего
+# запроса стоило бы дороже самого поиска. Условие rowid IN вместе с MATCH FTS5 выполняет
+# проверкой каждого id заново, поэтому within и exclude применяются здесь, а не в SQL
+def _search_query(session, query, within, exclude, needed, rank_max):
+    found = []
+    total = 0
+    result = session.execute(_MATCH_IDS, {"query": query})
+    for (genus_id,) in result:
+        total += 1
+        if genus_id in exclude or (within is not None and genus_id not in within):
+            continue
+        found.append(genus_id)
+        if total > rank_max and len(found) >= needed:
+            break
+    result.close()
+
+    if total > rank_max:
+        return found[:needed]
+    ranked = session.execute(_RANKED_IDS, {"query": query}).scalars()
+    return [genus_id for genus_id in ranked
+            if genus_id not in exclude and (within is None or genus_id in within)][:needed]
+
+
+# Выражение для слов документа, совпадающих со словами запроса (как в fulltext_query)
+def _match_pattern(tokens):
+    alternatives = [re.escape(token) + (r"\w*" if len(token) >= MIN_PREFIX_LENGTH else r"(?!\w)")
+                    for token in sorted(set(tokens), key=len, reverse=True)]
+    return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + ")", re.IGNORECASE)
+
+
+# Фрагмент документа вокруг первого совпадения (столбцы - в порядке веса),
+# совпавшие слова выделены; HTML для подсказки. None, если совпадение не найдено
+def _snippet(columns, pattern):
+    for column in columns:
+        match = pattern.search(column or "")
+        if match is None:
+            continue
+        head = column[:match.start()].split()
+        before = head[len(head) - SNIPPET_TOKENS // 3:] if len(head) > SNIPPET_TOKENS // 3 else head
+        count = SNIPPET_TOKENS - len(before)
+        after = column[match.start():].split(maxsplit=count)
+        words = before + after[:count]
+        ellipsis_before = len(head) > len(before)
+        ellipsis_after = len(after) > count
+        parts = [_highlight(word, pattern) for word in words]
+        return ("…" if ellipsis_before else "") + " ".join(parts) + ("…" if ellipsis_after else "")
+    return None
+
+
+def _highlight(word, pattern):
+    parts = []
+    position = 0
+    for match in pattern.finditer(word):
+        parts.append(html.escape(word[position:match.start()]))
+        parts.append(f"<b>{html.escape(match.group())}</b>")
+        position = match.end()
+    parts.append(html.escape(word[position:]))
+    return "".join(parts)
+
+
+# Роды, найденные по тексту: [(id рода, фрагмент HTML или None)], не больше limit.
+# Сначала идут совпадения в названии и синонимах, затем - в видах и описании;
+# внутри каждой группы - по убыванию релевантности (BM25, см. _search_query).
+# within_ids - искать только среди этих родов; фрагменты строятся для первых snippet_rows
+def search_fulltext(session, search_text, within_ids=None, limit=200, rank_max=500, snippet_rows=20):
+    tokens = query_tokens(search_text)
+    query = fulltext_query(tokens)
+    if query is None:
+        return []
+
+    within = None if within_ids is None else set(within_ids)
+    if not fulltext_available():
+        return _search_like(session, tokens, within, limit, snippet_rows)
+    found = []
+    for tier_query in (f"{{name synonyms}} : ({query})", query):
+        found += _search_query(session, tier_query, within, set(found), limit - len(found), rank_max)
+        if len(found) >= limit:
+            break
+
+    snippets = {}
+    if found and snippet_rows:
+        pattern = _match_pattern(tokens)
+        for genus_id, *columns in session.execute(_DOCUMENTS, {"ids": found[:snippet_rows]}):
+            snippets[genus_id] = _snippet(columns, pattern)
+    return [(genus_id, snippets.get(genus_id)) for genus_id in found]
+
+
+_LIKE_COLUMNS = [name for name, _ in FULLTEXT_COLUMNS]
+
+
+# Условие LIKE для слов запроса: каждое слово - подстрока одного из столбцов документа
+def _like_condition(tokens, columns):
+    document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    return " AND ".join(f"({document}) LIKE :token_{number} ESCAPE '\\'" for number in range(len(tokens)))
+
+
+# Поиск без FTS5 (модуля нет в сборке SQLite): документы родов собираются тем же запросом,
+# что и для индекса, и каждое слово ищется как подстрока (LIKE; без учета регистра - только
+# для латиницы). Сначала совпадения в названии и синонимах, внутри групп - по названию.
+# Просматривает все роды, поэтому медленнее индекса, но находит то же и больше
+def _search_like(session, tokens, within, limit, snippet_rows):
+    params = {
+        f"token_{number}": "%" + re.sub(r"([%_\\])", r"\\\1", token) + "%"
+        for number, token in enumerate(tokens)
+    }
+    rows = session.execute(text(
+        f"WITH documents (id, {_COLUMN_NAMES}) AS ({_DOCUMENT_SELECT}) "
+        f"SELECT id, {_COLUMN_NAMES}, {_like_condition(tokens, _LIKE_COLUMNS[:2])} AS in_name "
+        f"FROM documents WHERE {_like_condition(tokens, _LIKE_COLUMNS)} "
+        f"ORDER BY in_name DESC, name, id"
+    ), params)
+
+    found = []
+    pattern = _match_pattern(tokens)
+    for genus_id, *columns, _ in rows:
+        if within is not None and genus_id not in within:
+            continue
+        snippet = _snippet(columns, pattern) if len(found) < snippet_rows else None
+        found.append((genus_id, snippet))
+        if len(found) >= limit:
+            break
+    rows.close()
+    return found
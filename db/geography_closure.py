@@ -0,0 +1,44 @@
+from sqlalchemy import text
+
+# Обратная сторона замыкания: все предки локации (первичный ключ покрывает поиск потомков)
+CLOSURE_INDEX = ("ix_geographic_location_closure_descendant", "geographic_location_closure",
+                 ["descendant_id", "ancestor_id"])
+
+
+# Создает таблицу замыкания дерева локаций и заполняет ее заново рекурсивным запросом.
+# Выполняется один раз (миграцией); при поиске рекурсия не нужна
+def create_geography_closure(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS geographic_location_closure ("
+        "ancestor_id INTEGER NOT NULL REFERENCES geographic_location(id) ON DELETE CASCADE, "
+        "descendant_id INTEGER NOT NULL REFERENCES geographic_location(id) ON DELETE CASCADE, "
+        "depth INTEGER NOT NULL, "
+        "PRIMARY KEY (ancestor_id, descendant_id)) WITHOUT ROWID"
+    ))
+    index_name, table_name, columns = CLOSURE_INDEX
+    connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})"))
+    connection.execute(text("DELETE FROM geographic_location_closure"))
+    # Ссылки на несуществующего родителя пропускаются, ограничение глубины защищает от циклов
+    connection.execute(text(
+        "INSERT OR IGNORE INTO geographic_location_closure (ancestor_id, descendant_id, depth) "
+        "WITH RECURSIVE closure(ancestor_id, descendant_id, depth) AS ("
+        "  SELECT id, id, 0 FROM geographic_location"
+        "  UNION ALL"
+        "  SELECT l.parent_id, c.descendant_id, c.depth + 1"
+        "  FROM closure c JOIN geographic_location l ON l.id = c.ancestor_id"
+        "  JOIN geographic_location p ON p.id = l.parent_id"
+        "  WHERE c.depth < 32"
+        ") SELECT ancestor_id, descendant_id, min(depth) FROM closure GROUP BY ancestor_id, descendant_id"
+    ))
+    connection.execute(text("ANALYZE geographic_location_closure"))
+
+
+# Добавляет в замыкание строки локации: она сама и все предки ее родителя.
+# Повторный вызов ничего не меняет
+def add_location_to_closure(session, location):
+    session.execute(text(
+        "INSERT OR IGNORE INTO geographic_location_closure (ancestor_id, descendant_id, depth) "
+        "SELECT :id, :id, 0 "
+        "UNION ALL "
+        "SELECT ancestor_id, :id, depth + 1 FROM geographic_location_closure WHERE descendant_id = :parent_id"
+    ), {"id": location.id, "parent_id": location.parent_id})
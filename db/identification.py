@@ -0,0 +1,164 @@
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import text
+
+from .bitmap_index import FIELD_SOURCES, PAIR_SOURCES, ANY_SIDE, STRATIGRAPHY, GEOGRAPHY, AGE, CharacterIndexHolder
+from .crud import get_genus_table_rows
+
+# Размеры как признаки определения: (столбец минимума, столбец максимума)
+SIZE_CHARACTERS = {
+    "Длина": ("length_min", "length_max"),
+    "Ширина": ("width_min", "width_max"),
+}
+# Поля панели поиска, которые не описывают саму спору и при определении не учитываются
+NON_CHARACTER_FIELDS = (STRATIGRAPHY, GEOGRAPHY, AGE)
+
+
+# Матрица "род x состояние признака" для определения по частичному совпадению.
+# Матрица сильно разреженная, поэтому хранится по столбцам: для каждого состояния -
+# массив позиций родов, у которых оно есть. Позиция рода - индекс в rows
+class CharacterMatrix:
+    def __init__(self, rows, states, known, sizes):
+        self.rows = rows
+        self.states = states
+        self.known = known
+        self.sizes = sizes
+
+    def __len__(self):
+        return len(self.rows)
+
+    # Роды, у которых есть хотя бы одно из состояний признака label
+    def _any_of(self, label, values):
+        match = np.zeros(len(self.rows), dtype=bool)
+        columns = self.states.get(label, {})
+        for value in values:
+            positions = columns.get(value)
+            if positions is not None:
+                match[positions] = True
+        return match
+
+    # Признаки, введенные пользователем: [(название, вес, совпадение, признак описан у рода)]
+    def _characters(self, filters, weights):
+        characters = []
+        for label, values in filters.items():
+            if label in NON_CHARACTER_FIELDS or label == "Размеры" or not values:
+                continue
+            weight = weights.get(label, 1.0)
+            if label in PAIR_SOURCES:
+                for side, value in values:
+                    key = (None if side == ANY_SIDE else side, value)
+                    name = f"{label}: {value}" if key[0] is None else f"{label}: {value} ({side})"
+                    characters.append((name, weight, self._any_of(label, [key]), self.known[label]))
+            elif label in self.known:
+                characters.append((label, weight, self._any_of(label, values), self.known[label]))
+
+        size_filters = filters.get("Размеры", {})
+        for name, (min_key, max_key) in SIZE_CHARACTERS.items():
+            if min_key not in size_filters and max_key not in size_filters:
+                continue
+            low = size_filters.get(min_key, -np.inf)
+            high = size_filters.get(max_key, np.inf)
+            if size_filters.get("mode") == "point":
+                # Измеренное зерно: диапазон рода должен содержать точку
+                low = high = size_filters.get(min_key, size_filters.get(max_key))
+            genus_min, genus_max = self.sizes[min_key], self.sizes[max_key]
+            known = ~np.isnan(genus_min) | ~np.isnan(genus_max)
+            # Если у рода указана только одна граница, диапазон вырождается в точку
+            genus_min = np.where(np.isnan(genus_min), genus_max, genus_min)
+            genus_max = np.where(np.isnan(genus_max), genus_min, genus_max)
+            with np.errstate(invalid="ignore"):
+                match = known & (genus_max >= low) & (genus_min <= high)
+            characters.append((name, weights.get(name, 1.0), match, known))
+        return characters
+
+    # Ранжирует роды по взвешенной сумме совпавших признаков. Признак, не описанный у рода,
+    # не считается ни совпадением, ни несовпадением. Роды без совпавших признаков и роды
+    # с числом несовпадений больше max_mismatches отбрасываются. Возвращает {"characters": [названия признаков],
+    # "max_score": сумма весов, "results": [{"id", "name", "infraturma", "score",
+    # "mismatches", "details": {признак: True/False/None}}]} - не больше top_k родов
+    def identify(self, filters, weights=None, max_mismatches=None, top_k=50):
+        characters = self._characters(filters, weights or {})
+        names = [name for name, _, _, _ in characters]
+        max_score = float(sum(weight for _, weight, _, _ in characters))
+        if not characters:
+            return {"characters": names, "max_score": max_score, "results": []}
+
+        score = np.zeros(len(self.rows))
+        mismatches = np.zeros(len(self.rows), dtype=np.int32)
+        for _, weight, match, known in characters:
+            score += weight * match
+            mismatches += known & ~match
+
+        selected = score > 0
+        if max_mismatches is not None:
+            selected &= mismatches <= max_mismatches
+        candidates = np.flatnonzero(selected)
+
+        # Сначала отбираем top_k по баллу за O(n), затем сортируем только их
+        if len(candidates) > top_k:
+            threshold = np.partition(score[candidates], -top_k)[-top_k]
+            candidates = candidates[score[candidates] >= threshold]
+        order = np.lexsort((candidates, mismatches[candidates], -score[candidates]))
+        top = candidates[order][:top_k]
+
+        results = []
+        for position in top.tolist():
+            genus_id, name, _, infraturma = self.rows[position]
+            details = {}
+            for character, _, match, known in characters:
+                details[character] = bool(match[position]) if known[position] else None
+            results.append({
+                "id": genus_id,
+                "name": name,
+                "infraturma": infraturma,
+                "score": float(score[position]),
+                "mismatches": int(mismatches[position]),
+                "details": details,
+            })
+        return {"characters": names, "max_score": max_score, "results": results}
+
+
+# Строит матрицу признаков из связующих таблиц диагноза
+def build_character_matrix(session):
+    rows = [tuple(row) for row in get_genus_table_rows(session)]
+    positions = {row[0]: position for position, row in enumerate(rows)}
+
+    def collect(label, pairs):
+        by_value = defaultdict(list)
+        for genus_id, value in pairs:
+            position = positions.get(genus_id)
+            if position is not None:
+                by_value[value].append(position)
+        columns = {value: np.unique(np.array(found, dtype=np.int64)) for value, found in by_value.items()}
+        described = np.zeros(len(rows), dtype=bool)
+        for found in columns.values():
+            described[found] = True
+        states[label] = columns
+        known[label] = described
+
+    states, known = {}, {}
+    for label, sql in FIELD_SOURCES.items():
+        collect(label, session.execute(text(sql)).all())
+
+    for label, sql in PAIR_SOURCES.items():
+        pairs = []
+        for genus_id, side, value in session.execute(text(sql)).all():
+            pairs.append((genus_id, (None, value)))
+            if side is not None:
+                pairs.append((genus_id, (side, value)))
+        collect(label, pairs)
+
+    columns = [column for bounds in SIZE_CHARACTERS.values() for column in bounds]
+    size_rows = {row[0]: row[1:] for row in session.execute(
+        text(f"SELECT id, {', '.join(columns)} FROM genera")).all()}
+    values = np.array([[np.nan if value is None else value
+                        for value in size_rows.get(row[0], (None,) * len(columns))]
+                       for row in rows], dtype=float).reshape(len(rows), len(columns))
+    sizes = {column: values[:, number] for number, column in enumerate(columns)}
+
+    return CharacterMatrix(rows, states, known, sizes)
+
+
+# Матрица перестраивается после записи в БД так же, как битовый индекс
+character_matrix = CharacterIndexHolder(build_character_matrix)
@@ -0,0 +1,89 @@
+import sqlite3
+from functools import lru_cache
+
+from sqlalchemy import text
+
+# Вторичные индексы БД: (имя индекса, таблица, индексируемые столбцы или выражения).
+# Покрывают поиск рода по названию, обратные стороны связующих таблиц
+# и внешние ключи, по которым выполняются соединения в filter_genera
+SECONDARY_INDEXES = [
+    # Роды и виды
+    ("ix_genera_name", "genera", ["name"]),
+    ("ix_genera_name_lower", "genera", ["lower(name)"]),
+    ("ix_genera_length", "genera", ["length_min", "length_max"]),
+    ("ix_genera_width", "genera", ["width_min", "width_max"]),
+    ("ix_species_genus_id", "species", ["genus_id"]),
+    ("ix_synonyms_name", "synonyms", ["name"]),
+
+    # Диагноз
+    ("ix_diagnosis_infraturma_id", "diagnosis", ["infraturma_id"]),
+    ("ix_diagnosis_form_id", "diagnosis", ["form_id"]),
+    ("ix_diagnosis_angles_shape_id", "diagnosis", ["angles_shape_id"]),
+    ("ix_diagnosis_area_presence_id", "diagnosis", ["area_presence_id"]),
+    ("ix_diagnosis_outline_id", "diagnosis", ["outline_id"]),
+    ("ix_infraturma_name", "infraturma", ["name"]),
+    ("ix_infraturma_character_of_laesurae_id", "infraturma", ["character_of_laesurae_id"]),
+    ("ix_infraturma_exine_stratification_id", "infraturma", ["exine_stratification_id"]),
+    ("ix_infraturma_exine_type_id", "infraturma", ["exine_type_id"]),
+    ("ix_exine_growth_form_type_id", "exine_growth_form", ["type_id"]),
+    ("ix_exine_growth_form_thickness_id", "exine_growth_form", ["thickness_id"]),
+    ("ix_exine_growth_form_width_id", "exine_growth_form", ["width_id"]),
+    ("ix_exine_growth_form_structure", "exine_growth_form", ["structure"]),
+    ("ix_exoexine_thickness_id", "exoexine", ["thickness_id"]),
+    ("ix_intexine_thickness_id", "intexine", ["thickness_id"]),
+
+    # Справочники без ограничения уникальности (get_or_create_*)
+    ("ix_spore_amb_amb", "spore_amb", ["amb"]),
+    ("ix_spore_sides_shape_side_shape", "spore_sides_shape", ["side_shape"]),
+    ("ix_spore_laesurae_laesurae_shape", "spore_laesurae", ["laesurae_shape"]),
+    ("ix_spore_laesurae_rays_rays_shape", "spore_laesurae_rays", ["rays_shape"]),
+    ("ix_spore_exine_structure_exine_structure", "spore_exine_structure", ["exine_structure"]),
+    ("ix_spore_sculpture_sculpture", "spore_sculpture", ["sculpture"]),
+    ("ix_spore_ornamentation_ornamentation", "spore_ornamentation", ["ornamentation"]),
+
+    # Обратные стороны связующих таблиц (первичный ключ покрывает только прямую сторону)
+    ("ix_genera_synonyms_synonym_id", "genera_synonyms", ["synonym_id", "genus_id"]),
+    ("ix_spore_diagnosis_amb_amb_id", "spore_diagnosis_amb", ["amb_id", "diagnosis_id"]),
+    ("ix_spore_diagnosis_sides_shape_side_shape_id", "spore_diagnosis_sides_shape", ["side_shape_id", "diagnosis_id"]),
+    ("ix_spore_diagnosis_laesurae_laesurae_shape_id", "spore_diagnosis_laesurae", ["laesurae_shape_id", "diagnosis_id"]),
+    ("ix_spore_diagnosis_laesurae_rays_rays_shape_id", "spore_diagnosis_laesurae_rays", ["rays_shape_id", "diagnosis_id"]),
+    ("ix_spore_diagnosis_exine_thickness_thickness_id", "spore_diagnosis_exine_thickness", ["thickness_id", "diagnosis_id"]),
+    ("ix_spore_diagnosis_exine_structure_exine_structure_id", "spore_diagnosis_exine_structure", ["exine_structure_id", "diagnosis_id"]),
+    ("ix_spore_diagnosis_sculpture_sculpture_id", "spore_diagnosis_sculpture", ["sculpture_id", "side_id", "diagnosis_id"]),
+    ("ix_spore_diagnosis_sculpture_side_id", "spore_diagnosis_sculpture", ["side_id"]),
+    ("ix_spore_diagnosis_ornamentation_ornamentation_id", "spore_diagnosis_ornamentation", ["ornamentation_id", "side_id", "diagnosis_id"]),
+    ("ix_spore_diagnosis_ornamentation_side_id", "spore_diagnosis_ornamentation", ["side_id"]),
+    ("ix_genus_geography_location_id", "genus_geography", ["geographic_location_id", "genus_id"]),
+    ("ix_genus_stratigraphy_period_id", "genus_stratigraphy", ["period_id", "genus_id"]),
+    ("ix_species_geography_location_id", "species_geography", ["geographic_location_id", "species_id"]),
+    ("ix_species_stratigraphy_period_id", "species_stratigraphy", ["period_id", "species_id"]),
+
+    # География и стратиграфия
+    ("ix_geographic_location_name", "geographic_location", ["name"]),
+    ("ix_geographic_location_parent_id", "geographic_location", ["parent_id"]),
+    ("ix_stratigraphic_periods_period_epoch_stage", "stratigraphic_periods", ["period", "epoch", "stage"]),
+]
+
+
+# Создает недостающие вторичные индексы и обновляет статистику планировщика
+def create_secondary_indexes(connection):
+    for index_name, table_name, columns in SECONDARY_INDEXES:
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})"
+        ))
+    connection.execute(text("ANALYZE"))
+
+
+# Есть ли в сборке SQLite модуль виртуальных таблиц (rtree, fts5): в некоторых сборках
+# их нет, и тогда индексы на них не создаются (см. OPTIONAL_INDEXES в db/migrations.py).
+# Проверяется один раз созданием пробной таблицы в памяти
+@lru_cache(maxsize=None)
+def sqlite_module_available(module):
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute(f"CREATE VIRTUAL TABLE probe USING {module}(a, b, c)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
@@ -0,0 +1,153 @@
+import contextvars
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Статистика действия пользователя, выполняющегося в текущем потоке
+_current_action = contextvars.ContextVar("sql_action", default=None)
+
+
+# Запросы к БД, выполненные в рамках одного действия пользователя
+# ("open details", "search", "save genus", ...)
+@dataclass
+class ActionStats:
+    action: str
+    statements: int = 0
+    duration: float = 0.0
+    rows: int = 0
+    slowest_duration: float = 0.0
+    slowest_statement: str = ""
+    started: float = field(default_factory=time.time)
+
+    def add_statement(self, statement, duration):
+        self.statements += 1
+        self.duration += duration
+        if duration >= self.slowest_duration:
+            self.slowest_duration = duration
+            self.slowest_statement = " ".join(statement.split())
+
+
+# Курсор sqlite3, считающий выбранные строки: при выполнении SELECT
+# число строк известно только после выборки
+class CountingCursor(sqlite3.Cursor):
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            sql_recorder.record_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        sql_recorder.record_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        sql_recorder.record_rows(len(rows))
+        return rows
+
+
+# Соединение sqlite3 с CountingCursor (передается в sqlite3.connect(factory=...))
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+# Собирает число запросов, время, число строк и самый медленный запрос
+# для каждого действия пользователя. Завершенные действия пишутся в журнал
+# и хранятся в истории для панели отладки
+class SqlRecorder:
+    def __init__(self, history_size=200):
+        self.history = deque(maxlen=history_size)
+        self.unattributed = ActionStats("вне действий")
+        self._lock = threading.Lock()
+
+    # Все запросы внутри блока относятся к действию action.
+    # Вложенные блоки учитываются во внешнем действии
+    @contextmanager
+    def action(self, action):
+        if _current_action.get() is not None:
+            yield _current_action.get()
+            return
+
+        stats = ActionStats(action)
+        token = _current_action.set(stats)
+        try:
+            yield stats
+        finally:
+            _current_action.reset(token)
+            self._finish(stats)
+
+    def record_statement(self, statement, duration):
+        stats = _current_action.get()
+        if stats is None:
+            with self._lock:
+                self.unattributed.add_statement(statement, duration)
+        else:
+            stats.add_statement(statement, duration)
+
+    def record_rows(self, count):
+        stats = _current_action.get()
+        if stats is None:
+            with self._lock:
+                self.unattributed.rows += count
+        else:
+            stats.rows += count
+
+    def recent(self):
+        with self._lock:
+            return list(self.history)
+
+    def clear(self):
+        with self._lock:
+            self.history.clear()
+            self.unattributed = ActionStats("вне действий")
+
+    # Подключает учет запросов к движку SQLAlchemy
+    def attach(self, db_engine):
+        event.listen(db_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(db_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_started"].pop()
+        self.record_statement(statement, duration)
+        # Для INSERT/UPDATE/DELETE число строк известно сразу
+        if cursor.rowcount > 0:
+            self.record_rows(cursor.rowcount)
+
+    def _finish(self, stats):
+        with self._lock:
+            self.history.append(stats)
+        if stats.statements:
+            logger.info("%s: запросов %d, %.1f мс, строк %d; самый медленный %.1f мс: %s",
+                        stats.action, stats.statements, stats.duration * 1000, stats.rows,
+                        stats.slowest_duration * 1000, stats.slowest_statement[:500])
+
+
+sql_recorder = SqlRecorder()
+
+
+# Пишет статистику действий в ротируемый файл журнала
+def setup_sql_log(path, max_bytes=1024 * 1024, backup_count=5):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return handler
@@ -0,0 +1,51 @@
+import numpy as np
+
+from .bitmap_index import FIELD_SOURCES, PAIR_SOURCES, count_bits
+
+
+# Признаки многовходового ключа: поля панели поиска, описывающие саму спору
+KEY_CHARACTERS = list(FIELD_SOURCES) + list(PAIR_SOURCES)
+
+
+# Ранжирует неиспользованные признаки по тому, насколько их наблюдение сузит список
+# кандидатов (результат поиска по filters). Для каждого признака по битовому индексу
+# считаются столбцы матрицы "кандидат x состояние": сколько кандидатов в каждом
+# состоянии и у скольких признак вообще описан. Считая вероятность увидеть состояние
+# пропорциональной числу кандидатов в нем, ожидаемый остаток списка -
+# сумма p * (в состоянии + не описано), энтропия - -сумма p * log2(p).
+# Возвращает [{"label", "expected", "entropy", "described", "states"}] по возрастанию
+# ожидаемого остатка; признаки, которые не сокращают список, не попадают
+def rank_next_characters(index, filters):
+    candidates = index.filter_mask(filters)
+    total = count_bits(candidates)
+    labels = [label for label in KEY_CHARACTERS if not filters.get(label)]
+    if total < 2 or not labels:
+        return []
+
+    counts, owners, described = [], [], []
+    for number, label in enumerate(labels):
+        state_masks = index.state_masks(label)
+        counts.extend(count_bits(candidates & mask) for mask in state_masks)
+        owners.extend([number] * len(state_masks))
+        described.append(count_bits(candidates & index.described_mask(label)))
+
+    counts = np.array(counts, dtype=float)
+    owners = np.array(owners, dtype=np.int64)
+    described = np.array(described, dtype=float)
+
+    state_totals = np.bincount(owners, weights=counts, minlength=len(labels))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = np.where(state_totals[owners] > 0, counts / state_totals[owners], 0)
+        entropy = -np.bincount(owners, weights=np.where(p > 0, p * np.log2(p), 0), minlength=len(labels))
+    expected = np.bincount(owners, weights=p * counts, minlength=len(labels)) + (total - described)
+    states = np.bincount(owners, weights=counts > 0, minlength=len(labels))
+
+    useful = np.flatnonzero((state_totals > 0) & (expected < total - 1e-9))
+    order = useful[np.lexsort((-entropy[useful], expected[useful]))]
+    return [{
+        "label": labels[number],
+        "expected": float(expected[number]),
+        "entropy": float(entropy[number]),
+        "described": int(described[number]),
+        "states": int(states[number]),
+    } for number in order.tolist()]
@@ -0,0 +1,154 @@
+import logging
+
+from .chronostratigraphy import add_period_ages
+from .fulltext import FULLTEXT_TABLE, FULLTEXT_TRIGGERS, create_fulltext_index, fulltext_available
+from .indexes import create_secondary_indexes
+from .geography_closure import create_geography_closure
+from .size_index import SIZE_RTREES, SIZE_RTREE_TRIGGERS, create_size_rtrees, size_rtrees_available
+
+logger = logging.getLogger(__name__)
+
+
+# Ошибка при обновлении структуры БД; версия БД остается на последнем успешном шаге
+class MigrationError(Exception):
+    pass
+
+
+# Версия структуры БД хранится в заголовке файла (PRAGMA user_version)
+def get_schema_version(connection):
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def set_schema_version(connection, version):
+    connection.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+# Шаг 1: вторичные индексы (см. db/indexes.py)
+def _add_secondary_indexes(connection):
+    create_secondary_indexes(connection)
+
+
+# Шаг 2: R-tree по интервалам размеров родов и видов (см. db/size_index.py).
+# Без модуля R-tree шаг пропускается (см. OPTIONAL_INDEXES)
+def _add_size_rtrees(connection):
+    if size_rtrees_available():
+        create_size_rtrees(connection)
+    else:
+        logger.warning("В сборке SQLite нет модуля rtree: поиск по размерам - без R-tree")
+
+
+# Шаг 3: таблица замыкания дерева локаций (см. db/geography_closure.py)
+def _add_geography_closure(connection):
+    create_geography_closure(connection)
+
+
+# Шаг 4: числовой возраст стратиграфических периодов (см. db/chronostratigraphy.py)
+def _add_period_ages(connection):
+    add_period_ages(connection)
+
+
+# Шаг 5: полнотекстовый индекс FTS5 по родам (см. db/fulltext.py).
+# Без модуля FTS5 шаг пропускается (см. OPTIONAL_INDEXES)
+def _add_fulltext_index(connection):
+    if fulltext_available():
+        create_fulltext_index(connection)
+    else:
+        logger.warning("В сборке SQLite нет модуля fts5: быстрый поиск - через LIKE")
+
+
+# Шаг 6: возраст периодов заново - в шаге 4 у перми был и средний отдел,
+# пересекавшийся с верхним (см. EPOCH_AGES)
+def _refresh_period_ages(connection):
+    add_period_ages(connection)
+
+
+# Шаги обновления структуры БД: (версия после шага, описание, функция(connection)).
+# Новые шаги добавляются только в конец списка, уже выпущенные шаги не изменяются
+MIGRATIONS = [
+    (1, "Вторичные индексы", _add_secondary_indexes),
+    (2, "R-tree по размерам", _add_size_rtrees),
+    (3, "Замыкание дерева локаций", _add_geography_closure),
+    (4, "Возраст стратиграфических периодов", _add_period_ages),
+    (5, "Полнотекстовый индекс", _add_fulltext_index),
+    (6, "Возраст стратиграфических периодов (двучленная пермь)", _refresh_period_ages),
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+# Индексы на виртуальных таблицах, модуля которых может не быть в сборке SQLite:
+# (описание, есть ли модуль, таблицы, триггеры, функция создания(connection)).
+# Без модуля шаг миграции пропускается, а поиск идет обычными запросами
+# (размеры - по столбцам таблиц, текст - через LIKE)
+OPTIONAL_INDEXES = [
+    ("R-tree по размерам", size_rtrees_available, list(SIZE_RTREES), SIZE_RTREE_TRIGGERS, create_size_rtrees),
+    ("Полнотекстовый индекс", fulltext_available, [FULLTEXT_TABLE], FULLTEXT_TRIGGERS, create_fulltext_index),
+]
+
+
+# Выполняет действие в отдельной транзакции; при ошибке - откат и MigrationError.
+# Транзакция открывается явно (BEGIN IMMEDIATE): драйвер sqlite3 сам не начинает
+# транзакцию перед DDL, и без этого шаг мог бы примениться частично
+def _in_transaction(connection, title, action):
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+    try:
+        action(connection)
+        connection.exec_driver_sql("COMMIT")
+    except Exception as e:
+        connection.exec_driver_sql("ROLLBACK")
+        raise MigrationError(f"{title}: {e}") from e
+
+
+# Выполняет один шаг вместе с записью новой версии
+def _apply_step(connection, version, description, step):
+    def apply(step_connection):
+        step(step_connection)
+        set_schema_version(step_connection, version)
+    _in_transaction(connection, f"Шаг {version} ({description})", apply)
+
+
+# Приводит индекс на необязательном модуле в соответствие со сборкой SQLite.
+# Модуль есть, а таблиц или триггеров нет (шаг был пропущен сборкой без модуля) -
+# индекс строится заново. Модуля нет, а триггеры остались (БД обновлялась сборкой
+# с модулем) - триггеры удаляются, иначе запись в таблицы завершалась бы ошибкой
+def _check_optional_index(connection, description, available, tables, triggers, create):
+    names = set(connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')").scalars())
+    if available():
+        if all(name in names for name in tables + triggers):
+            return
+        _in_transaction(connection, description, create)
+        logger.info("Индекс построен заново: %s", description)
+    else:
+        present = [name for name in triggers if name in names]
+        if not present:
+            return
+
+        def drop_triggers(step_connection):
+            for name in present:
+                step_connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        _in_transaction(connection, description, drop_triggers)
+        logger.warning("Нет модуля SQLite, индекс не поддерживается: %s", description)
+
+
+# Обновляет структуру БД до последней версии; возвращает номера примененных шагов.
+# Вызывается при запуске приложения и после восстановления БД из резервной копии
+def migrate_database(db_engine):
+    applied = []
+    with db_engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        current = get_schema_version(connection)
+        if current > LATEST_SCHEMA_VERSION:
+            logger.warning("Версия структуры БД (%d) новее, чем поддерживает приложение (%d)",
+                           current, LATEST_SCHEMA_VERSION)
+            return applied
+
+        for version, description, step in MIGRATIONS:
+            if version <= current:
+                continue
+            _apply_step(connection, version, description, step)
+            logger.info("Структура БД обновлена до версии %d: %s", version, description)
+            applied.append(version)
+
+        for description, available, tables, triggers, create in OPTIONAL_INDEXES:
+            _check_optional_index(connection, description, available, tables, triggers, create)
+    return applied
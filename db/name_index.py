@@ -0,0 +1,258 @@
+import bisect
+import re
+import threading
+from collections import Counter, defaultdict
+
+from sqlalchemy import text, bindparam
+
+from .events import genus_changes
+
+# Виды названий в индексе
+GENUS_NAME = "род"
+SYNONYM_NAME = "синоним"
+SPECIES_NAME = "вид"
+OLD_SPECIES_NAME = "прежнее название вида"
+
+# Сколько id родов перечитывать одним запросом при обновлении индекса
+_RELOAD_CHUNK = 500
+
+_WORD_RE = re.compile(r"[^\W\d_][\w-]*")
+# Пометки в названиях ("Acanthotriletes (pars)", "cf. Lophotriletes"), а не эпитеты
+_QUALIFIERS = {"pars", "sp", "spp", "cf", "aff", "emend", "nov", "comb"}
+
+# Названия родов (и их синонимов, видов, прежних названий видов): (id рода, текст, вид названия)
+_NAMES_SQL = f"""
+    SELECT id, name, '{GENUS_NAME}' FROM genera {{genera}}
+    UNION ALL
+    SELECT gs.genus_id, s.name, '{SYNONYM_NAME}' FROM genera_synonyms gs
+        JOIN synonyms s ON s.id = gs.synonym_id {{synonyms}}
+    UNION ALL
+    SELECT genus_id, name, '{SPECIES_NAME}' FROM species {{species}}
+    UNION ALL
+    SELECT genus_id, old_name, '{OLD_SPECIES_NAME}' FROM species WHERE old_name <> '' {{old_names}}"""
+
+_ALL_NAMES = text(_NAMES_SQL.format(genera="", synonyms="", species="", old_names=""))
+_CHANGED_NAMES = text(_NAMES_SQL.format(
+    genera="WHERE id IN :ids", synonyms="WHERE gs.genus_id IN :ids",
+    species="WHERE genus_id IN :ids", old_names="AND genus_id IN :ids",
+)).bindparams(bindparam("ids", expanding=True))
+
+
+# Латинское название без авторов и пометок: "? Crenatisporites" -> "Crenatisporites",
+# "Acanthotriletes falcatus (Knox) Pot. et Kr." -> "Acanthotriletes falcatus".
+# Эпитет вида пишется со строчной буквы, поэтому фамилия автора за ним не берется
+def latin_name(name):
+    words = [word for word in _WORD_RE.findall(name or "") if word.lower() not in _QUALIFIERS]
+    if not words:
+        return None
+    if len(words) > 1 and words[1][0].islower():
+        return f"{words[0]} {words[1]}"
+    return words[0]
+
+
+# Триграммы строки; в начало добавляются два пробела, в конец - ничего:
+# тогда все триграммы начала названия содержатся в триграммах самого названия
+def trigrams(value):
+    padded = "  " + value
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Битовые маски позиций каждой буквы запроса (для edit_distances)
+def query_masks(query):
+    masks = {}
+    for position, char in enumerate(query):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+# Расстояние редактирования (вставка, удаление, замена и перестановка соседних букв)
+# от query до названия name и до ближайшего начала name (для названия, которое
+# еще набирается). Возвращает (до начала, до всего названия) или None, если до начала
+# больше max_distance; расстояние до всего названия больше max_distance заменяется
+# на max_distance + 1.
+# Столбец таблицы расстояний хранится битами разностей соседних ячеек (алгоритм Майерса
+# в варианте Хиро с перестановками), поэтому буква названия обрабатывается
+# несколькими операциями над целыми, а не циклом по буквам запроса
+def edit_distances(query, name, max_distance, masks=None):
+    if masks is None:
+        masks = query_masks(query)
+    length = len(query)
+    all_bits = (1 << length) - 1
+    last_bit = 1 << (length - 1)
+    plus, minus = all_bits, 0
+    diagonal = previous_equal = 0
+    distance = prefix_distance = length
+    for char in name:
+        equal = masks.get(char, 0)
+        transposed = ((~diagonal & equal) << 1) & previous_equal
+        diagonal = (((equal & plus) + plus) ^ plus) | equal | minus | transposed
+        horizontal_plus = minus | (~(diagonal | plus) & all_bits)
+        horizontal_minus = plus & diagonal
+        if horizontal_plus & last_bit:
+            distance += 1
+        elif horizontal_minus & last_bit:
+            distance -= 1
+        horizontal_plus = ((horizontal_plus << 1) | 1) & all_bits
+        horizontal_minus = (horizontal_minus << 1) & all_bits
+        plus = horizontal_minus | (~(diagonal | horizontal_plus) & all_bits)
+        minus = horizontal_plus & diagonal
+        previous_equal = equal
+        if distance < prefix_distance:
+            prefix_distance = distance
+    if prefix_distance > max_distance:
+        return None
+    return prefix_distance, min(distance, max_distance + 1)
+
+
+def _normalize(name):
+    return " ".join(name.casefold().split())
+
+
+# Триграммный индекс латинских названий для подсказок при опечатках.
+# Одинаковые названия (вид в разных родах, общий синоним) хранятся один раз
+# со списком родов. Измененные роды перечитываются по одному (apply_changes)
+class TrigramNameIndex:
+    def __init__(self):
+        self.names = {}
+        self._name_ids = {}
+        self._owners = {}
+        self._postings = defaultdict(set)
+        self._genus_names = defaultdict(set)
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, genus_id, name, kind):
+        name = latin_name(name)
+        if name is None:
+            return
+        key = _normalize(name)
+        name_id = self._name_ids.get(key)
+        if name_id is None:
+            name_id = self._next_id
+            self._next_id += 1
+            self._name_ids[key] = name_id
+            self.names[name_id] = (key, name)
+            self._owners[name_id] = set()
+            for trigram in trigrams(key):
+                self._postings[trigram].add(name_id)
+        self._owners[name_id].add((genus_id, kind))
+        self._genus_names[genus_id].add((name_id, kind))
+
+    def remove_genus(self, genus_id):
+        for name_id, kind in self._genus_names.pop(genus_id, ()):
+            owners = self._owners[name_id]
+            owners.discard((genus_id, kind))
+            if owners:
+                continue
+            key, _ = self.names.pop(name_id)
+            del self._owners[name_id]
+            del self._name_ids[key]
+            for trigram in trigrams(key):
+                postings = self._postings[trigram]
+                postings.discard(name_id)
+                if not postings:
+                    del self._postings[trigram]
+
+    # Перечитывает названия измененных родов; удаленные роды просто убираются
+    def apply_changes(self, session, genus_ids):
+        genus_ids = list(genus_ids)
+        for genus_id in genus_ids:
+            self.remove_genus(genus_id)
+        for start in range(0, len(genus_ids), _RELOAD_CHUNK):
+            chunk = genus_ids[start:start + _RELOAD_CHUNK]
+            for genus_id, name, kind in session.execute(_CHANGED_NAMES, {"ids": chunk}):
+                self.add(genus_id, name, kind)
+
+    # Названия, близкие к query: [(название, расстояние, [(id рода, вид названия), ...])],
+    # сначала самые близкие. Расстояние считается и до начала названия, поэтому
+    # недописанное "Leiotri" находит "Leiotriletes" с расстоянием 0
+    def suggest(self, query, limit=10, max_distance=None, max_candidates=5000):
+        query = _normalize(query)
+        if len(query) < 3:
+            return []
+        if max_distance is None:
+            max_distance = min(3, len(query) // 4 + 1)
+
+        # Каждая правка меняет не больше четырех триграмм (перестановка - четыре):
+        # по числу общих триграмм расстояние не меньше (триграмм запроса - общих) / 4. Кандидаты проверяются
+        # от большего числа общих триграмм к меньшему, пока эта оценка не превысит
+        # допустимое расстояние. Допустимое расстояние - не больше чем на 1 от лучшего
+        # найденного: при точном совпадении названия с тремя опечатками не нужны
+        query_trigrams = trigrams(query)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self._postings.get(trigram, ()))
+
+        # Расстояние до начала названия считается по началу длиной не больше этой:
+        # более длинное начало дальше от запроса, чем на max_distance
+        name_length = len(query) + max_distance
+        masks = query_masks(query)
+        matches = []
+        for checked, (name_id, count) in enumerate(shared.most_common()):
+            allowed = max_distance if not matches else min(max_distance, matches[0][0][0] + 1)
+            if len(matches) >= limit:
+                allowed = min(allowed, matches[limit - 1][0][0])
+            if -(-(len(query_trigrams) - count) // 4) > allowed or checked >= max_candidates:
+                break
+            key, name = self.names[name_id]
+            distances = edit_distances(query, key[:name_length + 1], max_distance, masks)
+            if distances is not None and distances[0] <= allowed:
+                bisect.insort(matches, (distances, len(key), -count, name, name_id))
+                del matches[limit:]
+        best = matches[0][0][0] if matches else 0
+        return [(name, distances[0], sorted(self._owners[name_id]))
+                for distances, _, _, name, name_id in matches if distances[0] <= best + 1]
+
+
+def build_name_index(session):
+    index = TrigramNameIndex()
+    for genus_id, name, kind in session.execute(_ALL_NAMES):
+        index.add(genus_id, name, kind)
+    return index
+
+
+# Хранит индекс названий: строится один раз, затем после каждой зафиксированной
+# сессии перечитываются только измененные в ней роды (шина изменений, db/events.py)
+class NameIndexHolder:
+    def __init__(self):
+        self._index = None
+        self._changed = set()
+        self._lock = threading.Lock()
+
+    def mark_changed(self, genus_ids):
+        with self._lock:
+            self._changed.update(genus_ids)
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+            self._changed.clear()
+
+    # Подписчик шины изменений; удаленные роды тоже перечитываются - их названия уберутся
+    def on_changes(self, changes):
+        if changes.complete:
+            self.mark_changed(changes.genus_ids)
+        else:
+            self.invalidate()
+
+    def get(self, session):
+        with self._lock:
+            if self._index is None:
+                self._changed.clear()
+                self._index = build_name_index(session)
+            elif self._changed:
+                changed, self._changed = self._changed, set()
+                try:
+                    self._index.apply_changes(session, changed)
+                except Exception:
+                    # Индекс мог обновиться частично: при следующем обращении он строится заново
+                    self._index = None
+                    raise
+            return self._index
+
+
+name_index = NameIndexHolder()
+
+genus_changes.subscribe(name_index.on_changes)
@@ -0,0 +1,192 @@
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event, func, select
+
+from .base import Base
+from .crud import filter_genera, filter_species_rows, get_all_options, get_full_genus_data, get_genus_by_name
+from .crud_add_genus import create_full_genus
+from logic.options_manager import get_field_mapping
+
+# Справочники: их размер не зависит от числа родов, поэтому полный просмотр допустим.
+# Все остальные таблицы (роды, диагнозы, виды, связующие таблицы) растут вместе с каталогом
+REFERENCE_TABLES = {
+    "form", "character_of_laesurae", "exine_stratification", "exine_type", "angles_shape",
+    "area_presence", "outline", "infraturma", "spore_amb", "spore_sides_shape", "spore_laesurae",
+    "spore_laesurae_rays", "thickness", "width", "exine_growth_type", "spore_exine_structure",
+    "spore_side", "spore_sculpture", "spore_ornamentation", "geographic_location",
+    "stratigraphic_periods", "geographic_location_closure",
+}
+
+# Доля родов в результате фильтра, начиная с которой полный просмотр таблицы родов
+# (и диагнозов) - правильный выбор планировщика, а не пропущенный индекс
+SCAN_SELECTIVITY_THRESHOLD = 0.1
+
+# Таблицы, из которых get_all_options выбирает все различные значения поля
+OPTION_LISTING_TABLES = {"exine_growth_form"}
+
+_SCAN_RE = re.compile(r"^SCAN (\w+)")
+_ALIAS_RE = re.compile(r"^(\w+?)_\d+$")
+
+
+# Собирает SQL-запросы, которые движок выполняет внутри блока with
+@contextmanager
+def capture_statements(db_engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain_query_plan(connection, statement, parameters):
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[3] for row in rows]
+
+
+# Имя таблицы по имени из плана: SQLAlchemy добавляет к псевдонимам суффикс "_N"
+def _table_name(name):
+    if name in Base.metadata.tables:
+        return name
+    match = _ALIAS_RE.match(name)
+    if match and match.group(1) in Base.metadata.tables:
+        return match.group(1)
+    return name
+
+
+# Возвращает строки плана с полным просмотром таблиц, не являющихся справочниками
+def find_full_scans(plan_lines, allowed_tables=REFERENCE_TABLES):
+    offending = []
+    for line in plan_lines:
+        match = _SCAN_RE.match(line)
+        if not match:
+            continue
+        table = _table_name(match.group(1))
+        if table in Base.metadata.tables and table not in allowed_tables:
+            offending.append(line)
+    return offending
+
+
+# Фильтры для filter_genera: по одному на каждое поле панели поиска
+def _filter_shapes(options):
+    mapping = get_field_mapping()
+    shapes = {}
+    for label, key in mapping.items():
+        values = options.get(key) or []
+        if not values or label.startswith(("Сторона", "Значение")) or label.endswith(" все"):
+            continue
+        shapes[label] = {label: values[:2]}
+
+    if options.get("sculpture_values"):
+        shapes["Скульптура"] = {"Скульптура": [("не указана/любая", options["sculpture_values"][0])]}
+        if options.get("sculpture_sides"):
+            shapes["Скульптура (сторона)"] = {
+                "Скульптура": [(options["sculpture_sides"][0], options["sculpture_values"][0])]
+            }
+    if options.get("ornamentation_values"):
+        shapes["Орнаментация"] = {"Орнаментация": [("не указана/любая", options["ornamentation_values"][0])]}
+    shapes["Размеры"] = {"Размеры": {"length_min": 20.0, "length_max": 60.0}}
+    shapes["Размеры (точка, виды)"] = {
+        "Размеры": {"length_min": 42.0, "width_min": 38.0, "mode": "point", "species": True}
+    }
+    shapes["Возраст"] = {"Возраст": {"base": 346.7, "top": 307.0}}
+    return shapes
+
+
+# Данные рода, при сохранении которого выполняются все add_*/get_or_create_* операции
+def _sample_genus_data(options):
+    def first(key):
+        values = options.get(key) or []
+        return values[0] if values else "-"
+
+    return {
+        "genus": {"name": "QueryPlanCheck", "full_name": "QueryPlanCheck Test, 2025"},
+        "synonyms": [{"name": "QueryPlanCheckSynonym", "source": None}],
+        "diagnosis": {
+            "infraturma": first("infraturma"),
+            "form": first("form"),
+            "sides": options.get("sides_shape", [])[:1],
+            "angles": first("angles_shape"),
+            "laesurae": options.get("laesurae_shape", [])[:1],
+            "laesurae_rays": options.get("laesurae_rays", [])[:1],
+            "area_presence": first("area_presence"),
+            "exine_structure": options.get("exine_structure", [])[:1],
+            "outline_shape": first("outline"),
+            "additional_features": "query plan check",
+            "exine_growth": {"type": first("exine_growth_type"), "thickness": first("exine_growth_thickness")},
+            "exoexine": {"thickness": first("exoexine_thickness")},
+            "intexine": {"thickness": first("intexine_thickness")},
+            "exine_thickness": first("exine_thickness"),
+            "sculpture": [{"side": first("sculpture_sides"), "values": options.get("sculpture_values", [])[:1]}],
+            "ornamentation": [{"side": first("ornamentation_sides"), "values": options.get("ornamentation_values", [])[:1]}],
+        },
+        "stratigraphy": options.get("stratigraphic_periods_all", [])[:2],
+        "geography": options.get("geographic_locations_all", [])[:2],
+        "species": [{
+            "name": "QueryPlanCheck primus",
+            "stratigraphy": options.get("stratigraphic_periods_all", [])[:1],
+            "geography": options.get("geographic_locations_all", [])[:1],
+        }],
+    }
+
+
+# Выполняет горячие запросы приложения и проверяет их планы.
+# Внимание: сохраняет тестовый род, поэтому запускать только на копии БД.
+# Возвращает {название проверки: [(SQL, [строки плана с полным просмотром]), ...]}
+def check_hot_queries(db_engine, session_factory):
+    genera = Base.metadata.tables["genera"]
+    session = session_factory()
+    options = get_all_options(session)
+    genus_name = session.execute(genera.select().limit(1)).first().name
+    genus_count = session.execute(select(func.count()).select_from(genera)).scalar()
+    species_count = session.execute(
+        select(func.count()).select_from(Base.metadata.tables["species"])).scalar()
+    session.close()
+
+    # Для фильтров: если под фильтр попадает большая часть каталога,
+    # просмотр таблиц родов и диагнозов допустим
+    def broad_result(result):
+        if len(result) >= SCAN_SELECTIVITY_THRESHOLD * genus_count:
+            return {"genera", "diagnosis"}
+        return set()
+
+    checks = {"get_all_options": (lambda s: get_all_options(s), lambda result: OPTION_LISTING_TABLES),
+              "get_genus_by_name": (lambda s: get_genus_by_name(s, genus_name), None),
+              "get_full_genus_data": (lambda s: get_full_genus_data(s, genus_name), None)}
+    # Для поиска видов: при широком результате допустим просмотр видов и их родов
+    def broad_species_result(result):
+        if len(result) >= SCAN_SELECTIVITY_THRESHOLD * species_count:
+            return {"species", "genera", "diagnosis"}
+        return set()
+
+    for label, filters in _filter_shapes(options).items():
+        checks[f"filter_genera: {label}"] = (lambda s, f=filters: filter_genera(s, f), broad_result)
+        checks[f"filter_species_rows: {label}"] = (lambda s, f=filters: filter_species_rows(s, f),
+                                                   broad_species_result)
+    checks["create_full_genus (add_*/get_or_create_*)"] = (
+        lambda s: create_full_genus(s, _sample_genus_data(options)), None
+    )
+
+    failures = {}
+    for name, (run, allowance) in checks.items():
+        session = session_factory()
+        with capture_statements(db_engine) as statements:
+            result = run(session)
+        session.close()
+        allowed_tables = REFERENCE_TABLES | (allowance(result) if allowance else set())
+
+        problems = []
+        with db_engine.connect() as connection:
+            for statement, parameters in statements:
+                offending = find_full_scans(explain_query_plan(connection, statement, parameters), allowed_tables)
+                if offending:
+                    problems.append((statement, offending))
+        if problems:
+            failures[name] = problems
+    return failures
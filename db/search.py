@@ -0,0 +1,267 @@
+import html
+import logging
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from config import SEARCH_ENGINE, SEARCH_CACHE_SIZE, SEARCH_REFINE_MAX_IDS, IDENTIFICATION_WEIGHTS, \
+    IDENTIFICATION_TOP_K, SPECIES_BATCH_SIZE, QUICK_SEARCH_LIMIT, QUICK_SEARCH_RANK_MAX, QUICK_SEARCH_SNIPPETS, \
+    NAME_SUGGESTIONS, GENUS_TABLE_PAGE_SIZE
+from .bitmap_index import character_index, UnsupportedFilter, ANY_SIDE, FIELD_SOURCES, STRATIGRAPHY, GEOGRAPHY
+from .crud import filter_genus_table_rows, filter_genus_table_page, get_genus_table_rows, iter_species_rows, \
+    table_order_key
+from .fulltext import search_fulltext, is_refinement, query_tokens
+from .identification import character_matrix
+from .key_characters import rank_next_characters
+from .name_index import name_index
+from .similarity import similarity_store
+from .search_cache import SearchResultCache, normalize_filters, refining_filters
+from .session import engine
+from logic.options_manager import get_field_mapping
+
+logger = logging.getLogger(__name__)
+
+search_result_cache = SearchResultCache(SEARCH_CACHE_SIZE)
+
+# Индексы обновляются по измененным родам (шина изменений, db/events.py),
+# кэш результатов сбрасывается при любой фиксации
+character_index.attach()
+character_matrix.attach()
+search_result_cache.attach(engine)
+
+
+# Сбрасывает индекс и кэш результатов, когда БД изменена в обход сессий
+# (например, восстановлена из резервной копии)
+def invalidate_search_caches():
+    character_index.invalidate()
+    character_matrix.invalidate()
+    search_result_cache.invalidate()
+    similarity_store.invalidate()
+    name_index.invalidate()
+
+
+# Расширенный поиск для главной таблицы: строки (id, название, синонимы, инфратурма)
+# в порядке таблицы (см. table_order_key).
+# Повтор недавнего фильтра берется из search_result_cache, а если фильтр только сужает
+# закэшированный, проверяются лишь найденные тогда роды и лишь изменившиеся поля
+def search_genus_table_rows(session, filters, search_engine=None):
+    return list(_cached_search_rows(session, filters, search_engine))
+
+
+# Строки из search_result_cache (общий список, не изменять) или найденные и добавленные в него
+def _cached_search_rows(session, filters, search_engine=None):
+    key = normalize_filters(filters)
+    rows = search_result_cache.get(key)
+    if rows is not None:
+        return rows
+
+    generation = search_result_cache.generation
+    broader = search_result_cache.find_broader(key)
+    rows = sorted((tuple(row) for row in _run_search(session, filters, search_engine, broader)), key=table_order_key)
+    search_result_cache.put(key, rows, generation)
+    return rows
+
+
+# Страница строк главной таблицы по фильтрам (пустые - все роды): строки после ключа after
+# (см. table_order_key, None - с начала), не больше limit, и есть ли строки дальше.
+# Все роды и поиск запросом к БД читаются по страницам (см. filter_genus_table_page);
+# битовый индекс находит все роды сразу в памяти - страница берется из кэша результатов
+def get_genus_table_page(session, filters, after=None, limit=GENUS_TABLE_PAGE_SIZE, search_engine=None):
+    if filters and (search_engine or SEARCH_ENGINE) == "bitmap":
+        rows = _cached_search_rows(session, filters, search_engine)
+        start = 0 if after is None else _position_after(rows, tuple(after))
+        page = rows[start:start + limit + 1]
+    else:
+        page = [tuple(row) for row in filter_genus_table_page(session, filters, after, limit + 1)]
+    return page[:limit], len(page) > limit
+
+
+# Номер первой строки с ключом больше after в строках, упорядоченных по table_order_key
+def _position_after(rows, after):
+    low, high = 0, len(rows)
+    while low < high:
+        middle = (low + high) // 2
+        if table_order_key(rows[middle]) <= after:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+# Поиск битовым индексом, если он выбран в config.SEARCH_ENGINE,
+# иначе (или если индекс не поддерживает фильтр) - запросом к БД.
+# broader - (ключ, строки) из find_broader: тогда уточняется его результат
+def _run_search(session, filters, search_engine=None, broader=None):
+    within_ids = refining = None
+    if broader is not None:
+        broader_key, candidates = broader
+        within_ids = [row[0] for row in candidates]
+        refining = refining_filters(filters, broader_key)
+
+    if (search_engine or SEARCH_ENGINE) == "bitmap":
+        try:
+            index = character_index.get(session)
+            if within_ids is None:
+                return index.filter_rows(filters)
+            return index.filter_rows(refining, within_ids)
+        except UnsupportedFilter as e:
+            logger.warning("Фильтр %s не поддерживается индексом, используется SQL", e)
+
+    # Слишком длинный список id не помещается в параметры запроса SQLite
+    if within_ids is None or len(within_ids) > SEARCH_REFINE_MAX_IDS:
+        return filter_genus_table_rows(session, filters)
+    return filter_genus_table_rows(session, refining, within_ids)
+
+
+# Текущие строки главной таблицы для измененных родов (после записи в БД):
+# только существующие роды, удовлетворяющие filters (пустые - все роды).
+# Роды из genus_ids, которых нет в результате, из таблицы убираются
+def get_changed_table_rows(session, genus_ids, filters=None):
+    genus_ids = list(genus_ids)
+    if filters and len(genus_ids) <= SEARCH_REFINE_MAX_IDS:
+        rows = filter_genus_table_rows(session, filters, genus_ids)
+    elif filters:
+        changed = set(genus_ids)
+        rows = [row for row in filter_genus_table_rows(session, filters) if row[0] in changed]
+    else:
+        rows = get_genus_table_rows(session, genus_ids)
+    return [tuple(row) for row in rows]
+
+
+# Счетчики кэша результатов расширенного поиска
+def get_search_cache_stats():
+    return search_result_cache.stats()
+
+
+# Строит индексы заранее, чтобы первый поиск не ждал их построения
+def warm_up_search_index(session):
+    if SEARCH_ENGINE == "bitmap":
+        character_index.get(session)
+    name_index.get(session)
+
+
+# Счетчики для выпадающих списков панели поиска: сколько родов дал бы каждый вариант
+# при текущих фильтрах (см. CharacterIndex.facet_counts), и какие признаки
+# полезнее всего определить следующими (см. rank_next_characters).
+# options - результат get_all_options.
+# Возвращает None, если битовый индекс не используется или не поддерживает фильтр
+def get_facet_counts(session, filters, options):
+    if SEARCH_ENGINE != "bitmap":
+        return None
+
+    mapping = get_field_mapping()
+    field_values = {label: options.get(mapping[label], [])
+                    for label in list(FIELD_SOURCES) + [STRATIGRAPHY, GEOGRAPHY]}
+    pair_values = {
+        "Скульптура": ([ANY_SIDE] + options.get("sculpture_sides", []), options.get("sculpture_values", [])),
+        "Орнаментация": ([ANY_SIDE] + options.get("ornamentation_sides", []), options.get("ornamentation_values", [])),
+    }
+    try:
+        index = character_index.get(session)
+        counts, pair_counts = index.facet_counts(filters, field_values, pair_values)
+        next_characters = rank_next_characters(index, filters)
+    except UnsupportedFilter:
+        return None
+    return {"fields": counts, "pairs": pair_counts, "next_characters": next_characters}
+
+
+# Определение по частичному совпадению признаков (см. CharacterMatrix.identify):
+# роды ранжируются по весу совпавших признаков, допускается max_mismatches несовпадений
+def identify_genera(session, filters, max_mismatches=None, top_k=IDENTIFICATION_TOP_K):
+    return character_matrix.get(session).identify(filters, IDENTIFICATION_WEIGHTS, max_mismatches, top_k)
+
+
+# Поиск видов по фильтрам панели поиска: генератор частей строк для таблицы видов
+# (см. iter_species_rows). Выполняется SQL-запросом, кэш родов не используется
+def search_species_rows(session, filters, batch_size=SPECIES_BATCH_SIZE):
+    yield from iter_species_rows(session, filters, batch_size)
+
+
+# Запрос к главной таблице: фильтры панели поиска и текст строки поиска вместе
+# (см. run_genus_query). Предыдущий результат служит промежуточным набором для следующего
+@dataclass
+class GenusQuery:
+    filters: dict
+    search_text: str
+    # Первая страница строк таблицы (см. get_genus_table_page); None - фильтры те же,
+    # что у предыдущего запроса, таблица не меняется
+    rows: Optional[list] = None
+    # Есть ли у таблицы строки дальше первой страницы
+    has_more: bool = False
+    # Роды под фильтрами, среди которых ищется текст (None - фильтров нет или текст не искали)
+    genus_ids: Optional[list] = None
+    # Найденные по тексту [(id рода, фрагмент HTML или None)]; None - текста нет
+    hits: Optional[list] = None
+    # Строки таблицы найденных родов, если таблица загружена не целиком (их страниц может не быть)
+    hit_rows: Optional[list] = None
+    # Все роды, совпавшие с текстом, если их меньше лимита (иначе None); по ним
+    # уточняется следующий запрос. Роды с похожими названиями сюда не входят
+    text_matches: Optional[list] = None
+
+    @property
+    def key(self):
+        return genus_query_key(self.filters, self.search_text)
+
+    # Тот же запрос после записи в БД: строки таблицы уже обновлены по измененным родам,
+    # а роды под фильтрами и совпадения текста нужно искать заново
+    def after_changes(self):
+        return replace(self, rows=None, genus_ids=None, text_matches=None)
+
+
+# Ключ запроса: одинаковые ключи дают одинаковый результат (порядок значений фильтров,
+# регистр и пробелы в тексте не важны)
+def genus_query_key(filters, search_text):
+    return normalize_filters(filters), tuple(query_tokens(search_text))
+
+
+# Выполняет запрос к главной таблице за один проход: первая страница строк по фильтрам
+# (см. get_genus_table_page) и среди всех подходящих родов - найденные по тексту.
+# previous - результат предыдущего запроса, уже показанный в таблице: если фильтры
+# не изменились, строки не перечитываются, а если текст только дописан (см. is_refinement)
+# и прежние совпадения полные, новые ищутся только среди них
+def run_genus_query(session, filters, search_text, previous=None):
+    if previous is not None and previous.key[0] == normalize_filters(filters):
+        query = GenusQuery(filters, search_text, has_more=previous.has_more, genus_ids=previous.genus_ids)
+    else:
+        rows, has_more = get_genus_table_page(session, filters)
+        query = GenusQuery(filters, search_text, rows, has_more)
+
+    if not query_tokens(search_text):
+        return query
+    if filters and query.genus_ids is None:
+        query.genus_ids = [row[0] for row in _cached_search_rows(session, filters)]
+    within_ids = query.genus_ids
+    if query.rows is None and previous.text_matches is not None \
+            and is_refinement(search_text, previous.search_text):
+        # Дописанный текст: искать только среди прежних совпадений (или не искать, если их не было)
+        within_ids = previous.text_matches
+    query.hits = []
+    if within_ids is None or within_ids:
+        query.hits = search_fulltext(session, search_text, within_ids, QUICK_SEARCH_LIMIT, QUICK_SEARCH_RANK_MAX,
+                                     QUICK_SEARCH_SNIPPETS)
+    if len(query.hits) < QUICK_SEARCH_LIMIT:
+        query.text_matches = [genus_id for genus_id, _ in query.hits]
+    if not query.hits:
+        query.hits = _similar_name_hits(session, search_text, query.genus_ids)
+    if query.has_more and query.hits:
+        query.hit_rows = [tuple(row) for row in
+                          get_genus_table_rows(session, [genus_id for genus_id, _ in query.hits])]
+    return query
+
+
+# Если по тексту ничего не найдено, показываются роды с похожими названиями
+# (вероятная опечатка, см. suggest_names) - в подсказке строки указано, какое название найдено.
+# within_ids - только среди этих родов
+def _similar_name_hits(session, search_text, within_ids=None):
+    within = None if within_ids is None else set(within_ids)
+    found = {}
+    for name, _, owners in name_index.get(session).suggest(search_text, QUICK_SEARCH_LIMIT):
+        for genus_id, kind in owners:
+            if genus_id not in found and (within is None or genus_id in within):
+                found[genus_id] = f"Возможно, имелось в виду: <b>{html.escape(name)}</b> ({kind})"
+    return list(found.items())[:QUICK_SEARCH_LIMIT]
+
+
+# Подсказки для строки поиска: латинские названия родов, синонимов и видов,
+# близкие к набранному тексту (с опечаткой или недописанные), сначала самые близкие
+def suggest_names(session, search_text, limit=NAME_SUGGESTIONS):
+    return [name for name, _, _ in name_index.get(session).suggest(search_text, limit)]
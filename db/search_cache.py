@@ -0,0 +1,152 @@
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+from .bitmap_index import PAIR_SOURCES, STRATIGRAPHY, GEOGRAPHY, AGE
+from .size_index import DEFAULT_SIZE_MODE
+
+SIZES = "Размеры"
+SIZE_MODE = "mode"
+SIZE_SPECIES = "species"
+# Режимы поиска по размерам, в которых больший "от" и меньший "до" только сужают результат
+NARROWING_SIZE_MODES = ("within", "overlap")
+# Поля, которые сравниваются только на равенство: пустое значение в них означает "любое"
+EXACT_FIELDS = (STRATIGRAPHY, GEOGRAPHY)
+
+
+def _normalize_field(label, values):
+    if label in (SIZES, AGE):
+        return frozenset(values.items())
+    return frozenset(tuple(value) if isinstance(value, list) else value for value in values)
+
+
+# Неизменяемый ключ фильтра: порядок и повторы значений внутри поля не важны
+def normalize_filters(filters):
+    return frozenset((label, _normalize_field(label, values)) for label, values in filters.items())
+
+
+# Не шире ли фильтр key, чем broader (оба - результат normalize_filters): тогда результат key
+# содержится в результате broader. Поля объединяются через AND, поэтому новые поля только сужают.
+# Внутри обычного поля значения объединяются через OR - сужает подмножество значений;
+# пары (сторона, значение) объединяются через AND - сужает надмножество пар
+def is_narrower(key, broader):
+    fields = dict(key)
+    for label, values in broader:
+        if label not in fields:
+            return False
+        narrowed = fields[label]
+        if label == SIZES:
+            bounds = dict(narrowed)
+            settings = dict(values)
+            if any(bounds.get(name, default) != settings.get(name, default)
+                   for name, default in ((SIZE_MODE, DEFAULT_SIZE_MODE), (SIZE_SPECIES, False))):
+                return False
+            # В режимах "содержит" и "точка" сужение диапазона расширяет результат
+            if settings.get(SIZE_MODE, DEFAULT_SIZE_MODE) not in NARROWING_SIZE_MODES:
+                if narrowed != values:
+                    return False
+                continue
+            for bound_key, bound in values:
+                if bound_key in (SIZE_MODE, SIZE_SPECIES):
+                    continue
+                if bound_key not in bounds:
+                    return False
+                if bound_key.endswith("_min") and bounds[bound_key] < bound:
+                    return False
+                if bound_key.endswith("_max") and bounds[bound_key] > bound:
+                    return False
+        elif label == AGE:
+            # Более узкий интервал возраста: "от" не древнее, "до" не моложе
+            bounds = dict(narrowed)
+            for bound_key, bound in values:
+                if bound_key not in bounds:
+                    return False
+                if bound_key == "base" and bounds[bound_key] > bound:
+                    return False
+                if bound_key == "top" and bounds[bound_key] < bound:
+                    return False
+        elif label in PAIR_SOURCES:
+            if not narrowed >= values:
+                return False
+        elif label in EXACT_FIELDS:
+            if narrowed != values:
+                return False
+        elif not narrowed <= values:
+            return False
+    return True
+
+
+# Поля фильтра filters, условие которых отличается от broader: на результате broader
+# достаточно проверить только их
+def refining_filters(filters, broader):
+    cached = dict(broader)
+    return {label: values for label, values in filters.items()
+            if _normalize_field(label, values) != cached.get(label)}
+
+
+# LRU-кэш результатов расширенного поиска по нормализованному фильтру.
+# Для фильтра, который не шире закэшированного, можно взять кандидатов из кэша
+# (find_broader) и проверить только их. После любой зафиксированной записи в БД
+# кэш очищается; результат поиска, начатого до записи, в кэш не попадет
+class SearchResultCache:
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.hits = 0
+        self.refinements = 0
+        self.misses = 0
+        self.generation = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            rows = self._results.get(key)
+            if rows is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+            return rows
+
+    # Самый узкий из закэшированных результатов, содержащий результат key: (ключ, строки) или None
+    def find_broader(self, key):
+        with self._lock:
+            best = None
+            for cached_key, rows in self._results.items():
+                if is_narrower(key, cached_key) and (best is None or len(rows) < len(best[1])):
+                    best = (cached_key, rows)
+            if best is None:
+                self.misses += 1
+            else:
+                self._results.move_to_end(best[0])
+                self.refinements += 1
+            return best
+
+    # generation - значение self.generation на момент начала поиска
+    def put(self, key, rows, generation):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._results[key] = tuple(rows)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._results.clear()
+
+    def clear(self):
+        self.invalidate()
+        with self._lock:
+            self.hits = 0
+            self.refinements = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "refinements": self.refinements, "misses": self.misses,
+                    "size": len(self._results)}
+
+    def attach(self, db_engine):
+        event.listen(db_engine, "commit", lambda connection: self.invalidate())
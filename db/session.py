@@ -1,31 +1,230 @@
-from contextlib import contextmanager
-
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker
-from config import DATABASE_URL
-
-engine = create_engine(DATABASE_URL, echo=False, connect_args={"check_same_thread": False})
-
-# Включение поддержки внешних ключей для SQLite
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
-
-SessionLocal = sessionmaker(bind=engine)
-
-def dispose_engine():
-    engine.dispose()
-
-@contextmanager
-def get_db_session():
-    session = SessionLocal()
-    try:
-        yield session
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
\ No newline at end of file
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from config import DATABASE_URL, DB_PERFORMANCE_PROFILE, USE_MEMORY_REPLICA, SQL_INSTRUMENTATION
+from .instrumentation import InstrumentedConnection, sql_recorder
+
+# Профили производительности SQLite: набор PRAGMA, применяемых к каждому соединению.
+# "default" - поведение по умолчанию (журнал delete, полная синхронизация),
+# "wal" - журнал WAL без ожидания fsync на каждую транзакцию,
+# "performance" - WAL плюс отображение файла в память и увеличенный кэш страниц.
+# Режим журнала хранится в самом файле БД, поэтому "default" задает его явно:
+# иначе после запуска с "wal" или "performance" файл так и остался бы в WAL
+PERFORMANCE_PROFILES = {
+    "default": {
+        "foreign_keys": "ON",
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+    "wal": {
+        "foreign_keys": "ON",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "performance": {
+        "foreign_keys": "ON",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -32000,  # в КиБ (отрицательное значение), т.е. ~32 МБ
+    },
+}
+
+
+# Применяет PRAGMA выбранного профиля к DBAPI-соединению
+def apply_pragmas(dbapi_connection, profile_name):
+    if profile_name not in PERFORMANCE_PROFILES:
+        raise ValueError(f"Неизвестный профиль производительности БД: {profile_name}")
+
+    cursor = dbapi_connection.cursor()
+    for pragma, value in PERFORMANCE_PROFILES[profile_name].items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+# Создает движок SQLAlchemy, у которого каждое соединение настраивается профилем
+def create_db_engine(url=DATABASE_URL, profile_name=DB_PERFORMANCE_PROFILE, **kwargs):
+    connect_args = {"check_same_thread": False}
+    if SQL_INSTRUMENTATION:
+        connect_args["factory"] = InstrumentedConnection
+    db_engine = create_engine(url, echo=False, connect_args=connect_args, **kwargs)
+
+    @event.listens_for(db_engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, profile_name)
+
+    return db_engine
+
+
+engine = create_db_engine()
+
+SessionLocal = sessionmaker(bind=engine)
+
+
+# Копия БД в памяти для операций чтения (поиск, карточка рода, справочники, экспорт).
+# Одна база в памяти с общим кэшем (cache=shared): ее держит открытой отдельное соединение,
+# а каждая сессия чтения получает из пула свое соединение к ней, так что фоновые задачи
+# (logic/workers.py) читают параллельно. После записи в файл копия помечается устаревшей
+# и перечитывается целиком через backup API один раз перед следующей сессией чтения,
+# а не после каждой записи
+_REPLICA_URI = "file:miospores_replica?mode=memory&cache=shared"
+_replica_lock = threading.Lock()
+_replica_keeper = None
+_replica_stale = True
+
+
+# Блокировка "читатели-писатель" для копии в памяти: сессии чтения держат ее совместно
+# от первого запроса до конца транзакции, обновление копии - монопольно. Иначе backup
+# перезаписал бы базу под результатами, которые другой поток еще читает (yield_per)
+class _ReplicaAccess:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._local = threading.local()
+
+    # Сколько сессий чтения открыто в текущем потоке
+    def thread_readers(self):
+        return getattr(self._local, "readers", 0)
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writing:
+                self._condition.wait()
+            self._readers += 1
+        self._local.readers = self.thread_readers() + 1
+
+    def release_read(self):
+        self._local.readers = self.thread_readers() - 1
+        with self._condition:
+            self._readers -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+_replica_access = _ReplicaAccess()
+
+
+# Соединение, которое держит базу в памяти открытой и в которое копируется файл
+def _get_replica_keeper():
+    global _replica_keeper
+    with _replica_lock:
+        if _replica_keeper is None:
+            _replica_keeper = sqlite3.connect(_REPLICA_URI, uri=True, check_same_thread=False)
+        return _replica_keeper
+
+
+# Соединение пула сессий чтения. Пул выдает соединение одному потоку за раз,
+# но возвращается оно из разных потоков, поэтому проверка потока sqlite3 отключена
+def _connect_replica():
+    _get_replica_keeper()
+    factory = InstrumentedConnection if SQL_INSTRUMENTATION else sqlite3.Connection
+    return sqlite3.connect(_REPLICA_URI, uri=True, check_same_thread=False, factory=factory)
+
+
+# Копирует текущее содержимое файла БД в копию в памяти. Ждет завершения открытых
+# сессий чтения других потоков; если сессия чтения открыта в этом же потоке,
+# копия не обновляется (иначе поток ждал бы сам себя) - вложенная сессия видит
+# те же данные, что и внешняя
+def sync_memory_replica(force=False):
+    global _replica_stale
+    if not USE_MEMORY_REPLICA:
+        return
+    if not (_replica_stale or force) or _replica_access.thread_readers():
+        return
+
+    with _replica_access.write():
+        if not (_replica_stale or force):
+            return
+        _replica_stale = False
+        source = engine.raw_connection()
+        try:
+            source.driver_connection.backup(_get_replica_keeper())
+        except Exception:
+            _replica_stale = True
+            raise
+        finally:
+            source.close()
+
+
+# Помечает копию в памяти устаревшей: она будет перечитана перед следующим чтением
+def invalidate_memory_replica():
+    global _replica_stale
+    _replica_stale = True
+
+
+# Любая зафиксированная транзакция на файле делает копию в памяти устаревшей
+@event.listens_for(engine, "commit")
+def _mark_replica_stale(connection):
+    invalidate_memory_replica()
+
+
+if USE_MEMORY_REPLICA:
+    read_engine = create_engine("sqlite://", creator=_connect_replica, poolclass=QueuePool)
+else:
+    read_engine = engine
+
+ReadSessionLocal = sessionmaker(bind=read_engine)
+
+# Учет запросов по действиям пользователя (см. db/instrumentation.py)
+if SQL_INSTRUMENTATION:
+    sql_recorder.attach(engine)
+    if read_engine is not engine:
+        sql_recorder.attach(read_engine)
+
+
+# Перед первым запросом транзакции сессии чтения подтягиваем изменения из файла
+# и занимаем копию в памяти до конца транзакции
+@event.listens_for(ReadSessionLocal, "do_orm_execute")
+def _sync_replica_before_read(orm_execute_state):
+    if not USE_MEMORY_REPLICA:
+        return
+    session = orm_execute_state.session
+    if session.info.get("replica_read"):
+        return
+    sync_memory_replica()
+    _replica_access.acquire_read()
+    session.info["replica_read"] = True
+
+
+@event.listens_for(ReadSessionLocal, "after_transaction_end")
+def _release_replica_after_read(session, transaction):
+    if transaction.parent is None and session.info.pop("replica_read", False):
+        _replica_access.release_read()
+
+
+def dispose_engine():
+    engine.dispose()
+    invalidate_memory_replica()
+
+@contextmanager
+def get_db_session():
+    session = SessionLocal()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
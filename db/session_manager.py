@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from .events import defer_publishing, publish_changes
+from .instrumentation import sql_recorder
+from .session import SessionLocal, ReadSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+# Сведения о завершенной сессии: сколько объектов она держала в карте идентичности
+@dataclass
+class SessionReport:
+    kind: str
+    action: str
+    objects: int
+    duration: float
+
+
+# Управляет короткоживущими сессиями: отдельная сессия чтения на каждое действие
+# пользователя и единица работы (unit of work) с явной фиксацией для записи.
+# Вместо одной сессии на все время работы приложения, у которой карта идентичности
+# только растет и хранит устаревшие объекты
+class SessionManager:
+    def __init__(self, read_factory=ReadSessionLocal, write_factory=SessionLocal, history_size=200):
+        self.read_factory = read_factory
+        self.write_factory = write_factory
+        self.reports = deque(maxlen=history_size)
+        self._open_sessions = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    # Сессия чтения на время одного действия (поиск, открытие карточки, экспорт).
+    # Загруженные объекты после выхода остаются доступными в отсоединенном виде.
+    # Запросы сессии учитываются в статистике действия action
+    @contextmanager
+    def read(self, action="read"):
+        session = self.read_factory()
+        started = time.perf_counter()
+        self._register(session)
+        try:
+            with sql_recorder.action(action):
+                yield session
+        finally:
+            self._finish(session, "read", action, started)
+
+    # Единица работы для записи: фиксация при успешном выходе, откат при ошибке.
+    # Изменения родов публикуются на шине (db/events.py) один раз после закрытия сессии;
+    # и при ошибке тоже - промежуточные шаги функций crud могли быть уже зафиксированы
+    @contextmanager
+    def write(self, action="write"):
+        session = self.write_factory()
+        defer_publishing(session)
+        started = time.perf_counter()
+        self._register(session)
+        try:
+            with sql_recorder.action(action):
+                yield session
+                session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self._finish(session, "write", action, started)
+            publish_changes(session)
+
+    # Число объектов в картах идентичности открытых в данный момент сессий
+    def open_objects(self):
+        with self._lock:
+            return sum(len(session.identity_map) for session in self._open_sessions)
+
+    def open_session_count(self):
+        with self._lock:
+            return len(self._open_sessions)
+
+    # Закрывает все незавершенные сессии (например, перед сбросом базы данных)
+    def close_all(self):
+        with self._lock:
+            sessions = list(self._open_sessions)
+        for session in sessions:
+            session.close()
+
+    def _register(self, session):
+        with self._lock:
+            self._open_sessions.add(session)
+
+    def _finish(self, session, kind, action, started):
+        report = SessionReport(
+            kind=kind,
+            action=action,
+            objects=len(session.identity_map),
+            duration=time.perf_counter() - started,
+        )
+        session.close()
+        with self._lock:
+            self._open_sessions.discard(session)
+            self.reports.append(report)
+        logger.debug("Сессия %s (%s): %d объектов, %.1f мс",
+                     kind, action, report.objects, report.duration * 1000)
+
+
+session_manager = SessionManager()
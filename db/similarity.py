@@ -0,0 +1,237 @@
+import hashlib
+import logging
+import os
+import threading
+
+import numpy as np
+from sqlalchemy import text
+
+from config import SIMILARITY_PATH
+from .bitmap_index import FIELD_SOURCES, PAIR_SOURCES
+from .events import genus_changes
+from .identification import SIZE_CHARACTERS, character_matrix
+
+logger = logging.getLogger(__name__)
+
+
+# Признаки родов для сходства: по каждому признаку диагноза - матрица "род x состояние"
+# (0/1), по размерам - середина диапазона. Строки идут в порядке ids
+class SimilarityFeatures:
+    def __init__(self, ids, blocks, sizes):
+        self.ids = ids
+        self.blocks = blocks
+        self.sizes = sizes
+
+    # Отпечаток признаков: по нему матрица с диска сверяется с данными БД
+    def fingerprint(self):
+        digest = hashlib.sha1(np.asarray(self.ids, dtype=np.int64).tobytes())
+        for array in self.blocks + self.sizes:
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    # Разброс середин по каждому размеру (0, если размер нигде не указан)
+    def size_ranges(self):
+        return np.array([np.nanmax(values) - np.nanmin(values) if np.any(~np.isnan(values)) else 0.0
+                         for values in self.sizes])
+
+
+def build_features(matrix, ids):
+    row_of = {row[0]: position for position, row in enumerate(matrix.rows)}
+    order = np.array([row_of.get(genus_id, -1) for genus_id in ids], dtype=np.int64)
+    present = order >= 0
+
+    blocks = []
+    for label in list(FIELD_SOURCES) + list(PAIR_SOURCES):
+        columns = matrix.states.get(label, {})
+        if label in PAIR_SOURCES:
+            # Скульптура и орнаментация сравниваются по значениям без учета стороны
+            columns = {value: positions for value, positions in columns.items() if value[0] is None}
+        if not columns:
+            continue
+        by_matrix_row = np.zeros((len(matrix.rows), len(columns)), dtype=np.float32)
+        for column, positions in enumerate(columns.values()):
+            by_matrix_row[positions, column] = 1
+        block = np.zeros((len(ids), len(columns)), dtype=np.float32)
+        block[present] = by_matrix_row[order[present]]
+        blocks.append(block)
+
+    sizes = []
+    for min_key, max_key in SIZE_CHARACTERS.values():
+        genus_min = np.full(len(ids), np.nan)
+        genus_max = np.full(len(ids), np.nan)
+        genus_min[present] = matrix.sizes[min_key][order[present]]
+        genus_max[present] = matrix.sizes[max_key][order[present]]
+        # Если указана только одна граница, серединой считается она
+        sizes.append(np.where(np.isnan(genus_min), genus_max,
+                              np.where(np.isnan(genus_max), genus_min, (genus_min + genus_max) / 2)))
+    return SimilarityFeatures(list(ids), blocks, sizes)
+
+
+# Сходство родов positions со всеми родами в духе коэффициента Гауэра: среднее по признакам,
+# описанным у обоих родов. Для признаков диагноза - коэффициент Жаккара множеств состояний,
+# для размеров - 1 - |разность середин| / size_range (не меньше 0). Возвращает матрицу len(positions) x n
+def similarity_rows(features, positions, size_ranges):
+    positions = np.asarray(positions, dtype=np.int64)
+    total = np.zeros((len(positions), len(features.ids)), dtype=np.float32)
+    described = np.zeros((len(positions), len(features.ids)), dtype=np.float32)
+
+    for block in features.blocks:
+        counts = block.sum(axis=1)
+        common = block[positions] @ block.T
+        union = counts[positions][:, None] + counts[None, :] - common
+        both = (counts[positions][:, None] > 0) & (counts[None, :] > 0)
+        total += np.where(both, common / np.maximum(union, 1), 0)
+        described += both
+
+    for values, size_range in zip(features.sizes, size_ranges):
+        known = ~np.isnan(values)
+        both = known[positions][:, None] & known[None, :]
+        if size_range > 0:
+            with np.errstate(invalid="ignore"):
+                closeness = np.clip(1 - np.abs(values[positions][:, None] - values[None, :]) / size_range, 0, 1)
+        else:
+            closeness = np.ones(both.shape)
+        total += np.where(both, closeness, 0)
+        described += both
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(described > 0, total / described, 0).astype(np.float32)
+
+
+# Матрица попарного сходства родов, сохраняемая на диск (.npz) вместе с отпечатком
+# признаков и диапазонами размеров. При изменении рода пересчитываются только его строка
+# и столбец, новые роды добавляются, удаленные убираются. Полный пересчет - при первом
+# запуске, после восстановления БД (invalidate), если файл не читается, если отпечаток
+# не совпадает с данными БД (род изменен до закрытия приложения без пересчета или другим
+# процессом) и если изменились диапазоны размеров (от них зависят все строки)
+class SimilarityStore:
+    def __init__(self, path):
+        self.path = path
+        self.ids = None
+        self.matrix = None
+        self.size_ranges = None
+        self.fingerprint = None
+        self._verified = False
+        self._changed = set()
+        self._lock = threading.Lock()
+
+    def mark_changed(self, genus_ids):
+        with self._lock:
+            self._changed.update(genus_ids)
+
+    # Подписчик шины изменений. Если список измененных родов неизвестен, матрица
+    # перестает считаться сверенной: следующий ensure сравнит отпечаток с данными БД
+    # и при расхождении пересчитает ее целиком
+    def on_changes(self, changes):
+        if changes.complete:
+            self.mark_changed(changes.genus_ids)
+        else:
+            with self._lock:
+                self._verified = False
+
+    def invalidate(self):
+        with self._lock:
+            self.ids = self.matrix = self.size_ranges = self.fingerprint = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                self.ids = data["ids"].tolist()
+                self.matrix = data["matrix"]
+                self.size_ranges = data["size_ranges"]
+                self.fingerprint = str(data["fingerprint"])
+        except Exception as e:
+            logger.warning("Не удалось прочитать матрицу сходства %s: %s", self.path, e)
+            self.ids = self.matrix = self.size_ranges = self.fingerprint = None
+
+    def _save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as file:
+            np.savez(file, ids=np.array(self.ids, dtype=np.int64), matrix=self.matrix,
+                     size_ranges=self.size_ranges, fingerprint=np.array(self.fingerprint))
+        os.replace(temp_path, self.path)
+
+    # Приводит матрицу в соответствие с текущим составом родов и пересчитывает измененные.
+    # Матрица с диска сначала сверяется по отпечатку; дальше изменения отслеживает шина
+    def ensure(self, session):
+        with self._lock:
+            if self.matrix is None:
+                self._load()
+                self._verified = False
+            ids = [genus_id for (genus_id,) in session.execute(text("SELECT id FROM genera ORDER BY id"))]
+            if self._verified and ids == self.ids and not self._changed:
+                return
+
+            features = build_features(character_matrix.get(session), ids)
+            fingerprint = features.fingerprint()
+            size_ranges = features.size_ranges()
+            if fingerprint == self.fingerprint and self.matrix is not None:
+                self._verified = True
+                self._changed.clear()
+                return
+
+            if self.matrix is None or not self._verified or not np.array_equal(size_ranges, self.size_ranges):
+                self.matrix = similarity_rows(features, range(len(ids)), size_ranges)
+                logger.info("Матрица сходства рассчитана заново: %d родов", len(ids))
+            else:
+                old_position = {genus_id: position for position, genus_id in enumerate(self.ids)}
+                kept = [(position, old_position[genus_id]) for position, genus_id in enumerate(ids)
+                        if genus_id in old_position and genus_id not in self._changed]
+                matrix = np.zeros((len(ids), len(ids)), dtype=np.float32)
+                if kept:
+                    new, old = (np.array(side) for side in zip(*kept))
+                    matrix[np.ix_(new, new)] = self.matrix[np.ix_(old, old)]
+
+                kept_positions = {position for position, _ in kept}
+                dirty = [position for position in range(len(ids)) if position not in kept_positions]
+                if dirty:
+                    rows = similarity_rows(features, dirty, size_ranges)
+                    matrix[dirty, :] = rows
+                    matrix[:, dirty] = rows.T
+                self.matrix = matrix
+                logger.info("Матрица сходства обновлена: пересчитано родов %d", len(dirty))
+
+            self.ids = ids
+            self.size_ranges = size_ranges
+            self.fingerprint = fingerprint
+            self._verified = True
+            self._changed.clear()
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning("Не удалось сохранить матрицу сходства %s: %s", self.path, e)
+
+    # top_n самых похожих на genus_id родов: [(id, сходство от 0 до 1)]
+    def most_similar(self, session, genus_id, top_n):
+        self.ensure(session)
+        with self._lock:
+            if genus_id not in self.ids:
+                return []
+            position = self.ids.index(genus_id)
+            row = self.matrix[position].copy()
+            row[position] = -1
+            top_n = min(top_n, len(row) - 1)
+            if top_n <= 0:
+                return []
+            top = np.argpartition(-row, top_n - 1)[:top_n]
+            top = top[np.argsort(-row[top], kind="stable")]
+            return [(self.ids[other], float(row[other])) for other in top.tolist()]
+
+
+similarity_store = SimilarityStore(SIMILARITY_PATH)
+
+
+# Строки измененных родов в матрице сходства пересчитываются после фиксации
+# (шина изменений, db/events.py): до нее новых данных не видно другим сессиям
+genus_changes.subscribe(similarity_store.on_changes)
+
+
+# Похожие роды для вкладки описания: [(название, инфратурма, сходство)]
+def get_similar_genera(session, genus_id, top_n):
+    similar = similarity_store.most_similar(session, genus_id, top_n)
+    rows = {row[0]: row for row in character_matrix.get(session).rows}
+    return [(rows[other][1], rows[other][3], score) for other, score in similar if other in rows]
@@ -0,0 +1,263 @@
+import copy
+
+import numpy as np
+from sqlalchemy import text, bindparam
+
+from .indexes import sqlite_module_available
+
+# Режимы поиска по размерам (ключ "mode" в фильтре "Размеры") и их названия в интерфейсе.
+# Диапазон запроса задается полями *_min/*_max; в режиме "point" точка - *_min (или *_max)
+SIZE_MODES = {
+    "within": "Диапазон рода внутри заданного",
+    "overlap": "Пересекается с заданным",
+    "contains": "Содержит заданный диапазон",
+    "point": "Содержит точку (измеренное зерно)",
+}
+DEFAULT_SIZE_MODE = "within"
+
+# Измерения: (столбец минимума, столбец максимума)
+SIZE_DIMENSIONS = {
+    "length": ("length_min", "length_max"),
+    "width": ("width_min", "width_max"),
+}
+
+# Значение вместо неизвестного измерения в R-tree (строка должна иметь обе координаты)
+_RTREE_UNKNOWN = 1e30
+# R-tree хранит координаты как float32 (с округлением наружу); условия на R-tree
+# ослабляются на эту долю, точная проверка выполняется по столбцам таблицы
+_RTREE_SLACK = 1e-6
+
+# R-tree по размерам родов и видов и триггеры, поддерживающие их при записи
+SIZE_RTREES = {
+    "genus_size_rtree": "genera",
+    "species_size_rtree": "species",
+}
+SIZE_RTREE_TRIGGERS = [f"{rtree}_{event}" for rtree in SIZE_RTREES for event in ("insert", "update", "delete")]
+
+
+# Есть ли модуль R-tree в сборке SQLite; без него размеры сравниваются по столбцам таблиц
+def size_rtrees_available():
+    return sqlite_module_available("rtree")
+
+
+# Условия поиска по размерам: [(измерение, конец, "<=" или ">=", значение)] и учитывать ли виды.
+# Конец "min"/"max" - значение столбца как есть, "lo"/"hi" - граница с подстановкой
+# второй, если одна не указана.
+# within: min >= от, max <= до (как раньше: неизвестный конец не подходит);
+# overlap: lo <= до, hi >= от; contains: lo <= от, hi >= до; point: lo <= x <= hi
+def size_conditions(size_filters):
+    mode = size_filters.get("mode", DEFAULT_SIZE_MODE)
+    if mode not in SIZE_MODES:
+        raise ValueError(f"Неизвестный режим поиска по размерам: {mode}")
+
+    conditions = []
+    for dimension, (min_key, max_key) in SIZE_DIMENSIONS.items():
+        low, high = size_filters.get(min_key), size_filters.get(max_key)
+        if low is None and high is None:
+            continue
+        if mode == "within":
+            if low is not None:
+                conditions.append((dimension, "min", ">=", low))
+            if high is not None:
+                conditions.append((dimension, "max", "<=", high))
+        elif mode == "overlap":
+            if high is not None:
+                conditions.append((dimension, "lo", "<=", high))
+            if low is not None:
+                conditions.append((dimension, "hi", ">=", low))
+        else:
+            if mode == "point":
+                low = high = low if low is not None else high
+            else:
+                low, high = (low if low is not None else high), (high if high is not None else low)
+            conditions.append((dimension, "lo", "<=", low))
+            conditions.append((dimension, "hi", ">=", high))
+    return conditions, bool(size_filters.get("species"))
+
+
+# Координата R-tree для условия: любой конец интервала лежит внутри прямоугольника,
+# поэтому "конец <= x" влечет "нижняя граница <= x", а "конец >= x" - "верхняя >= x"
+def rtree_coordinate(dimension, op):
+    return f"{dimension}_lo" if op == "<=" else f"{dimension}_hi"
+
+
+# Значение для условия на координату R-tree, которое заведомо не уже точного условия
+def rtree_bound(op, value):
+    slack = abs(value) * _RTREE_SLACK + _RTREE_SLACK
+    return value + slack if op == "<=" else value - slack
+
+
+# Строка R-tree из строки таблицы (prefix - "NEW." в триггерах, "" при заполнении).
+# Прямоугольник R-tree содержит все концы интервала (в данных встречается min > max),
+# неизвестное измерение занимает всю ось, строки совсем без размеров в R-tree не попадают
+def _rtree_values_sql(prefix):
+    columns = []
+    for min_column, max_column in SIZE_DIMENSIONS.values():
+        low = f"coalesce({prefix}{min_column}, {prefix}{max_column})"
+        high = f"coalesce({prefix}{max_column}, {prefix}{min_column})"
+        columns.append(f"coalesce(min({low}, {high}), -{_RTREE_UNKNOWN})")
+        columns.append(f"coalesce(max({low}, {high}), {_RTREE_UNKNOWN})")
+    known = ", ".join(f"{prefix}{column}" for bounds in SIZE_DIMENSIONS.values() for column in bounds)
+    return f"{prefix}id, {', '.join(columns)}", f"coalesce({known}) IS NOT NULL"
+
+
+# Создает R-tree по размерам, заполняет их и добавляет триггеры синхронизации
+def create_size_rtrees(connection):
+    coordinates = ", ".join(f"{dimension}_lo, {dimension}_hi" for dimension in SIZE_DIMENSIONS)
+    size_columns = ", ".join(column for bounds in SIZE_DIMENSIONS.values() for column in bounds)
+    for rtree, table in SIZE_RTREES.items():
+        connection.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree(id, {coordinates})"))
+        connection.execute(text(f"DELETE FROM {rtree}"))
+        values, known = _rtree_values_sql("")
+        connection.execute(text(f"INSERT INTO {rtree} SELECT {values} FROM {table} WHERE {known}"))
+
+        values, known = _rtree_values_sql("NEW.")
+        insert_row = f"INSERT INTO {rtree} SELECT {values} WHERE {known};"
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {rtree}_insert AFTER INSERT ON {table} BEGIN "
+            f"{insert_row} END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {rtree}_update AFTER UPDATE OF id, {size_columns} ON {table} BEGIN "
+            f"DELETE FROM {rtree} WHERE id = OLD.id; {insert_row} END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {rtree}_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {rtree} WHERE id = OLD.id; END"
+        ))
+
+
+# Интервальный индекс размеров в памяти для битового индекса: для каждого измерения
+# и конца - отсортированные значения (без неизвестных) и номера записей в этом порядке.
+# Записи - роды и виды; owners - позиция рода, к которому относится запись
+class _SizeEntries:
+    def __init__(self, owners, sizes):
+        self.owners = np.asarray(owners, dtype=np.int64)
+        self.values = {}
+        self.sorted = {}
+        for dimension, (min_key, max_key) in SIZE_DIMENSIONS.items():
+            raw_min, raw_max = sizes[min_key], sizes[max_key]
+            endpoints = {
+                "min": raw_min,
+                "max": raw_max,
+                "lo": np.where(np.isnan(raw_min), raw_max, raw_min),
+                "hi": np.where(np.isnan(raw_max), raw_min, raw_max),
+            }
+            for endpoint, values in endpoints.items():
+                known = np.flatnonzero(~np.isnan(values))
+                order = known[np.argsort(values[known], kind="stable")]
+                self.values[dimension, endpoint] = values
+                self.sorted[dimension, endpoint] = (values[order], order)
+
+    # Записи, удовлетворяющие всем условиям: первое отбирается двоичным поиском
+    # по самому избирательному условию, остальные проверяются на найденных
+    def matching(self, conditions):
+        ranges = []
+        for dimension, endpoint, op, value in conditions:
+            values, order = self.sorted[dimension, endpoint]
+            if op == "<=":
+                ranges.append((np.searchsorted(values, value, side="right"), order, True))
+            else:
+                ranges.append((len(values) - np.searchsorted(values, value, side="left"), order, False))
+        count, order, prefix = min(ranges, key=lambda item: item[0])
+        found = order[:count] if prefix else order[len(order) - count:]
+
+        for dimension, endpoint, op, value in conditions:
+            values = self.values[dimension, endpoint][found]
+            with np.errstate(invalid="ignore"):
+                found = found[values <= value if op == "<=" else values >= value]
+        return found
+
+
+# Проверка одной записи ({столбец: значение или None}) условиями size_conditions -
+# так же, как _SizeEntries.matching проверяет все записи сразу
+def sizes_match(sizes, conditions):
+    for dimension, endpoint, op, value in conditions:
+        low, high = (sizes[column] for column in SIZE_DIMENSIONS[dimension])
+        if endpoint == "lo":
+            actual = low if low is not None else high
+        elif endpoint == "hi":
+            actual = high if high is not None else low
+        else:
+            actual = low if endpoint == "min" else high
+        if actual is None or not (actual <= value if op == "<=" else actual >= value):
+            return False
+    return True
+
+
+class SizeIntervalIndex:
+    def __init__(self, genus_count, genus_sizes, species_owners, species_sizes):
+        self.genus_count = genus_count
+        self.genera = _SizeEntries(np.arange(genus_count), genus_sizes)
+        self.species = _SizeEntries(species_owners, species_sizes)
+        # Измененные после построения роды: их записи в отсортированных массивах
+        # не учитываются, а новые размеры (рода и его видов) проверяются по одной
+        self.patched = {}
+
+    # Булев массив по позициям родов для фильтра "Размеры"
+    def matching_genera(self, size_filters):
+        conditions, include_species = size_conditions(size_filters)
+        result = np.zeros(self.genus_count, dtype=bool)
+        if not conditions:
+            result[:] = True
+            return result
+        result[self.genera.owners[self.genera.matching(conditions)]] = True
+        if include_species:
+            result[self.species.owners[self.species.matching(conditions)]] = True
+        if self.patched:
+            result[list(self.patched)] = False
+            for position, (genus_sizes, species_sizes) in self.patched.items():
+                if genus_sizes is not None and sizes_match(genus_sizes, conditions):
+                    result[position] = True
+                elif include_species and any(sizes_match(sizes, conditions) for sizes in species_sizes):
+                    result[position] = True
+        return result
+
+    # Копия индекса, в которой размеры родов positions ({id рода: позиция}) заменены
+    # текущими из БД; удаленные роды (их нет в genera) не подходят ни под какой фильтр.
+    # genus_count - число позиций с учетом добавленных родов
+    def with_changes(self, session, positions, genus_count):
+        index = copy.copy(self)
+        index.genus_count = genus_count
+        index.patched = dict(self.patched)
+        index._read_patches(session, positions)
+        return index
+
+    def _read_patches(self, session, positions):
+        columns = [column for bounds in SIZE_DIMENSIONS.values() for column in bounds]
+        for position in positions.values():
+            self.patched[position] = (None, [])
+        params = {"ids": list(positions)}
+        for genus_id, *sizes in session.execute(text(
+                f"SELECT id, {', '.join(columns)} FROM genera WHERE id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True)), params):
+            self.patched[positions[genus_id]] = (dict(zip(columns, sizes)), [])
+        for genus_id, *sizes in session.execute(text(
+                f"SELECT genus_id, {', '.join(columns)} FROM species WHERE genus_id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True)), params):
+            self.patched[positions[genus_id]][1].append(dict(zip(columns, sizes)))
+
+
+# Строит SizeIntervalIndex; positions - {id рода: позиция}
+def build_size_index(session, positions):
+    columns = [column for bounds in SIZE_DIMENSIONS.values() for column in bounds]
+
+    def collect(rows):
+        owners, values = [], []
+        for owner_id, *sizes in rows:
+            position = positions.get(owner_id)
+            if position is not None:
+                owners.append(position)
+                values.append([np.nan if value is None else value for value in sizes])
+        array = np.array(values, dtype=float).reshape(len(values), len(columns))
+        return owners, {column: array[:, number] for number, column in enumerate(columns)}
+
+    genus_owners, genus_sizes = collect(session.execute(text(f"SELECT id, {', '.join(columns)} FROM genera")))
+    # У родов без строки в genera (не бывает) размеры неизвестны
+    full_sizes = {column: np.full(len(positions), np.nan) for column in columns}
+    for column in columns:
+        full_sizes[column][genus_owners] = genus_sizes[column]
+
+    species_owners, species_sizes = collect(session.execute(
+        text(f"SELECT genus_id, {', '.join(columns)} FROM species")))
+    return SizeIntervalIndex(len(positions), full_sizes, species_owners, species_sizes)
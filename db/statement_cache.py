@@ -0,0 +1,42 @@
+import threading
+from collections import OrderedDict
+
+
+# LRU-кэш построенных запросов SQLAlchemy по "форме" (ключу, не зависящему от значений).
+# Запрос из кэша содержит только bindparam, значения передаются при выполнении.
+# Повторное использование того же объекта запроса дает стабильный ключ кэша
+# SQLAlchemy, поэтому и компиляция в SQL берется из кэша движка
+class StatementCache:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._statements = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Возвращает запрос для формы shape, при промахе строит его через build(shape)
+    def get(self, shape, build):
+        with self._lock:
+            statement = self._statements.get(shape)
+            if statement is not None:
+                self._statements.move_to_end(shape)
+                self.hits += 1
+                return statement
+            self.misses += 1
+
+        statement = build(shape)
+        with self._lock:
+            self._statements[shape] = statement
+            while len(self._statements) > self.max_size:
+                self._statements.popitem(last=False)
+        return statement
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._statements)}
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
+            self.hits = 0
+            self.misses = 0
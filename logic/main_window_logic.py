@@ -1,493 +1,737 @@
-from typing import Optional
-
-from PySide6.QtWidgets import QTableWidgetItem, QMessageBox
-
-from db.crud_add_genus import create_full_genus
-from db.crud_update_genus import update_full_genus
-from logic.export_logic import export_data
-from ui.export_dialog import ExportDialog
-from ui.ui_add_genus_form import AddGenusForm
-from ui.ui_edit_genus_form import EditGenusForm
-from ui.ui_genus_details import GenusDetailTab
-from ui.ui_main_window import MainWindow
-from db.session import SessionLocal, get_db_session
-from db.crud import get_all_genera, filter_genera, get_full_genus_data, get_all_options, delete_genus, get_export_data, \
-    get_export_species_data
-
-
-class MainApp:
-    def __init__(self):
-        self.session = SessionLocal()
-        self.all_options = get_all_options(self.session)
-        self.window = MainWindow(options_data=self.all_options)
-        self.window.main_app = self
-
-        self.add_genus_form = None
-        self.edit_genus_form = None
-
-        self.connect_signals()
-        self.load_all_data()
-
-
-    def connect_signals(self):
-        self.window.search_input.textChanged.connect(self.perform_search)
-
-        self.window.table.cellDoubleClicked.connect(self.show_genus_details)
-
-        self.window.search_panel.search_requested.connect(self.handle_search)
-        self.window.search_panel.reset_btn.clicked.connect(self.reset_search)
-
-        self.window.delete_btn.clicked.connect(self.delete_selected_genus)
-        self.window.add_genus_btn.clicked.connect(self.show_add_genus_form)
-        self.window.export_btn.clicked.connect(self.handle_export)
-        self.window.edit_btn.clicked.connect(self.show_edit_genus_form_from_main_tab)
-
-        self.window.search_input.textChanged.connect(self.perform_search)
-
-    # def load_all_data(self):
-    #     self.all_genera = get_all_genera(self.session)
-    #     self.populate_table(self.all_genera)
-
-    # def load_all_data(self):
-    #     self.all_genera = get_all_genera(self.session)
-    #     self.current_search_results = self.all_genera.copy()
-    #     self.populate_table(self.all_genera)
-
-    def load_all_data(self):
-        results = get_all_genera(self.session)
-        self.all_table_data = []  #
-        for genus in results:
-            genus_name = genus.name
-            synonyms = ", ".join([syn.name for syn in genus.synonyms]) if genus.synonyms else "-"
-            infraturma = genus.diagnosis.infraturma.name if genus.diagnosis else "-"
-            self.all_table_data.append([genus_name, synonyms, infraturma])
-
-        self.populate_table(results)
-
-
-    # Заполняет таблицу данными
-    def populate_table(self, genera):
-        self.all_table_data = []
-        self.current_genus_ids = []
-
-        table = self.window.table
-        table.setRowCount(len(genera))
-
-        for row, genus in enumerate(genera):
-            genus_name = genus.name
-            synonyms = [synonym.name for synonym in genus.synonyms]
-            synonyms_text = ", ".join(synonyms) if synonyms else "-"
-            infraturma_name = genus.diagnosis.infraturma.name if genus.diagnosis else "-"
-
-            self.all_table_data.append([genus_name, synonyms_text, infraturma_name])
-            self.current_genus_ids.append(genus.id)
-
-            table.setItem(row, 0, QTableWidgetItem(genus_name))
-            table.setItem(row, 1, QTableWidgetItem(synonyms_text))
-            table.setItem(row, 2, QTableWidgetItem(infraturma_name))
-
-
-
-    # Выполняет поиск по названию рода и синонимам
-    def perform_search(self, search_text):
-        search_text = search_text.lower().strip()
-
-        if not search_text:
-            self.update_table(self.all_table_data)
-            return
-
-        filtered_data = []
-        for row_data in self.all_table_data:
-            genus_name = str(row_data[0]).lower()
-            synonyms = str(row_data[1]).lower()
-
-            if search_text in genus_name or search_text in synonyms:
-                filtered_data.append(row_data)
-
-        self.update_table(filtered_data)
-
-
-    def update_table(self, data):
-        table = self.window.table
-        table.setRowCount(len(data))
-
-        for row, row_data in enumerate(data):
-            for col, value in enumerate(row_data):
-                table.setItem(row, col, QTableWidgetItem(str(value)))
-
-
-    # Открывает вкладку с информацией о роде спор
-    def show_genus_details(self, row):
-        genus_name = self.window.table.item(row, 0).text()
-        genus = get_full_genus_data(self.session, genus_name)
-
-        if genus:
-            detail_tab = GenusDetailTab(genus)
-            detail_tab.delete_requested.connect(self.delete_genus_by_name)
-            detail_tab.edit_requested.connect(self.show_edit_genus_form)
-            self.window.add_genus_tab(detail_tab, genus_name)
-
-    # Аналог show_genus_details, но работает по имени рода
-    def show_genus_details_by_name(self, genus_name):
-        genus = get_full_genus_data(self.session, genus_name)
-        if genus:
-            detail_tab = GenusDetailTab(genus)
-            detail_tab.delete_requested.connect(self.delete_genus_by_name)
-            detail_tab.edit_requested.connect(self.show_edit_genus_form)
-            self.window.add_genus_tab(detail_tab, genus_name)
-
-    # Обрабатывает экспорт данных
-    def handle_export(self):
-        export_params = ExportDialog.show_export_dialog(self.window)
-        if not export_params:
-            return
-
-        current_ids = getattr(self, 'current_genus_ids', None)
-        if export_params['type'] == 'genera':
-            data = get_export_data(
-                session=self.session,
-                source=export_params['source'],
-                fields=export_params['fields'],
-                genus_ids=current_ids if export_params['source'] == 'current' else None
-            )
-        else:
-            data = get_export_species_data(
-                session=self.session,
-                source=export_params['source'],
-                genus_ids=current_ids if export_params['source'] == 'current' else None
-            )
-
-        export_data(
-            data=data,
-            fields=export_params['fields'],
-            export_format=export_params['format'],
-            is_species=(export_params['type'] != 'genera')
-        )
-
-
-    # Выполняет расширенный поиск
-    def handle_search(self, filters):
-        results = filter_genera(self.session, filters)
-        self.populate_table(results)
-
-    def reset_search(self):
-        self.window.search_panel.reset_filters()
-        # self.load_all_data()
-
-    def show(self):
-        self.window.show()
-
-    # Открывает форму добавления рода
-    def show_add_genus_form(self):
-        if self.add_genus_form is None:
-            self.add_genus_form = AddGenusForm(
-                options_data=self.all_options,
-                parent=self.window
-            )
-            self.add_genus_form.save_btn.clicked.connect(self.save_new_genus)
-            self.add_genus_form.cancel_btn.clicked.connect(self.close_add_genus_form)
-        else:
-            self.add_genus_form = None
-            self.add_genus_form = AddGenusForm(
-                options_data=self.all_options,
-                parent=self.window
-            )
-            self.add_genus_form.save_btn.clicked.connect(self.save_new_genus)
-            self.add_genus_form.cancel_btn.clicked.connect(self.close_add_genus_form)
-
-        self.add_genus_form.show()
-        self.add_genus_form.raise_()
-
-    # Закрывает форму добавления рода
-    def close_add_genus_form(self):
-        if self.add_genus_form:
-            self.add_genus_form.hide()
-            self.add_genus_form.deleteLater()
-            self.add_genus_form = None
-
-    # Сохранение нового рода
-    def save_new_genus(self):
-        # Собираем все данные из формы
-        genus_data = self.collect_genus_data(self.add_genus_form)
-        print(genus_data)
-        # Валидация
-        errors = self.validate_genus_data(genus_data)
-        if errors:
-            self.show_error("\n".join(errors))
-            return
-
-        try:
-            create_full_genus(self.session, genus_data)
-            self.close_add_genus_form()
-            self.load_all_data()
-            self.show_success("Род успешно сохранен")
-        except ValueError as e:
-            self.show_error(str(e))
-        except Exception as e:
-            self.show_error(f"Ошибка при сохранении: {str(e)}")
-
-
-    # Проверяет данные рода перед сохранением
-    def validate_genus_data(self, genus_data):
-        errors = []
-
-        if not genus_data["genus"]["name"]:
-            errors.append("Название рода обязательно для заполнения")
-
-        if not genus_data["diagnosis"].get("infraturma") or genus_data["diagnosis"]["infraturma"] == "-":
-            errors.append("Поле 'Инфратурма' обязательно для заполнения")
-
-        for i, species in enumerate(genus_data["species"]):
-            if not species["name"]:
-                errors.append(f"У вида {i+1} не заполнено поле 'Название вида'")
-
-        return errors
-
-
-    # Собирает все данные из формы добавления/изменения рода в словарь
-    def collect_genus_data(self, form):
-        full_name = form.name_input.text().strip()
-        name = full_name.split()[0] if full_name else ""
-
-        def process_min_max(min_val, max_val):
-            min_val = self.safe_float(min_val)
-            max_val = self.safe_float(max_val)
-
-            # Если одно значение есть, а другого нет - копируем
-            if min_val is not None and max_val is None:
-                max_val = min_val
-            elif max_val is not None and min_val is None:
-                min_val = max_val
-
-            return min_val, max_val
-
-        length_min, length_max = process_min_max(form.length_min.text(), form.length_max.text())
-        width_min, width_max = process_min_max(form.width_min.text(), form.width_max.text())
-
-        data = {
-            "genus": {
-                "name": name,
-                "full_name": full_name,
-                "type_species": form.type_species.text().strip(),
-                "length_min": length_min,
-                "length_max": length_max,
-                "width_min": width_min,
-                "width_max": width_max,
-                "comparison": form.comparison.text().strip(),
-                "natural_affiliation": form.natural_affiliation.text().strip()
-            },
-            "synonyms": [
-                {"name": s.text().strip(), "source": src.text().strip()}
-                for s, src in getattr(form, 'synonym_pairs', [])
-                if s.text().strip()
-            ],
-            "diagnosis": {
-                "infraturma": form.infratuma_combo.currentText(),
-                "form": form.form_combo.currentText(),
-                "amd": form.amb_combo.selectedItems(),
-                "sides": form.sides_combo.selectedItems(),
-                "angles": form.angles_combo.currentText(),
-                "laesurae": form.laesurae_shape_combo.selectedItems(),
-                "laesurae_rays": form.laesurae_rays_combo.selectedItems(),
-                "area_presence": form.area_presence_combo.currentText(),
-                "exine_structure": form.exine_structure_combo.selectedItems(),
-                "outline_shape": form.outline_shape_combo.currentText(),
-                "outline_uneven_cause": form.coutline_uneven_cause.text().strip(),
-                "rays_length_min": form.rays_length_min.text().strip(),
-                "rays_length_max": form.rays_length_max.text().strip(),
-                "additional_features": form.additional_features.text().strip(),
-                "exine_growth": {
-                    "type": form.growth_type_combo.currentText(),
-                    "thickness": form.growth_thickness_combo.currentText(),
-                    "width": form.growth_width_combo.currentText(),
-                    "structure": form.growth_structure_combo.currentText()
-                },
-                "exoexine": {
-                    "thickness": form.exoexine_thickness_combo.currentText(),
-                    "description": form.exoexine_description.text().strip()
-                },
-                "intexine": {
-                    "thickness": form.intexine_thickness_combo.currentText(),
-                    "description": form.intexine_description.text().strip()
-                },
-                "exine_thickness": form.exine_thickness_combo.currentText(),
-                "sculpture": [
-                    {"side": pair[0].currentText(), "values": pair[1].selectedItems()}
-                    for pair in getattr(form, 'sculpture_pairs', [])
-                ],
-                "ornamentation": [
-                    {"side": pair[0].currentText(), "values": pair[1].selectedItems()}
-                    for pair in getattr(form, 'ornamentation_pairs', [])
-                ]
-            },
-            "stratigraphy": form.stratigraphy_combo.selectedItems(),
-            "geography": form.geography_combo.selectedItems(),
-            "species": [
-                {
-                    "name": s['name'].text().strip(),
-                    "old_name": s['old_name'].text().strip(),
-                    "source": s['source'].text().strip(),
-                    "length_min": process_min_max(s['length_min'].text(), s['length_max'].text())[0],
-                    "length_max": process_min_max(s['length_min'].text(), s['length_max'].text())[1],
-                    "width_min": process_min_max(s['width_min'].text(), s['width_max'].text())[0],
-                    "width_max": process_min_max(s['width_min'].text(), s['width_max'].text())[1],
-                    "stratigraphy": s['stratigraphy'].selectedItems(),
-                    "geography": s['geography'].selectedItems()
-                }
-                for s in getattr(form, 'species_list', [])
-            ]
-        }
-        return data
-
-
-    @staticmethod
-    def safe_float(value: str) -> Optional[float]:
-        try:
-            return float(value) if value else None
-        except ValueError:
-            return None
-
-    # Показывает сообщение об ошибке
-    def show_error(self, message: str):
-        msg = QMessageBox()
-        msg.setIcon(QMessageBox.Critical)
-        msg.setWindowTitle("Ошибка")
-        msg.setText(message)
-        msg.setStandardButtons(QMessageBox.Ok)
-        msg.exec()
-
-    # Показывает сообщение об успешном добавлении рода
-    def show_success(self, message: str):
-        msg = QMessageBox()
-        msg.setIcon(QMessageBox.Information)
-        msg.setWindowTitle("Успешно")
-        msg.setText(message)
-        msg.setStandardButtons(QMessageBox.Ok)
-        msg.exec()
-
-    # Функция для кнопки Удалить на главной вкладке
-    def delete_selected_genus(self):
-        selected_row = self.window.table.currentRow()
-        if selected_row >= 0:
-            genus_name = self.window.table.item(selected_row, 0).text()
-
-            msg_box = QMessageBox()
-            msg_box.setWindowTitle('Подтверждение удаления')
-            msg_box.setText(f'Вы уверены, что хотите удалить род "{genus_name}"?')
-            msg_box.setIcon(QMessageBox.Question)
-
-            yes_btn = msg_box.addButton("Да", QMessageBox.YesRole)
-            no_btn = msg_box.addButton("Нет", QMessageBox.NoRole)
-            msg_box.setDefaultButton(no_btn)
-
-            msg_box.exec_()
-
-            if msg_box.clickedButton() == yes_btn:
-                try:
-                    with get_db_session() as session:
-                        if delete_genus(session, genus_name):
-                            self.load_all_data()
-                            QMessageBox.information(
-                                self.window,
-                                'Успех',
-                                f'Род "{genus_name}" успешно удален'
-                            )
-                        else:
-                            QMessageBox.warning(
-                                self.window,
-                                'Предупреждение',
-                                f'Род "{genus_name}" не найден в базе данных'
-                            )
-                except Exception as e:
-                    QMessageBox.critical(
-                        self.window,
-                        'Ошибка',
-                        f'Не удалось удалить род: {str(e)}'
-                    )
-
-    # Удаляет род по кнопке на вкладке с информацией о роде
-    def delete_genus_by_name(self, genus_name: str):
-        try:
-            with get_db_session() as session:
-                if delete_genus(session, genus_name):
-                    self.load_all_data()
-                    self.close_genus_tab(genus_name)
-                    QMessageBox.information(self.window, 'Успех', f'Род "{genus_name}" удалён')
-                else:
-                    QMessageBox.warning(self.window, 'Ошибка', f'Род "{genus_name}" не найден')
-        except Exception as e:
-            QMessageBox.critical(self.window, 'Ошибка', f'Не удалось удалить род: {str(e)}')
-
-
-    # Закрытие вкладки с информацией о роде
-    def close_genus_tab(self, genus_name: str):
-        for i in range(1, self.window.tab_widget.count()):
-            if self.window.tab_widget.tabText(i) == genus_name:
-                self.window.tab_widget.removeTab(i)
-                break
-
-    # Окно редактирования рода спор
-    def show_edit_genus_form(self, genus):
-        if self.edit_genus_form is None:
-            self.edit_genus_form = EditGenusForm(
-                options_data=self.all_options,
-                parent=self.window,
-                genus=genus
-            )
-            self.edit_genus_form.save_btn.clicked.connect(lambda: self.save_edited_genus(genus))
-            self.edit_genus_form.cancel_btn.clicked.connect(self.close_edit_genus_form)
-        else:
-            self.edit_genus_form = None
-            self.edit_genus_form = EditGenusForm(
-                options_data=self.all_options,
-                parent=self.window,
-                genus=genus
-            )
-            self.edit_genus_form.save_btn.clicked.connect(lambda: self.save_edited_genus(genus))
-            self.edit_genus_form.cancel_btn.clicked.connect(self.close_edit_genus_form)
-
-        self.edit_genus_form.show()
-        self.edit_genus_form.raise_()
-
-    # Функция для кнопки Изменить на главной вкладке
-    def show_edit_genus_form_from_main_tab(self):
-        selected_items = self.window.table.selectedItems()
-        row = selected_items[0].row()
-        genus_name = self.window.table.item(row, 0).text()
-        genus = get_full_genus_data(self.session, genus_name)
-        self.show_edit_genus_form(genus)
-
-    # Закрывает форму изменения рода
-    def close_edit_genus_form(self):
-        if self.edit_genus_form:
-            self.edit_genus_form.hide()
-            self.edit_genus_form.deleteLater()
-            self.edit_genus_form = None
-
-    # Сохраняет изменения редактируемого рода
-    def save_edited_genus(self, original_genus):
-        try:
-            genus_data = self.collect_genus_data(self.edit_genus_form)
-            errors = self.validate_genus_data(genus_data)
-            if errors:
-                self.show_error("\n".join(errors))
-                return
-
-            update_full_genus(self.session, original_genus.id, genus_data)
-
-            genus_name = genus_data["genus"]["full_name"]
-            self.close_genus_tab(genus_name)
-            self.show_genus_details_by_name(genus_name)
-
-            self.close_edit_genus_form()
-            self.load_all_data()
-            self.show_success("Род успешно обновлен")
-
-        except ValueError as e:
-            self.show_error(str(e))
-        except Exception as e:
-            self.show_error(f"Ошибка при обновлении: {str(e)}")
-
-    def close_session(self):
-        if self.session:
-            self.session.close()
\ No newline at end of file
+from array import array
+from typing import Optional
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QMessageBox
+
+from db.crud_add_genus import create_full_genus
+from db.crud_update_genus import update_full_genus
+from logic.export_logic import build_export_frame, save_to_file
+from logic.workers import JobRunner, ChangeSignals
+from ui.export_dialog import ExportDialog
+from ui.ui_add_genus_form import AddGenusForm
+from ui.ui_edit_genus_form import EditGenusForm
+from ui.ui_genus_details import GenusDetailTab
+from ui.ui_genus_table import GenusColumnStore
+from ui.ui_main_window import MainWindow
+from config import SIMILAR_GENERA_COUNT, QUERY_DEBOUNCE_MS
+from db.events import genus_changes, GENUS_CREATED, GENUS_UPDATED, GENUS_DELETED
+from db.session_manager import session_manager
+from db.similarity import get_similar_genera
+from db.search import warm_up_search_index, get_facet_counts, identify_genera, search_species_rows, \
+    suggest_names, get_changed_table_rows, run_genus_query, genus_query_key, get_genus_table_page, \
+    search_genus_table_rows
+from db.crud import get_full_genus_data, get_full_genus_data_by_id, get_all_options, \
+    delete_genus, get_export_data, get_export_species_data
+
+
+class MainApp:
+    def __init__(self):
+        self.sessions = session_manager
+        # Поиск, открытие карточки и экспорт выполняются в фоновых потоках
+        self.jobs = JobRunner(sessions=self.sessions)
+        with self.sessions.read("load options") as session:
+            self.all_options = get_all_options(session)
+        self.window = MainWindow(options_data=self.all_options)
+        self.window.main_app = self
+
+        self.add_genus_form = None
+        self.edit_genus_form = None
+        # Фильтры расширенного поиска, по которым заполнена таблица
+        self.table_filters = {}
+        # Запрос к таблице (фильтры панели и текст строки поиска): последний показанный
+        # результат (GenusQuery), ключ отправленного и фильтры следующего.
+        # Ввод текста собирается таймером в один запрос
+        self.last_query = None
+        self.submitted_query_key = None
+        self.query_filters = {}
+        self.query_timer = QTimer()
+        self.query_timer.setSingleShot(True)
+        self.query_timer.setInterval(QUERY_DEBOUNCE_MS)
+        self.query_timer.timeout.connect(self.run_query)
+        # Измененные роды, строки которых еще загружаются (см. apply_genus_changes)
+        self.pending_changes = set()
+
+        # Сохранение, изменение и удаление родов приходят с шины изменений
+        self.change_signals = ChangeSignals()
+        self.change_signals.changed.connect(self.apply_genus_changes)
+        self._publish_changes = self.change_signals.changed.emit
+        genus_changes.subscribe(self._publish_changes)
+
+        self.connect_signals()
+        self.load_all_data()
+        self.jobs.submit("search index", "build search index", warm_up_search_index, lambda result: None)
+        self.update_facet_counts({})
+
+
+    def connect_signals(self):
+        self.window.search_input.textChanged.connect(self.schedule_query)
+        # Только ввод пользователя: выбор подсказки тоже меняет текст, но новых подсказок не требует
+        self.window.search_input.textEdited.connect(self.request_name_suggestions)
+        self.window.name_completer.activated.connect(self.window.search_input.setText)
+
+        self.window.table.doubleClicked.connect(lambda index: self.show_genus_details(index.row()))
+        self.window.genus_model.fetch_requested.connect(self.fetch_table_page)
+
+        self.window.search_panel.search_requested.connect(self.handle_search)
+        self.window.search_panel.filters_changed.connect(self.update_facet_counts)
+        self.window.search_panel.identify_requested.connect(self.handle_identify)
+        self.window.search_panel.species_search_requested.connect(self.handle_species_search)
+        self.window.search_panel.reset_btn.clicked.connect(self.reset_search)
+
+        self.window.delete_btn.clicked.connect(self.delete_selected_genus)
+        self.window.add_genus_btn.clicked.connect(self.show_add_genus_form)
+        self.window.export_btn.clicked.connect(self.handle_export)
+        self.window.edit_btn.clicked.connect(self.show_edit_genus_form_from_main_tab)
+
+    # def load_all_data(self):
+    #     self.all_genera = get_all_genera(self.session)
+    #     self.populate_table(self.all_genera)
+
+    # def load_all_data(self):
+    #     self.all_genera = get_all_genera(self.session)
+    #     self.current_search_results = self.all_genera.copy()
+    #     self.populate_table(self.all_genera)
+
+    # Заполняет таблицу первой страницей всех родов сразу, в потоке интерфейса (при запуске)
+    def load_all_data(self):
+        # Результат еще не завершенного запроса больше не нужен
+        self.jobs.cancel("query")
+        self.query_timer.stop()
+        self.query_filters = {}
+        with self.sessions.read("load table") as session:
+            query = run_genus_query(session, {}, self.window.search_input.text())
+        self.submitted_query_key = query.key
+        self.show_query(query)
+
+
+    # Заполняет таблицу первой страницей строк (id, название, синонимы, инфратурма);
+    # has_more - есть следующие страницы, они загружаются при прокрутке (см. fetch_table_page)
+    def populate_table(self, rows, has_more=False):
+        # Страница прежних строк больше не нужна
+        self.jobs.cancel("page")
+        self.window.genus_model.set_store(GenusColumnStore(rows), has_more)
+
+    # Загружает в фоне следующую страницу таблицы - представление прокручено к концу
+    def fetch_table_page(self):
+        model = self.window.genus_model
+        self.jobs.submit(
+            "page", "table page", get_genus_table_page,
+            lambda page: model.append_page(*page),
+            self.table_page_failed, self.table_filters, model.loaded_key
+        )
+
+    def table_page_failed(self, message):
+        self.window.genus_model.fetch_failed()
+        self.show_error(f"Не удалось загрузить строки таблицы: {message}")
+
+
+    # Изменения родов после записи в БД (шина изменений, db/events.py). Таблица,
+    # открытые вкладки описаний и списки вариантов обновляются только по этим родам:
+    # результаты поиска, выделение и прокрутка таблицы сохраняются
+    def apply_genus_changes(self, changes):
+        if not changes.complete:
+            # Изменены данные, которые не отнести к конкретным родам: таблица заполняется заново
+            self.last_query = None
+            self.run_query(force=True)
+            self.update_facet_counts(self.query_filters)
+            return
+
+        deleted = changes.ids_of(GENUS_DELETED)
+        if deleted:
+            self.pending_changes -= deleted
+            self.window.genus_model.remove_genera(deleted)
+            self.close_genus_tabs(deleted)
+
+        changed = changes.ids_of(GENUS_CREATED, GENUS_UPDATED)
+        if changed:
+            # Новое задание отменяет еще не завершенное, поэтому загружает и его роды
+            self.pending_changes |= changed
+            genus_ids = frozenset(self.pending_changes)
+            self.jobs.submit(
+                "table changes", "changed rows", get_changed_table_rows,
+                lambda rows: self.apply_changed_rows(genus_ids, rows),
+                lambda message: self.show_error(f"Не удалось обновить таблицу: {message}"),
+                genus_ids, self.table_filters
+            )
+            self.refresh_genus_tabs(changed)
+            # Справочники могли пополниться новыми вариантами
+            self.jobs.submit("options", "load options", get_all_options, self.add_options)
+
+        # Запрос, начатый до записи, мог не увидеть изменений - он выполняется заново
+        if self.jobs.is_running("query"):
+            self.run_query(force=True)
+        self.update_facet_counts(self.query_filters)
+
+    # Строки измененных родов: существующие обновляются на месте, новые вставляются,
+    # а роды, которые больше не подходят под фильтры таблицы, убираются
+    def apply_changed_rows(self, genus_ids, rows):
+        self.pending_changes -= genus_ids
+        model = self.window.genus_model
+        model.upsert_rows(rows)
+        model.remove_genera(genus_ids - {row[0] for row in rows})
+        # Найденное по тексту ищется заново - с учетом новых названий и описаний
+        if self.last_query is not None:
+            self.last_query = self.last_query.after_changes()
+            if self.last_query.hits is not None:
+                self.run_query(force=True)
+
+    # Новые варианты признаков - в списки панели поиска и в форму добавления и изменения
+    # (формы получают варианты из self.all_options при открытии)
+    def add_options(self, options):
+        self.all_options.update(options)
+        self.window.search_panel.add_options(options)
+
+
+    # Текст строки поиска изменился: запрос отправится, когда ввод затихнет
+    def schedule_query(self):
+        self.query_timer.start()
+
+    # Выполняет в фоне запрос к таблице: фильтры self.query_filters и текст строки поиска
+    # (см. run_genus_query). Запрос, совпадающий с уже отправленным, не повторяется,
+    # если не задан force (данные в БД изменились)
+    def run_query(self, force=False):
+        self.query_timer.stop()
+        filters = self.query_filters
+        search_text = self.window.search_input.text()
+        key = genus_query_key(filters, search_text)
+        if key == self.submitted_query_key and not force:
+            return
+        self.submitted_query_key = key
+        self.jobs.submit(
+            "query", "search", run_genus_query, self.show_query, self.query_failed,
+            filters, search_text, self.last_query
+        )
+
+    # Показывает результат запроса: строки таблицы (если фильтры изменились)
+    # и среди них - найденные по тексту
+    def show_query(self, query):
+        previous, self.last_query = self.last_query, query
+        if query.rows is not None:
+            self.table_filters = query.filters
+            self.populate_table(query.rows, query.has_more)
+        if query.hit_rows:
+            # Найденные роды из еще не загруженных страниц
+            self.window.genus_model.add_rows(query.hit_rows)
+        if query.hits is not None:
+            self.show_quick_search_results(query.hits)
+        elif query.rows is None and previous is not None and previous.hits is not None:
+            self.window.genus_rows.show_all()
+
+    def query_failed(self, message):
+        self.submitted_query_key = None
+        self.show_error(f"Ошибка при поиске: {message}")
+
+    # Показывает найденные быстрым поиском роды по убыванию релевантности;
+    # фрагмент с совпадением - в подсказке строки. Меняется только список видимых строк
+    def show_quick_search_results(self, results):
+        store = self.window.genus_model.store
+        rows = array("q")
+        tooltips = []
+        for genus_id, snippet in results:
+            position = store.position_of(genus_id)
+            if position is not None:
+                rows.append(position)
+                tooltips.append(snippet)
+        self.window.genus_rows.set_rows(rows, tooltips)
+
+
+    # Подсказки названий для набранного текста (см. suggest_names). Выполняется в фоне
+    def request_name_suggestions(self, search_text):
+        if len(search_text.strip()) < 3:
+            self.jobs.cancel("name suggestions")
+            self.window.name_completer.popup().hide()
+            return
+
+        self.jobs.submit(
+            "name suggestions", "suggest names", suggest_names, self.show_name_suggestions,
+            None, search_text
+        )
+
+    # Показывает подсказки под строкой поиска, если набранный текст - не одно из названий
+    def show_name_suggestions(self, names):
+        completer = self.window.name_completer
+        completer.model().setStringList(names)
+        search_text = self.window.search_input.text().strip().casefold()
+        if names and all(name.casefold() != search_text for name in names):
+            completer.complete()
+        else:
+            completer.popup().hide()
+
+
+    # Открывает вкладку с информацией о роде спор
+    def show_genus_details(self, row):
+        genus_name = self.window.genus_rows.genus_name(row)
+        self.show_genus_details_by_name(genus_name)
+
+    # Аналог show_genus_details, но работает по имени рода.
+    # Данные рода загружаются в фоне, вкладка добавляется по готовности
+    def show_genus_details_by_name(self, genus_name):
+        self.jobs.submit(
+            f"details:{genus_name}", "open details", get_full_genus_data,
+            lambda genus: self.add_genus_details_tab(genus, genus_name),
+            lambda message: self.show_error(f"Не удалось открыть описание рода: {message}"),
+            genus_name
+        )
+
+    # То же по id рода (название могло измениться)
+    def show_genus_details_by_id(self, genus_id):
+        self.jobs.submit(
+            f"details:{genus_id}", "open details", get_full_genus_data_by_id,
+            lambda genus: self.add_genus_details_tab(genus, genus.name if genus else None),
+            lambda message: self.show_error(f"Не удалось открыть описание рода: {message}"),
+            genus_id
+        )
+
+    def add_genus_details_tab(self, genus, genus_name):
+        if genus:
+            self.window.add_genus_tab(self.create_genus_details_tab(genus), genus_name)
+
+    def create_genus_details_tab(self, genus):
+        detail_tab = GenusDetailTab(genus)
+        detail_tab.delete_requested.connect(self.delete_genus_by_name)
+        detail_tab.edit_requested.connect(self.show_edit_genus_form)
+        detail_tab.genus_requested.connect(self.show_genus_details_by_name)
+        self.jobs.submit(
+            f"similar:{genus.id}", "similar genera", get_similar_genera,
+            detail_tab.set_similar_genera, lambda message: detail_tab.set_similar_genera([]),
+            genus.id, SIMILAR_GENERA_COUNT
+        )
+        return detail_tab
+
+    # Открытые вкладки описаний родов genus_ids: {вкладка: id рода}
+    def genus_tabs(self, genus_ids):
+        tabs = {}
+        for i in range(1, self.window.tab_widget.count()):
+            tab = self.window.tab_widget.widget(i)
+            if isinstance(tab, GenusDetailTab) and tab.genus.id in genus_ids:
+                tabs[tab] = tab.genus.id
+        return tabs
+
+    # Вкладки измененных родов загружаются заново в фоне и заменяются на том же месте
+    def refresh_genus_tabs(self, genus_ids):
+        for tab, genus_id in self.genus_tabs(genus_ids).items():
+            self.jobs.submit(
+                f"refresh:{genus_id}", "refresh details", get_full_genus_data_by_id,
+                lambda genus, tab=tab: self.replace_genus_tab(tab, genus), None,
+                genus_id
+            )
+
+    def replace_genus_tab(self, old_tab, genus):
+        tab_widget = self.window.tab_widget
+        index = tab_widget.indexOf(old_tab)
+        if index < 0:
+            return
+        if genus is None:
+            tab_widget.removeTab(index)
+            return
+        was_current = tab_widget.currentIndex() == index
+        tab_widget.removeTab(index)
+        # Название на вкладке - новое, если род переименован
+        tab_widget.insertTab(index, self.create_genus_details_tab(genus), genus.name)
+        if was_current:
+            tab_widget.setCurrentIndex(index)
+        old_tab.deleteLater()
+
+    # Закрывает вкладки описаний удаленных родов
+    def close_genus_tabs(self, genus_ids):
+        for tab in self.genus_tabs(genus_ids):
+            self.window.tab_widget.removeTab(self.window.tab_widget.indexOf(tab))
+            tab.deleteLater()
+
+    # Обрабатывает экспорт данных
+    def handle_export(self):
+        export_params = ExportDialog.show_export_dialog(self.window)
+        if not export_params:
+            return
+
+        # Данные собираются в фоне, диалог сохранения файла - в потоке интерфейса.
+        # Таблица может быть загружена не целиком - роды берутся по ее фильтрам
+        self.jobs.submit(
+            "export", "export", load_export_frame,
+            lambda df: save_to_file(df, export_params['format']),
+            lambda message: self.show_error(f"Ошибка при экспорте: {message}"),
+            export_params, self.table_filters
+        )
+
+
+    # Выполняет расширенный поиск. Фильтры приходят уже с задержкой (search_timer панели),
+    # поэтому запрос отправляется сразу - вместе с набранным текстом
+    def handle_search(self, filters):
+        # Новый запрос делает результат предыдущего, еще не завершенного, устаревшим
+        self.query_filters = filters
+        self.run_query()
+        self.update_facet_counts(filters)
+
+    # Пересчитывает в фоне счетчики вариантов в списках панели поиска
+    def update_facet_counts(self, filters):
+        self.jobs.submit(
+            "facets", "facet counts", get_facet_counts,
+            self.window.search_panel.update_facet_counts, None,
+            filters, self.all_options
+        )
+
+    # Определение по частичному совпадению признаков, результаты - на отдельной вкладке
+    def handle_identify(self, filters, max_mismatches):
+        self.jobs.submit(
+            "identify", "identify", identify_genera,
+            lambda identification: self.window.open_identification_tab(
+                identification, max_mismatches, self.show_genus_details_by_name),
+            lambda message: self.show_error(f"Ошибка при определении: {message}"),
+            filters, max_mismatches
+        )
+
+    # Поиск видов: строки поступают в таблицу вкладки "Виды" частями по мере чтения из БД
+    def handle_species_search(self, filters):
+        tab = self.window.open_species_tab(self.show_genus_details_by_name)
+        tab.start()
+        self.jobs.submit_stream(
+            "species", "species search", search_species_rows,
+            tab.add_rows, tab.finish, tab.fail,
+            filters
+        )
+
+    def reset_search(self):
+        self.window.search_panel.reset_filters()
+        # self.load_all_data()
+
+    def show(self):
+        self.window.show()
+
+    # Открывает форму добавления рода
+    def show_add_genus_form(self):
+        if self.add_genus_form is None:
+            self.add_genus_form = AddGenusForm(
+                options_data=self.all_options,
+                parent=self.window
+            )
+            self.add_genus_form.save_btn.clicked.connect(self.save_new_genus)
+            self.add_genus_form.cancel_btn.clicked.connect(self.close_add_genus_form)
+        else:
+            self.add_genus_form = None
+            self.add_genus_form = AddGenusForm(
+                options_data=self.all_options,
+                parent=self.window
+            )
+            self.add_genus_form.save_btn.clicked.connect(self.save_new_genus)
+            self.add_genus_form.cancel_btn.clicked.connect(self.close_add_genus_form)
+
+        self.add_genus_form.show()
+        self.add_genus_form.raise_()
+
+    # Закрывает форму добавления рода
+    def close_add_genus_form(self):
+        if self.add_genus_form:
+            self.add_genus_form.hide()
+            self.add_genus_form.deleteLater()
+            self.add_genus_form = None
+
+    # Сохранение нового рода
+    def save_new_genus(self):
+        # Собираем все данные из формы
+        genus_data = self.collect_genus_data(self.add_genus_form)
+        print(genus_data)
+        # Валидация
+        errors = self.validate_genus_data(genus_data)
+        if errors:
+            self.show_error("\n".join(errors))
+            return
+
+        try:
+            with self.sessions.write("save genus") as session:
+                create_full_genus(session, genus_data)
+            self.close_add_genus_form()
+            self.show_success("Род успешно сохранен")
+        except ValueError as e:
+            self.show_error(str(e))
+        except Exception as e:
+            self.show_error(f"Ошибка при сохранении: {str(e)}")
+
+
+    # Проверяет данные рода перед сохранением
+    def validate_genus_data(self, genus_data):
+        errors = []
+
+        if not genus_data["genus"]["name"]:
+            errors.append("Название рода обязательно для заполнения")
+
+        if not genus_data["diagnosis"].get("infraturma") or genus_data["diagnosis"]["infraturma"] == "-":
+            errors.append("Поле 'Инфратурма' обязательно для заполнения")
+
+        for i, species in enumerate(genus_data["species"]):
+            if not species["name"]:
+                errors.append(f"У вида {i+1} не заполнено поле 'Название вида'")
+
+        return errors
+
+
+    # Собирает все данные из формы добавления/изменения рода в словарь
+    def collect_genus_data(self, form):
+        full_name = form.name_input.text().strip()
+        name = full_name.split()[0] if full_name else ""
+
+        def process_min_max(min_val, max_val):
+            min_val = self.safe_float(min_val)
+            max_val = self.safe_float(max_val)
+
+            # Если одно значение есть, а другого нет - копируем
+            if min_val is not None and max_val is None:
+                max_val = min_val
+            elif max_val is not None and min_val is None:
+                min_val = max_val
+
+            return min_val, max_val
+
+        length_min, length_max = process_min_max(form.length_min.text(), form.length_max.text())
+        width_min, width_max = process_min_max(form.width_min.text(), form.width_max.text())
+
+        data = {
+            "genus": {
+                "name": name,
+                "full_name": full_name,
+                "type_species": form.type_species.text().strip(),
+                "length_min": length_min,
+                "length_max": length_max,
+                "width_min": width_min,
+                "width_max": width_max,
+                "comparison": form.comparison.text().strip(),
+                "natural_affiliation": form.natural_affiliation.text().strip()
+            },
+            "synonyms": [
+                {"name": s.text().strip(), "source": src.text().strip()}
+                for s, src in getattr(form, 'synonym_pairs', [])
+                if s.text().strip()
+            ],
+            "diagnosis": {
+                "infraturma": form.infratuma_combo.currentText(),
+                "form": form.form_combo.currentText(),
+                "amd": form.amb_combo.selectedItems(),
+                "sides": form.sides_combo.selectedItems(),
+                "angles": form.angles_combo.currentText(),
+                "laesurae": form.laesurae_shape_combo.selectedItems(),
+                "laesurae_rays": form.laesurae_rays_combo.selectedItems(),
+                "area_presence": form.area_presence_combo.currentText(),
+                "exine_structure": form.exine_structure_combo.selectedItems(),
+                "outline_shape": form.outline_shape_combo.currentText(),
+                "outline_uneven_cause": form.coutline_uneven_cause.text().strip(),
+                "rays_length_min": form.rays_length_min.text().strip(),
+                "rays_length_max": form.rays_length_max.text().strip(),
+                "additional_features": form.additional_features.text().strip(),
+                "exine_growth": {
+                    "type": form.growth_type_combo.currentText(),
+                    "thickness": form.growth_thickness_combo.currentText(),
+                    "width": form.growth_width_combo.currentText(),
+                    "structure": form.growth_structure_combo.currentText()
+                },
+                "exoexine": {
+                    "thickness": form.exoexine_thickness_combo.currentText(),
+                    "description": form.exoexine_description.text().strip()
+                },
+                "intexine": {
+                    "thickness": form.intexine_thickness_combo.currentText(),
+                    "description": form.intexine_description.text().strip()
+                },
+                "exine_thickness": form.exine_thickness_combo.currentText(),
+                "sculpture": [
+                    {"side": pair[0].currentText(), "values": pair[1].selectedItems()}
+                    for pair in getattr(form, 'sculpture_pairs', [])
+                ],
+                "ornamentation": [
+                    {"side": pair[0].currentText(), "values": pair[1].selectedItems()}
+                    for pair in getattr(form, 'ornamentation_pairs', [])
+                ]
+            },
+            "stratigraphy": form.stratigraphy_combo.selectedItems(),
+            "geography": form.geography_combo.selectedItems(),
+            "species": [
+                {
+                    "name": s['name'].text().strip(),
+                    "old_name": s['old_name'].text().strip(),
+                    "source": s['source'].text().strip(),
+                    "length_min": process_min_max(s['length_min'].text(), s['length_max'].text())[0],
+                    "length_max": process_min_max(s['length_min'].text(), s['length_max'].text())[1],
+                    "width_min": process_min_max(s['width_min'].text(), s['width_max'].text())[0],
+                    "width_max": process_min_max(s['width_min'].text(), s['width_max'].text())[1],
+                    "stratigraphy": s['stratigraphy'].selectedItems(),
+                    "geography": s['geography'].selectedItems()
+                }
+                for s in getattr(form, 'species_list', [])
+            ]
+        }
+        return data
+
+
+    @staticmethod
+    def safe_float(value: str) -> Optional[float]:
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+    # Показывает сообщение об ошибке
+    def show_error(self, message: str):
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Critical)
+        msg.setWindowTitle("Ошибка")
+        msg.setText(message)
+        msg.setStandardButtons(QMessageBox.Ok)
+        msg.exec()
+
+    # Показывает сообщение об успешном добавлении рода
+    def show_success(self, message: str):
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Information)
+        msg.setWindowTitle("Успешно")
+        msg.setText(message)
+        msg.setStandardButtons(QMessageBox.Ok)
+        msg.exec()
+
+    # Функция для кнопки Удалить на главной вкладке
+    def delete_selected_genus(self):
+        genus_name = self.window.selected_genus_name()
+        if genus_name is not None:
+
+            msg_box = QMessageBox()
+            msg_box.setWindowTitle('Подтверждение удаления')
+            msg_box.setText(f'Вы уверены, что хотите удалить род "{genus_name}"?')
+            msg_box.setIcon(QMessageBox.Question)
+
+            yes_btn = msg_box.addButton("Да", QMessageBox.YesRole)
+            no_btn = msg_box.addButton("Нет", QMessageBox.NoRole)
+            msg_box.setDefaultButton(no_btn)
+
+            msg_box.exec_()
+
+            if msg_box.clickedButton() == yes_btn:
+                try:
+                    with self.sessions.write("delete genus") as session:
+                        deleted = delete_genus(session, genus_name)
+                    # Сообщение - после выхода из единицы работы: таблица к этому
+                    # времени уже обновлена по шине изменений
+                    if deleted:
+                        QMessageBox.information(
+                            self.window,
+                            'Успех',
+                            f'Род "{genus_name}" успешно удален'
+                        )
+                    else:
+                        QMessageBox.warning(
+                            self.window,
+                            'Предупреждение',
+                            f'Род "{genus_name}" не найден в базе данных'
+                        )
+                except Exception as e:
+                    QMessageBox.critical(
+                        self.window,
+                        'Ошибка',
+                        f'Не удалось удалить род: {str(e)}'
+                    )
+
+    # Удаляет род по кнопке на вкладке с информацией о роде
+    def delete_genus_by_name(self, genus_name: str):
+        try:
+            with self.sessions.write("delete genus") as session:
+                deleted = delete_genus(session, genus_name)
+            # Вкладка рода закрывается по шине изменений
+            if deleted:
+                QMessageBox.information(self.window, 'Успех', f'Род "{genus_name}" удалён')
+            else:
+                QMessageBox.warning(self.window, 'Ошибка', f'Род "{genus_name}" не найден')
+        except Exception as e:
+            QMessageBox.critical(self.window, 'Ошибка', f'Не удалось удалить род: {str(e)}')
+
+
+    # Окно редактирования рода спор
+    def show_edit_genus_form(self, genus):
+        if self.edit_genus_form is None:
+            self.edit_genus_form = EditGenusForm(
+                options_data=self.all_options,
+                parent=self.window,
+                genus=genus
+            )
+            self.edit_genus_form.save_btn.clicked.connect(lambda: self.save_edited_genus(genus))
+            self.edit_genus_form.cancel_btn.clicked.connect(self.close_edit_genus_form)
+        else:
+            self.edit_genus_form = None
+            self.edit_genus_form = EditGenusForm(
+                options_data=self.all_options,
+                parent=self.window,
+                genus=genus
+            )
+            self.edit_genus_form.save_btn.clicked.connect(lambda: self.save_edited_genus(genus))
+            self.edit_genus_form.cancel_btn.clicked.connect(self.close_edit_genus_form)
+
+        self.edit_genus_form.show()
+        self.edit_genus_form.raise_()
+
+    # Функция для кнопки Изменить на главной вкладке
+    def show_edit_genus_form_from_main_tab(self):
+        genus_name = self.window.selected_genus_name()
+        if genus_name is None:
+            return
+        with self.sessions.read("open editor") as session:
+            genus = get_full_genus_data(session, genus_name)
+        self.show_edit_genus_form(genus)
+
+    # Закрывает форму изменения рода
+    def close_edit_genus_form(self):
+        if self.edit_genus_form:
+            self.edit_genus_form.hide()
+            self.edit_genus_form.deleteLater()
+            self.edit_genus_form = None
+
+    # Сохраняет изменения редактируемого рода
+    def save_edited_genus(self, original_genus):
+        try:
+            genus_data = self.collect_genus_data(self.edit_genus_form)
+            errors = self.validate_genus_data(genus_data)
+            if errors:
+                self.show_error("\n".join(errors))
+                return
+
+            with self.sessions.write("update genus") as session:
+                update_full_genus(session, original_genus.id, genus_data)
+
+            # Открытая вкладка рода обновляется по шине изменений, иначе открывается новая
+            if not self.genus_tabs({original_genus.id}):
+                self.show_genus_details_by_id(original_genus.id)
+
+            self.close_edit_genus_form()
+            self.show_success("Род успешно обновлен")
+
+        except ValueError as e:
+            self.show_error(str(e))
+        except Exception as e:
+            self.show_error(f"Ошибка при обновлении: {str(e)}")
+
+    def close_session(self):
+        genus_changes.unsubscribe(self._publish_changes)
+        self.jobs.shutdown()
+        self.sessions.close_all()
+
+
+# Загружает и сериализует данные для экспорта (выполняется в фоновом задании).
+# Сериализация обращается к связанным объектам, поэтому выполняется внутри сессии
+def load_export_frame(session, export_params, filters):
+    genus_ids = None
+    if export_params['source'] == 'current' and filters:
+        genus_ids = [row[0] for row in search_genus_table_rows(session, filters)]
+    if export_params['type'] == 'genera':
+        data = get_export_data(
+            session=session,
+            source=export_params['source'],
+            fields=export_params['fields'],
+            genus_ids=genus_ids
+        )
+    else:
+        data = get_export_species_data(
+            session=session,
+            source=export_params['source'],
+            genus_ids=genus_ids
+        )
+
+    return build_export_frame(
+        data=data,
+        fields=export_params['fields'],
+        is_species=(export_params['type'] != 'genera')
+    )
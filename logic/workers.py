@@ -0,0 +1,162 @@
+import logging
+import threading
+from collections import defaultdict
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from db.session_manager import session_manager
+
+logger = logging.getLogger(__name__)
+
+
+class JobSignals(QObject):
+    finished = Signal(str, int, object)
+    failed = Signal(str, int, str)
+    batch = Signal(str, int, object)
+
+
+# Передает изменения родов с шины (db/events.py) в поток интерфейса: подписчик шины
+# вызывается в потоке, зафиксировавшем запись, а обработчик сигнала - в потоке объекта
+class ChangeSignals(QObject):
+    changed = Signal(object)
+
+
+# Задание для пула потоков: открывает собственную сессию чтения, выполняет
+# func(session, *args) и передает результат через сигнал. Результат должен быть
+# готовыми данными (строки, словари, полностью загруженные объекты) - после выхода
+# из задания сессия закрыта
+class DatabaseJob(QRunnable):
+    def __init__(self, channel, generation, action, func, args, sessions=session_manager):
+        super().__init__()
+        self.channel = channel
+        self.generation = generation
+        self.action = action
+        self.func = func
+        self.args = args
+        self.sessions = sessions
+        self.signals = JobSignals()
+        self.cancelled = threading.Event()
+
+    def run(self):
+        if self.cancelled.is_set():
+            return
+        try:
+            with self.sessions.read(self.action) as session:
+                result = self.func(session, *self.args)
+        except Exception as e:
+            logger.exception("Ошибка в фоновом задании %s", self.action)
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(self.channel, self.generation, str(e))
+            return
+        if not self.cancelled.is_set():
+            self.signals.finished.emit(self.channel, self.generation, result)
+
+
+# Задание, выдающее результат частями: func(session, *args) - генератор, каждая
+# часть передается сигналом batch, по окончании finished сообщает число строк.
+# Отмена прерывает перебор между частями, и чтение из БД прекращается
+class StreamingDatabaseJob(DatabaseJob):
+    def run(self):
+        if self.cancelled.is_set():
+            return
+        total = 0
+        try:
+            with self.sessions.read(self.action) as session:
+                for batch in self.func(session, *self.args):
+                    if self.cancelled.is_set():
+                        return
+                    total += len(batch)
+                    self.signals.batch.emit(self.channel, self.generation, batch)
+        except Exception as e:
+            logger.exception("Ошибка в фоновом задании %s", self.action)
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(self.channel, self.generation, str(e))
+            return
+        if not self.cancelled.is_set():
+            self.signals.finished.emit(self.channel, self.generation, total)
+
+
+# Запускает обращения к БД в QThreadPool, чтобы не блокировать интерфейс.
+# Задания объединены в каналы ("query", "export", ...): у каждого канала счетчик
+# поколений, и новое задание делает все предыдущие в этом канале устаревшими.
+# Устаревшие задания не выполняются или их результаты отбрасываются.
+# Обработчики результата вызываются в потоке интерфейса
+class JobRunner(QObject):
+    def __init__(self, pool=None, sessions=session_manager):
+        super().__init__()
+        self.pool = pool or QThreadPool.globalInstance()
+        self.sessions = sessions
+        self._generations = defaultdict(int)
+        self._jobs = {}
+        self._handlers = {}
+
+    # Запускает func(session, *args) в фоне; on_result(результат) и on_error(текст ошибки)
+    # будут вызваны, только если задание не устарело к моменту завершения
+    def submit(self, channel, action, func, on_result, on_error=None, *args):
+        job = self._start(DatabaseJob, channel, action, func, args, (on_result, on_error, None))
+        return job.generation
+
+    # Запускает генератор func(session, *args) в фоне (см. StreamingDatabaseJob):
+    # on_batch(часть) вызывается для каждой части, on_result(число строк) - в конце
+    def submit_stream(self, channel, action, func, on_batch, on_result, on_error=None, *args):
+        job = self._start(StreamingDatabaseJob, channel, action, func, args, (on_result, on_error, on_batch))
+        return job.generation
+
+    def _start(self, job_class, channel, action, func, args, handlers):
+        self.cancel(channel)
+        generation = self._generations[channel]
+
+        job = job_class(channel, generation, action, func, args, self.sessions)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        job.signals.batch.connect(self._on_batch)
+        # Храним только флаг отмены: сам QRunnable удаляется пулом после выполнения
+        self._jobs[channel] = job.cancelled
+        self._handlers[channel] = handlers
+        self.pool.start(job)
+        return job
+
+    # Делает текущее задание канала устаревшим: еще не начатое завершится сразу,
+    # а результат уже выполняющегося будет отброшен
+    def cancel(self, channel):
+        self._generations[channel] += 1
+        cancelled = self._jobs.pop(channel, None)
+        self._handlers.pop(channel, None)
+        if cancelled is not None:
+            cancelled.set()
+
+    def is_running(self, channel):
+        return channel in self._jobs
+
+    # Отменяет все задания и дожидается завершения уже выполняющихся
+    def shutdown(self):
+        for channel in list(self._jobs):
+            self.cancel(channel)
+        self.pool.waitForDone()
+
+    def _take_handlers(self, channel, generation):
+        if generation != self._generations[channel]:
+            return None
+        self._jobs.pop(channel, None)
+        return self._handlers.pop(channel, None)
+
+    @Slot(str, int, object)
+    def _on_finished(self, channel, generation, result):
+        handlers = self._take_handlers(channel, generation)
+        if handlers:
+            handlers[0](result)
+
+    # Часть результата не завершает задание: обработчики остаются до finished
+    @Slot(str, int, object)
+    def _on_batch(self, channel, generation, batch):
+        if generation != self._generations[channel]:
+            return
+        handlers = self._handlers.get(channel)
+        if handlers and handlers[2]:
+            handlers[2](batch)
+
+    @Slot(str, int, str)
+    def _on_failed(self, channel, generation, message):
+        handlers = self._take_handlers(channel, generation)
+        if handlers and handlers[1]:
+            handlers[1](message)
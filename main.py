@@ -1,21 +1,38 @@
-import sys
-from PySide6.QtWidgets import QApplication
-
-from db.db_service import ensure_backup_exists
-from logic.main_window_logic import MainApp
-from qt_material import apply_stylesheet
-
-def main():
-    app = QApplication(sys.argv)
-
-    apply_stylesheet(app, theme="white_light_blue.xml")
-    ensure_backup_exists()
-    window = MainApp()
-    window.show()
-    sys.exit(app.exec())
-
-
-if __name__ == "__main__":
-    main()
-
-
+import sys
+from PySide6.QtWidgets import QApplication, QMessageBox
+
+from config import BACKUP_ON_STARTUP, SQL_INSTRUMENTATION, SQL_LOG_PATH
+from db.db_service import BackupThread, ensure_backup_exists
+from db.instrumentation import setup_sql_log
+from db.migrations import MigrationError, migrate_database
+from db.session import engine
+from logic.main_window_logic import MainApp
+from qt_material import apply_stylesheet
+
+def main():
+    app = QApplication(sys.argv)
+
+    apply_stylesheet(app, theme="white_light_blue.xml")
+    if SQL_INSTRUMENTATION:
+        setup_sql_log(SQL_LOG_PATH)
+    ensure_backup_exists()
+    try:
+        migrate_database(engine)
+    except MigrationError as e:
+        QMessageBox.critical(None, "Ошибка", f"Не удалось обновить структуру базы данных:\n{str(e)}")
+        sys.exit(1)
+    window = MainApp()
+    window.show()
+
+    # Очередная резервная копия в фоне; при выходе дожидаемся ее завершения
+    if BACKUP_ON_STARTUP:
+        backup_thread = BackupThread()
+        app.aboutToQuit.connect(backup_thread.wait)
+        backup_thread.start()
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
+
+
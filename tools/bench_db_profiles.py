@@ -0,0 +1,115 @@
+# Сравнение профилей производительности SQLite (db/session.py) на копии рабочей БД.
+# Замеряет время сохранения рода (create_full_genus) и расширенного поиска (filter_genera).
+#
+# Запуск из корня проекта:
+#     python tools/bench_db_profiles.py [--saves 20] [--searches 50]
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+
+from config import get_db_path
+from db.crud import filter_genera, get_filter_cache_stats
+from db.crud_add_genus import create_full_genus
+from db.migrations import migrate_database
+from db.session import PERFORMANCE_PROFILES, create_db_engine
+
+SEARCH_FILTERS = [
+    {"Инфратурма": ["Apiculati"]},
+    {"Инфратурма": ["Laevigati", "Apiculati"], "Размеры": {"length_min": 20.0, "length_max": 120.0}},
+    {"Скульптура": [("не указана/любая", "в виде шипов")]},
+    {},
+]
+
+
+def make_genus_data(profile_name, index):
+    name = f"Bench{profile_name.capitalize()}{index}"
+    return {
+        "genus": {
+            "name": name,
+            "full_name": f"{name} Bench, 2025",
+            "type_species": None,
+            "length_min": 20.0 + index,
+            "length_max": 40.0 + index,
+            "width_min": None,
+            "width_max": None,
+            "comparison": None,
+            "natural_affiliation": None,
+        },
+        "synonyms": [],
+        "diagnosis": {
+            "infraturma": "Apiculati",
+            "additional_features": f"benchmark {profile_name} {index}",
+        },
+        "stratigraphy": [],
+        "geography": [],
+        "species": [
+            {"name": f"{name} primus", "length_min": 30.0, "length_max": 35.0},
+        ],
+    }
+
+
+def format_ms(samples):
+    return f"{statistics.median(samples) * 1000:8.2f} мс (медиана), {max(samples) * 1000:8.2f} мс (макс)"
+
+
+def run_profile(profile_name, source_db, saves, searches):
+    workdir = tempfile.mkdtemp(prefix=f"bench_{profile_name}_")
+    db_path = os.path.join(workdir, "miospores.db")
+    shutil.copy2(source_db, db_path)
+
+    engine = create_db_engine(f"sqlite:///{db_path}", profile_name)
+    # Копия приводится к текущей структуре БД, как при запуске приложения
+    migrate_database(engine)
+    Session = sessionmaker(bind=engine)
+
+    save_times = []
+    for i in range(saves):
+        session = Session()
+        start = time.perf_counter()
+        create_full_genus(session, make_genus_data(profile_name, i))
+        save_times.append(time.perf_counter() - start)
+        session.close()
+
+    search_times = []
+    session = Session()
+    for i in range(searches):
+        filters = SEARCH_FILTERS[i % len(SEARCH_FILTERS)]
+        start = time.perf_counter()
+        filter_genera(session, filters)
+        search_times.append(time.perf_counter() - start)
+        session.expunge_all()
+    session.close()
+
+    engine.dispose()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return save_times, search_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение профилей производительности SQLite")
+    parser.add_argument("--saves", type=int, default=20)
+    parser.add_argument("--searches", type=int, default=50)
+    parser.add_argument("--db", default=get_db_path())
+    args = parser.parse_args()
+
+    for profile_name in PERFORMANCE_PROFILES:
+        save_times, search_times = run_profile(profile_name, args.db, args.saves, args.searches)
+        print(f"[{profile_name}]")
+        print(f"  create_full_genus: {format_ms(save_times)}")
+        print(f"  filter_genera:     {format_ms(search_times)}")
+
+    stats = get_filter_cache_stats()
+    print(f"Кэш запросов filter_genera: попаданий {stats['hits']}, промахов {stats['misses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# Замер полнотекстового поиска (db/fulltext.py) на копии БД, масштабированной
+# до заданного числа родов, и проверка триггеров: после изменений названий, синонимов,
+# видов и описаний индекс должен совпадать с построенным заново.
+#
+# Запуск из корня проекта:
+#     python tools/bench_fulltext.py [--genera 100000] [--repeats 5]
+
+import argparse
+import math
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from db.fulltext import FULLTEXT_TABLE, fulltext_rebuild_sql, search_fulltext
+from db.migrations import migrate_database
+from db.models import Genus, Species
+from db.session import create_db_engine
+from tools.synthetic_data import make_database_copy
+
+# Слова из описаний для запросов по тексту
+TEXT_WORDS = ["папоротники", "шип", "плаун", "орнамент", "скульптур", "экзин", "треуг", "сходен"]
+
+
+# Запросы: начала названий родов, эпитеты видов и слова описаний
+def sample_queries(session, count, rnd):
+    genus_names = session.execute(select(Genus.name).limit(2000)).scalars().all()
+    species_names = session.execute(select(Species.name).limit(5000)).scalars().all()
+    queries = []
+    for _ in range(count):
+        kind = rnd.randrange(3)
+        if kind == 0:
+            name = rnd.choice(genus_names)
+            queries.append(name[:rnd.randint(3, max(3, len(name)))])
+        elif kind == 1:
+            words = rnd.choice(species_names).split()
+            queries.append(" ".join(words[:2]) if len(words) > 1 else words[0])
+        else:
+            queries.append(rnd.choice(TEXT_WORDS))
+    return queries
+
+
+def measure(session, queries, repeats):
+    times = []
+    for query in queries:
+        query_times = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            search_fulltext(session, query)
+            query_times.append(time.perf_counter() - started)
+        times.append(statistics.median(query_times) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95)], times[-1]
+
+
+# Изменения всех видов, которые должны отслеживать триггеры индекса
+TRIGGER_CHECK_SQL = [
+    "UPDATE synonyms SET name = name || ' renamed' WHERE id = (SELECT min(synonym_id) FROM genera_synonyms)",
+    "INSERT INTO genera_synonyms (genus_id, synonym_id) SELECT 2, min(id) FROM synonyms",
+    "UPDATE genera SET comparison = 'проверочноеслово' WHERE id = 3",
+    "UPDATE diagnosis SET additional_features = 'признакпроверки' WHERE genus_id = 4",
+    "UPDATE species SET name = 'Checkspecies novus', old_name = NULL WHERE id = (SELECT min(id) FROM species)",
+    "UPDATE species SET genus_id = 6 WHERE id = (SELECT max(id) FROM species WHERE genus_id = 5)",
+    "DELETE FROM species WHERE id = (SELECT max(id) FROM species WHERE genus_id = 7)",
+    "DELETE FROM genera WHERE id = 8",
+]
+
+
+def documents(connection):
+    return connection.exec_driver_sql(f"SELECT * FROM {FULLTEXT_TABLE} ORDER BY rowid").all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер полнотекстового поиска")
+    parser.add_argument("--genera", type=int, default=100000, help="число родов в масштабированной копии")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    source = make_database_copy()
+    try:
+        # Журнал WAL переносится в файл БД при закрытии соединений, до копирования
+        engine = create_db_engine(f"sqlite:///{source}")
+        migrate_database(engine)
+        with sessionmaker(bind=engine)() as session:
+            genus_count = session.execute(select(func.count()).select_from(Genus)).scalar()
+        engine.dispose()
+        db_path = make_database_copy(math.ceil(args.genera / genus_count), source)
+    finally:
+        shutil.rmtree(os.path.dirname(source), ignore_errors=True)
+
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    rnd = random.Random(args.seed)
+    try:
+        with sessionmaker(bind=engine)() as session:
+            genus_count = session.execute(select(func.count()).select_from(Genus)).scalar()
+            species_count = session.execute(select(func.count()).select_from(Species)).scalar()
+            print(f"[{genus_count} родов, {species_count} видов]")
+
+            queries = sample_queries(session, args.queries, rnd)
+            median_ms, p95_ms, max_ms = measure(session, queries, args.repeats)
+            print(f"  поиск: медиана {median_ms:.2f} мс, 95% {p95_ms:.2f} мс, максимум {max_ms:.2f} мс")
+
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            for sql in TRIGGER_CHECK_SQL:
+                connection.exec_driver_sql(sql)
+            by_triggers = documents(connection)
+            for sql in fulltext_rebuild_sql():
+                connection.exec_driver_sql(sql)
+            rebuilt = documents(connection)
+    finally:
+        engine.dispose()
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    same = by_triggers == rebuilt
+    print(f"  индекс после изменений совпадает с построенным заново: {'да' if same else 'НЕТ'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
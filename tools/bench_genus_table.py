@@ -0,0 +1,95 @@
+# Замер загрузки главной таблицы родов: ORM-объекты (get_all_genera + обход связей)
+# против строк одного запроса с GROUP_CONCAT (get_genus_table_rows).
+# Работает на копиях БД: исходной и масштабированной до заданного числа родов.
+#
+# Запуск из корня проекта:
+#     python tools/bench_genus_table.py [--genera 50000] [--repeats 5]
+
+import argparse
+import math
+import os
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from db.crud import get_all_genera, get_genus_table_rows
+from db.models import Genus
+from db.session import create_db_engine
+from tools.synthetic_data import make_database_copy
+
+
+# Прежний способ: роды со связанными объектами, затем строки таблицы из них
+def orm_table_rows(session):
+    rows = []
+    for genus in get_all_genera(session):
+        synonyms = ", ".join([syn.name for syn in genus.synonyms]) if genus.synonyms else "-"
+        infraturma = genus.diagnosis.infraturma.name if genus.diagnosis else "-"
+        rows.append((genus.id, genus.name, synonyms, infraturma))
+    return rows
+
+
+def tuple_table_rows(session):
+    return [tuple(row) for row in get_genus_table_rows(session)]
+
+
+def measure(session_factory, load, repeats):
+    times = []
+    result = None
+    for _ in range(repeats):
+        session = session_factory()
+        started = time.perf_counter()
+        result = load(session)
+        times.append(time.perf_counter() - started)
+        session.close()
+    return statistics.median(times) * 1000, result
+
+
+def run(db_path, repeats):
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    session_factory = sessionmaker(bind=engine)
+    try:
+        with session_factory() as session:
+            genus_count = session.execute(select(func.count()).select_from(Genus)).scalar()
+        orm_ms, orm_rows = measure(session_factory, orm_table_rows, repeats)
+        tuple_ms, rows = measure(session_factory, tuple_table_rows, repeats)
+    finally:
+        engine.dispose()
+
+    same = sorted(orm_rows) == sorted(rows)
+    print(f"[{genus_count} родов]")
+    print(f"  ORM (get_all_genera):         {orm_ms:8.1f} мс")
+    print(f"  строки (get_genus_table_rows): {tuple_ms:8.1f} мс  (x{orm_ms / tuple_ms:.1f})")
+    print(f"  результаты совпадают: {'да' if same else 'НЕТ'}")
+    return same, genus_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер загрузки главной таблицы родов")
+    parser.add_argument("--genera", type=int, default=50000, help="число родов в масштабированной копии")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = make_database_copy()
+    try:
+        same, genus_count = run(db_path, args.repeats)
+    finally:
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    db_path = make_database_copy(math.ceil(args.genera / genus_count))
+    try:
+        scaled_same, _ = run(db_path, args.repeats)
+    finally:
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    if not (same and scaled_same):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Замер определения по частичному совпадению (CharacterMatrix.identify) на копии БД,
+# масштабированной до заданного числа родов. Заодно проверяет, что роды, совпавшие
+# по всем признакам, - это ровно результат обычного (строгого) поиска битовым индексом,
+# и что роды без единого совпавшего признака в результат не попадают.
+#
+# Запуск из корня проекта:
+#     python tools/bench_identification.py [--genera 100000] [--cases 50] [--seed 0]
+
+import argparse
+import math
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from db.bitmap_index import build_character_index
+from db.crud import get_all_options
+from db.identification import build_character_matrix, NON_CHARACTER_FIELDS
+from db.migrations import migrate_database
+from db.models import Genus
+from db.session import create_db_engine
+from tools.check_search_engines import random_filters
+from tools.synthetic_data import make_database_copy
+
+
+# Строгий поиск и полные совпадения сравнимы только без размеров (там разная семантика)
+def check_full_matches(matrix, index, filters):
+    filters = {label: values for label, values in filters.items()
+               if label not in NON_CHARACTER_FIELDS and label != "Размеры" and values}
+    identification = matrix.identify(filters, max_mismatches=0, top_k=len(matrix))
+    if not identification["characters"]:
+        return True
+    full = {result["id"] for result in identification["results"]
+            if result["score"] == identification["max_score"]}
+    strict = set(index.filter_ids(filters))
+    universe = set(index.filter_ids({}))
+    return strict == full & universe
+
+
+# Даже без ограничения несовпадений род, у которого не совпал ни один признак, не возвращается
+def check_no_empty_matches(matrix, filters):
+    identification = matrix.identify(filters, top_k=len(matrix))
+    return all(any(result["details"].values()) for result in identification["results"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер определения по частичному совпадению")
+    parser.add_argument("--genera", type=int, default=100000, help="число родов в масштабированной копии")
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--mismatches", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db_path = make_database_copy()
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    with sessionmaker(bind=engine)() as session:
+        genus_count = session.execute(select(func.count()).select_from(Genus)).scalar()
+    engine.dispose()
+    shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    db_path = make_database_copy(math.ceil(args.genera / genus_count))
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    try:
+        migrate_database(engine)
+        with sessionmaker(bind=engine)() as session:
+            options = get_all_options(session)
+            started = time.perf_counter()
+            matrix = build_character_matrix(session)
+            build_ms = (time.perf_counter() - started) * 1000
+            index = build_character_index(session)
+
+        rnd = random.Random(args.seed)
+        times = []
+        for case in range(args.cases):
+            filters = random_filters(rnd, options)
+            started = time.perf_counter()
+            matrix.identify(filters, max_mismatches=args.mismatches)
+            times.append(time.perf_counter() - started)
+
+            if not check_full_matches(matrix, index, filters):
+                print(f"РАСХОЖДЕНИЕ в случае {case}: {filters}")
+                sys.exit(1)
+            if not check_no_empty_matches(matrix, filters):
+                print(f"РОД БЕЗ СОВПАДЕНИЙ в результате, случай {case}: {filters}")
+                sys.exit(1)
+    finally:
+        engine.dispose()
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    print(f"[{len(matrix)} родов]")
+    print(f"  построение матрицы: {build_ms:8.1f} мс")
+    print(f"  определение:        {statistics.median(times) * 1000:8.1f} мс (медиана), "
+          f"{max(times) * 1000:.1f} мс (максимум)")
+    print(f"  полные совпадения равны строгому поиску во всех {args.cases} случаях")
+    print("  роды без совпавших признаков в результат не попадают")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# Замер главной таблицы: QTableWidget с элементом на каждую ячейку (прежний способ)
+# против модели над столбцовым хранилищем (ui/ui_genus_table.py). Строки исходной БД
+# размножаются в памяти до заданного числа. Замеряются заполнение таблицы, смена строк
+# при быстром поиске (время и память, выделенная на строку) и отрисовка при прокрутке.
+#
+# Запуск из корня проекта:
+#     python tools/bench_table_model.py [--rows 100000] [--frames 50]
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QTableWidget, QTableWidgetItem, QTableView, QHeaderView
+from sqlalchemy.orm import sessionmaker
+
+from db.crud import get_genus_table_rows
+from db.session import create_db_engine
+from tools.synthetic_data import make_database_copy
+from ui.ui_genus_table import GenusColumnStore, GenusTableModel, GenusRowsProxyModel
+
+# Сколько строк показывает быстрый поиск (QUICK_SEARCH_LIMIT)
+FOUND_ROWS = 200
+
+
+def table_rows(count):
+    db_path = make_database_copy()
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    try:
+        with sessionmaker(bind=engine)() as session:
+            source = [tuple(row) for row in get_genus_table_rows(session)]
+    finally:
+        engine.dispose()
+    rows = []
+    for number in range(count):
+        genus_id, name, synonyms, infraturma = source[number % len(source)]
+        rows.append((number + 1, f"{name}{number // len(source) or ''}", synonyms, infraturma))
+    return rows
+
+
+def timed(action):
+    started = time.perf_counter()
+    action()
+    return (time.perf_counter() - started) * 1000
+
+
+# Память, выделенная действием и не освобожденная после него
+def allocated(action):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    action()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before
+
+
+# QTableWidget.setItem в PySide6 6.12 при каждом вызове уменьшает счетчик ссылок None
+# (в приложении это и приводило к аварийному завершению после нескольких тысяч ячеек).
+# Чтобы прежний способ можно было замерить, ссылки на None удерживаются заранее
+_none_references = []
+
+
+def fill_widget(table, rows):
+    _none_references.extend([None] * (len(rows) * 3))
+    table.setRowCount(len(rows))
+    for row, (_, name, synonyms, infraturma) in enumerate(rows):
+        table.setItem(row, 0, QTableWidgetItem(name))
+        table.setItem(row, 1, QTableWidgetItem(synonyms))
+        table.setItem(row, 2, QTableWidgetItem(infraturma))
+
+
+# Время отрисовки после прокрутки к случайной строке, мс на кадр
+def scroll_frames(view, row_count, frames, rnd):
+    times = []
+    for _ in range(frames):
+        view.verticalScrollBar().setValue(rnd.randrange(row_count))
+        times.append(timed(view.viewport().repaint))
+    return statistics.median(times), max(times)
+
+
+def prepare_view(view):
+    view.resize(1000, 800)
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.show()
+    QApplication.processEvents()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер главной таблицы")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    rows = table_rows(args.rows)
+    rnd = random.Random(args.seed)
+    found = [rnd.sample(range(len(rows)), FOUND_ROWS) for _ in range(20)]
+    print(f"[{len(rows)} строк, найдено быстрым поиском - {FOUND_ROWS}]")
+
+    widget = QTableWidget()
+    widget.setColumnCount(3)
+    prepare_view(widget)
+    fill_ms = timed(lambda: fill_widget(widget, rows))
+    found_rows = [rows[position] for position in found[0]]
+    swap_ms = statistics.median(timed(lambda: fill_widget(widget, [rows[p] for p in positions]))
+                                for positions in found)
+    restore_ms = timed(lambda: fill_widget(widget, rows))
+    swap_bytes = allocated(lambda: fill_widget(widget, found_rows))
+    widget_frames = scroll_frames(widget, len(rows), args.frames, rnd)
+    widget.close()
+
+    model = GenusTableModel()
+    proxy = GenusRowsProxyModel()
+    proxy.setSourceModel(model)
+    view = QTableView()
+    view.setModel(proxy)
+    prepare_view(view)
+    store_ms = timed(lambda: model.set_store(GenusColumnStore(rows)))
+    model.store.position_of(0)
+    model_swap_ms = statistics.median(timed(lambda: proxy.set_rows(array("q", positions))) for positions in found)
+    model_restore_ms = timed(proxy.show_all)
+    model_swap_bytes = allocated(lambda: proxy.set_rows(array("q", found[0])))
+    proxy.show_all()
+    model_frames = scroll_frames(view, len(rows), args.frames, rnd)
+    view.close()
+
+    print(f"  {'':28}{'QTableWidget':>14}{'модель':>14}")
+    print(f"  {'заполнение, мс':28}{fill_ms:14.1f}{store_ms:14.1f}")
+    print(f"  {'смена строк поиска, мс':28}{swap_ms:14.1f}{model_swap_ms:14.2f}")
+    print(f"  {'возврат всех строк, мс':28}{restore_ms:14.1f}{model_restore_ms:14.2f}")
+    print(f"  {'память на смену, байт/стр.':28}{swap_bytes / FOUND_ROWS:14.0f}{model_swap_bytes / FOUND_ROWS:14.0f}")
+    print(f"  {'кадр прокрутки, мс (медиана)':28}{widget_frames[0]:14.2f}{model_frames[0]:14.2f}")
+    print(f"  {'кадр прокрутки, мс (макс.)':28}{widget_frames[1]:14.2f}{model_frames[1]:14.2f}")
+    # Без обычного завершения: при сборке мусора элементы QTableWidget снова
+    # уменьшили бы счетчик ссылок None (см. _none_references)
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
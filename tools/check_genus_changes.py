@@ -0,0 +1,205 @@
+# Проверка шины изменений (db/events.py) и обновления по измененным родам:
+# после добавления, изменения и удаления родов через единицы работы SessionManager
+# каждая запись должна опубликовать одно сообщение с верными видами изменений,
+# битовый индекс, обновленный по этим родам (CharacterIndex.with_changes), - давать
+# на случайных фильтрах те же роды, что и построенный заново, а строки таблицы
+# (GenusTableModel) после upsert_rows/remove_genera - совпадать с get_genus_table_rows,
+# в том числе при показанных результатах быстрого поиска.
+# Печатает время обновления индекса и время его построения.
+#
+# Запуск из корня проекта:
+#     python tools/check_genus_changes.py [--factor 1] [--cases 300] [--seed 0]
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from sqlalchemy import select, text
+from sqlalchemy.orm import sessionmaker
+
+from db.bitmap_index import CharacterIndexHolder, build_character_index
+from db.crud import delete_genus, get_all_options, get_genus_table_rows, table_order_key
+from db.events import genus_changes, GenusChanges, GENUS_CREATED, GENUS_UPDATED, GENUS_DELETED
+from db.migrations import migrate_database
+from db.models import Genus, Diagnosis, Infraturma, Species, GenusStratigraphy, StratigraphicPeriod
+from db.search import get_changed_table_rows
+from db.session import create_db_engine
+from db.session_manager import SessionManager
+from tools.check_search_engines import random_filters
+from tools.synthetic_data import make_database_copy
+from ui.ui_genus_table import GenusColumnStore, GenusTableModel, GenusRowsProxyModel
+
+# Связующие таблицы признаков, которые копируются новому роду от образца
+_DIAGNOSIS_LINKS = ["spore_diagnosis_amb", "spore_diagnosis_sides_shape", "spore_diagnosis_laesurae",
+                    "spore_diagnosis_laesurae_rays", "spore_diagnosis_exine_structure",
+                    "spore_diagnosis_exine_thickness", "spore_diagnosis_sculpture", "spore_diagnosis_ornamentation"]
+
+
+def fail(message):
+    print(f"  РАСХОЖДЕНИЕ: {message}")
+    sys.exit(1)
+
+
+# Записи, по которым проверяется шина: [(описание, функция записи, ожидаемые виды)]
+def writes(session_factory, rnd):
+    with session_factory() as session:
+        genus_ids = session.execute(select(Genus.id).join(Diagnosis)).scalars().all()
+        infraturma_ids = session.execute(select(Infraturma.id)).scalars().all()
+        period_ids = session.execute(select(StratigraphicPeriod.id)).scalars().all()
+    renamed, extended, removed, sample = rnd.sample(genus_ids, 4)
+
+    def update(session):
+        genus = session.get(Genus, renamed)
+        genus.name += "oides"
+        genus.length_min, genus.length_max = 5.0, 500.0
+        genus.diagnosis.infraturma_id = rnd.choice(infraturma_ids)
+        # Как функции crud: промежуточная фиксация внутри единицы работы
+        session.commit()
+        session.add(GenusStratigraphy(genus_id=renamed, period_id=rnd.choice(period_ids)))
+
+    def add_species(session):
+        session.add(Species(genus_id=extended, name="Checkisporites novus", length_min=1.0, length_max=2.0))
+
+    def create(session):
+        source = session.get(Genus, sample)
+        genus = Genus(name="Checkisporites", full_name="Checkisporites Test", length_min=source.length_min,
+                      length_max=source.length_max, width_min=source.width_min, width_max=source.width_max)
+        session.add(genus)
+        session.flush()
+        session.add(Diagnosis(genus_id=genus.id, infraturma_id=source.diagnosis.infraturma_id,
+                              form_id=source.diagnosis.form_id, outline_id=source.diagnosis.outline_id))
+        session.commit()
+        # Признаки копируются SQL-запросом в обход ORM: род уже отмечен созданным
+        for table in _DIAGNOSIS_LINKS:
+            columns = [row[1] for row in session.execute(text(f"PRAGMA table_info({table})"))]
+            other = ", ".join(column for column in columns if column != "diagnosis_id")
+            session.execute(text(f"INSERT INTO {table} (diagnosis_id, {other}) "
+                                 f"SELECT :new, {other} FROM {table} WHERE diagnosis_id = :source"),
+                            {"new": genus.id, "source": sample})
+        return genus.id
+
+    def delete(session):
+        delete_genus(session, session.get(Genus, removed).name)
+
+    return [
+        ("изменение рода", update, {renamed: GENUS_UPDATED}),
+        ("новый вид", add_species, {extended: GENUS_UPDATED}),
+        ("новый род", create, None),
+        ("удаление рода", delete, {removed: GENUS_DELETED}),
+    ]
+
+
+def mask_ids(index, mask):
+    return {index.rows[position][0] for position in index.positions_of(mask)}
+
+
+def compare_indexes(patched, rebuilt, options, rnd, cases):
+    for label, masks in rebuilt.field_masks.items():
+        for value, mask in masks.items():
+            if mask_ids(patched, patched.field_masks[label].get(value, 0)) != mask_ids(rebuilt, mask):
+                fail(f"маска {label} = {value}")
+    for case in range(cases):
+        filters = random_filters(rnd, options)
+        if set(patched.filter_ids(filters)) != set(rebuilt.filter_ids(filters)):
+            fail(f"фильтр {filters}")
+
+
+# Модель таблицы: сначала все строки, затем видимы только некоторые (как после быстрого поиска)
+def check_model(rows_before, rows_after, changes, changed_rows, rnd):
+    model = GenusTableModel()
+    proxy = GenusRowsProxyModel()
+    proxy.setSourceModel(model)
+    model.set_store(GenusColumnStore(rows_before))
+    visible = array("q", rnd.sample(range(len(rows_before)), min(50, len(rows_before))))
+    visible_ids = [rows_before[position][0] for position in visible]
+    proxy.set_rows(visible, [f"строка {position}" for position in visible])
+
+    model.remove_genera(changes.ids_of(GENUS_DELETED))
+    changed = changes.ids_of(GENUS_CREATED, GENUS_UPDATED)
+    model.upsert_rows(changed_rows)
+    model.remove_genera(changed - {row[0] for row in changed_rows})
+
+    store = model.store
+    expected = {row[0]: (row[1], row[2] or "-", row[3] or "-") for row in rows_after}
+    actual = {genus_id: (store.names[p], store.synonyms[p], store.infraturmas[p])
+              for p, genus_id in enumerate(store.ids)}
+    keys = [store.key(position) for position in range(len(store))]
+    if actual != expected or keys != sorted(keys):
+        fail("строки модели после изменений")
+    shown = [store.ids[proxy.source_row(row)] for row in range(proxy.rowCount())]
+    if shown != [genus_id for genus_id in visible_ids if genus_id in expected]:
+        fail("видимые строки после изменений")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка обновления по измененным родам")
+    parser.add_argument("--factor", type=int, default=1, help="во сколько раз увеличить число родов")
+    parser.add_argument("--cases", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    db_path = make_database_copy(args.factor)
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    rnd = random.Random(args.seed)
+    published = []
+    genus_changes.subscribe(published.append)
+    try:
+        migrate_database(engine)
+        session_factory = sessionmaker(bind=engine)
+        sessions = SessionManager(read_factory=session_factory, write_factory=session_factory)
+        holder = CharacterIndexHolder()
+        holder.attach()
+
+        with sessions.read() as session:
+            holder.get(session)
+            rows_before = sorted((tuple(row) for row in get_genus_table_rows(session)), key=table_order_key)
+            options = get_all_options(session)
+        print(f"[{len(rows_before)} родов]")
+
+        all_changes = {}
+        for description, write, expected in writes(session_factory, rnd):
+            published.clear()
+            with sessions.write(description) as session:
+                created = write(session)
+            if created is not None:
+                expected = {created: GENUS_CREATED}
+            if len(published) != 1 or published[0].kinds != expected or not published[0].complete:
+                fail(f"{description}: опубликовано {published}, ожидалось {expected}")
+            all_changes.update(expected)
+            print(f"  {description}: {expected}")
+        changes = GenusChanges(all_changes)
+
+        with sessions.read() as session:
+            started = time.perf_counter()
+            patched = holder.get(session)
+            patch_ms = (time.perf_counter() - started) * 1000
+            started = time.perf_counter()
+            rebuilt = build_character_index(session)
+            build_ms = (time.perf_counter() - started) * 1000
+            rows_after = [tuple(row) for row in get_genus_table_rows(session)]
+            changed_rows = get_changed_table_rows(session, changes.ids_of(GENUS_CREATED, GENUS_UPDATED))
+        if len(patched.sizes.patched) != len(all_changes):
+            fail("индекс построен заново, а не обновлен")
+        compare_indexes(patched, rebuilt, options, rnd, args.cases)
+        check_model(rows_before, rows_after, changes, changed_rows, rnd)
+    finally:
+        genus_changes.unsubscribe(published.append)
+        engine.dispose()
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    print(f"  обновление индекса: {patch_ms:.1f} мс, построение заново: {build_ms:.1f} мс")
+    print("  индекс и строки таблицы совпадают с построенными заново: да")
+
+
+if __name__ == "__main__":
+    main()
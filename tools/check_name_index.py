@@ -0,0 +1,115 @@
+# Проверка индекса названий (db/name_index.py): после переименования родов и видов,
+# добавления вида и удаления рода обновленный по измененным родам индекс должен совпадать
+# с построенным заново. Печатает время построения, время подсказки для названий
+# со случайной опечаткой и долю опечаток, для которых исходное название есть в подсказках.
+#
+# Запуск из корня проекта:
+#     python tools/check_name_index.py [--factor 1] [--queries 300] [--seed 0]
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from config import NAME_SUGGESTIONS
+from db.crud import delete_genus
+from db.migrations import migrate_database
+from db.models import Genus, Species
+from db.name_index import build_name_index, name_index
+from db.session import create_db_engine
+from db.events import mark_genus_changed
+from tools.synthetic_data import make_database_copy
+
+
+# Одна случайная опечатка: замена, пропуск, лишняя буква или перестановка соседних букв
+def misspell(name, rnd):
+    position = rnd.randrange(1, len(name) - 1)
+    kind = rnd.randrange(4)
+    if kind == 0:
+        return name[:position] + rnd.choice(string.ascii_lowercase) + name[position + 1:]
+    if kind == 1:
+        return name[:position] + name[position + 1:]
+    if kind == 2:
+        return name[:position] + rnd.choice(string.ascii_lowercase) + name[position:]
+    return name[:position] + name[position + 1] + name[position] + name[position + 2:]
+
+
+def contents(index):
+    return {index.names[name_id][0]: frozenset(owners) for name_id, owners in index._owners.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка индекса названий")
+    parser.add_argument("--factor", type=int, default=1, help="во сколько раз увеличить число родов")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db_path = make_database_copy(args.factor)
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    rnd = random.Random(args.seed)
+    try:
+        migrate_database(engine)
+        session_factory = sessionmaker(bind=engine)
+        name_index.invalidate()
+
+        with session_factory() as session:
+            started = time.perf_counter()
+            index = name_index.get(session)
+            build_ms = (time.perf_counter() - started) * 1000
+            names = [name for _, name in index.names.values() if len(name) >= 6]
+
+            times = []
+            found = 0
+            for name in rnd.sample(names, min(args.queries, len(names))):
+                started = time.perf_counter()
+                suggestions = index.suggest(misspell(name, rnd), NAME_SUGGESTIONS)
+                times.append((time.perf_counter() - started) * 1000)
+                found += any(suggestion == name for suggestion, _, _ in suggestions)
+            times.sort()
+
+            genus_ids = session.execute(select(Genus.id)).scalars().all()
+        print(f"[{len(index)} названий]")
+        print(f"  построение: {build_ms:.1f} мс")
+        print(f"  подсказка:  медиана {statistics.median(times):.2f} мс, 95% {times[int(len(times) * 0.95)]:.2f} мс, "
+              f"максимум {times[-1]:.2f} мс")
+        print(f"  исходное название среди подсказок: {found / len(times):.0%}")
+
+        renamed, extended, removed = rnd.sample(genus_ids, 3)
+        with session_factory() as session:
+            genus = session.get(Genus, renamed)
+            genus.name = genus.name + "oides"
+            for species in genus.species:
+                species.name = species.name.replace(" ", "oides ", 1)
+            mark_genus_changed(session, renamed)
+            session.add(Species(genus_id=extended, name="Checkisporites novus Test", old_name="Oldisporites novus"))
+            mark_genus_changed(session, extended)
+            session.commit()
+        with session_factory() as session:
+            removed_name = session.get(Genus, removed).name
+            delete_genus(session, removed_name)
+
+        with session_factory() as session:
+            updated = contents(name_index.get(session))
+            rebuilt = contents(build_name_index(session))
+    finally:
+        engine.dispose()
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    same = updated == rebuilt and all(genus_id != removed for owners in updated.values() for genus_id, _ in owners)
+    print(f"  индекс после изменений совпадает с построенным заново: {'да' if same else 'НЕТ'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Проверка запроса к главной таблице (run_genus_query в db/search.py): при наборе текста
+# по буквам (со случайными фильтрами панели) каждый следующий запрос получает предыдущий
+# результат и уточняет его; найденные роды должны совпадать с результатом того же запроса,
+# выполненного с нуля. Печатает время запроса на одну букву с предыдущим результатом
+# и без него и долю запросов, уточненных среди прежних совпадений.
+#
+# Запуск из корня проекта:
+#     python tools/check_query_pipeline.py [--factor 1] [--words 100] [--seed 0]
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from db.crud import get_all_options
+from db.fulltext import is_refinement
+from db.migrations import migrate_database
+from db.models import Genus, Species
+from db.search import run_genus_query
+from db.session import create_db_engine
+from tools.check_search_engines import random_filters
+from tools.synthetic_data import make_database_copy
+
+# Слова из описаний (как в tools/bench_fulltext.py)
+TEXT_WORDS = ["папоротники", "шиповатая", "плаун", "орнаментация", "скульптура", "экзина", "треугольная"]
+
+
+# Тексты, которые набираются по буквам: названия родов, видов и слова описаний
+def sample_texts(session, count, rnd):
+    genus_names = session.execute(select(Genus.name).limit(2000)).scalars().all()
+    species_names = session.execute(select(Species.name).limit(5000)).scalars().all()
+    texts = []
+    for _ in range(count):
+        kind = rnd.randrange(3)
+        if kind == 0:
+            texts.append(rnd.choice(genus_names))
+        elif kind == 1:
+            texts.append(rnd.choice(species_names))
+        else:
+            texts.append(rnd.choice(TEXT_WORDS))
+    return texts
+
+
+def timed(action):
+    started = time.perf_counter()
+    result = action()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка запроса к главной таблице")
+    parser.add_argument("--factor", type=int, default=1, help="во сколько раз увеличить число родов")
+    parser.add_argument("--words", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db_path = make_database_copy(args.factor)
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    rnd = random.Random(args.seed)
+    chained_times, scratch_times = [], []
+    # Время только тех запросов, что уточнены среди прежних совпадений
+    refined_times, refined_scratch_times = [], []
+    mismatches = 0
+    try:
+        migrate_database(engine)
+        with sessionmaker(bind=engine)() as session:
+            options = get_all_options(session)
+            texts = sample_texts(session, args.words, rnd)
+            # Индексы и кэш строк по фильтрам строятся до замеров
+            run_genus_query(session, {}, "")
+
+            for search_text in texts:
+                filters = random_filters(rnd, options) if rnd.random() < 0.5 else {}
+                previous = run_genus_query(session, filters, "")
+                for length in range(1, len(search_text) + 1):
+                    typed = search_text[:length]
+                    # Порядок чередуется, чтобы кэш страниц SQLite не давал преимущества одному из способов
+                    if length % 2:
+                        query, chained_ms = timed(lambda: run_genus_query(session, filters, typed, previous))
+                        scratch, scratch_ms = timed(lambda: run_genus_query(session, filters, typed))
+                    else:
+                        scratch, scratch_ms = timed(lambda: run_genus_query(session, filters, typed))
+                        query, chained_ms = timed(lambda: run_genus_query(session, filters, typed, previous))
+                    chained_times.append(chained_ms)
+                    scratch_times.append(scratch_ms)
+                    if previous.text_matches is not None and is_refinement(typed, previous.search_text):
+                        refined_times.append(chained_ms)
+                        refined_scratch_times.append(scratch_ms)
+                    if {genus_id for genus_id, _ in query.hits} != {genus_id for genus_id, _ in scratch.hits}:
+                        mismatches += 1
+                        print(f"  РАСХОЖДЕНИЕ: {typed!r}, фильтры {filters}")
+                    previous = query
+    finally:
+        engine.dispose()
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    print(f"[{args.words} текстов, {len(chained_times)} запросов]")
+    for label, times in (("с предыдущим результатом", chained_times), ("с нуля", scratch_times),
+                         ("уточненные", refined_times), ("они же с нуля", refined_scratch_times)):
+        if not times:
+            continue
+        times.sort()
+        print(f"  {label:26} медиана {statistics.median(times):.2f} мс, 95% {times[int(len(times) * 0.95)]:.2f} мс")
+    print(f"  уточнено среди прежних совпадений: {len(refined_times) / len(chained_times):.0%}")
+    print(f"  результаты совпадают: {'да' if not mismatches else 'НЕТ'}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
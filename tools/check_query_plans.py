@@ -0,0 +1,50 @@
+# Проверка планов выполнения горячих запросов (EXPLAIN QUERY PLAN).
+# Работает на масштабированной копии БД со всеми вторичными индексами и завершается
+# с ненулевым кодом, если какой-либо запрос полностью просматривает растущую таблицу.
+#
+# Запуск из корня проекта:
+#     python tools/check_query_plans.py [--factor 100]
+
+import argparse
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+
+from db.migrations import migrate_database
+from db.query_plan import check_hot_queries
+from db.session import create_db_engine
+from tools.synthetic_data import make_database_copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка планов выполнения горячих запросов")
+    parser.add_argument("--factor", type=int, default=100, help="во сколько раз увеличить число родов")
+    args = parser.parse_args()
+
+    db_path = make_database_copy(args.factor)
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    try:
+        migrate_database(engine)
+        failures = check_hot_queries(engine, sessionmaker(bind=engine))
+    finally:
+        engine.dispose()
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    for name, problems in failures.items():
+        print(f"FAIL {name}")
+        for statement, offending in problems:
+            print("    " + " ".join(statement.split())[:200])
+            for line in offending:
+                print(f"        {line}")
+
+    if failures:
+        sys.exit(1)
+    print("Все горячие запросы используют индексы")
+
+
+if __name__ == "__main__":
+    main()
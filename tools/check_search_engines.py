@@ -0,0 +1,246 @@
+# Проверка битового индекса признаков: на случайных фильтрах результаты
+# CharacterIndex и SQL-запроса filter_genus_table_rows должны совпадать.
+# Счетчики вариантов (facet_counts) сверяются с поиском, в котором поле
+# заменено этим вариантом. Поиск через кэш результатов (search_genus_table_rows)
+# проверяется на цепочках сужающихся и повторяющихся фильтров, ожидаемый остаток
+# в подсказке следующего признака (rank_next_characters) - прямым перебором состояний.
+# Дополнительно печатает медианное время каждого движка.
+# Завершается с ненулевым кодом при первом расхождении.
+#
+# Запуск из корня проекта:
+#     python tools/check_search_engines.py [--factor 1] [--cases 500] [--seed 0] [--facet-cases 20]
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+
+from db.bitmap_index import AGE, ANY_SIDE, FIELD_SOURCES, GEOGRAPHY, STRATIGRAPHY, build_character_index
+from db.crud import filter_genus_table_rows, get_all_options
+from db.key_characters import rank_next_characters
+from db.migrations import migrate_database
+from db.search import search_genus_table_rows, search_result_cache, get_search_cache_stats
+from db.session import create_db_engine
+from db.size_index import SIZE_MODES, DEFAULT_SIZE_MODE
+from logic.options_manager import get_field_mapping
+from tools.synthetic_data import make_database_copy
+
+
+# Случайный фильтр в формате SearchPanel.get_filters
+def random_filters(rnd, options):
+    mapping = get_field_mapping()
+    labels = [label for label, key in mapping.items()
+              if options.get(key) and not label.startswith(("Сторона", "Значение")) and not label.endswith(" все")]
+
+    filters = {}
+    for label in rnd.sample(labels, rnd.randint(0, 3)):
+        values = options[mapping[label]]
+        filters[label] = rnd.sample(values, min(len(values), rnd.randint(1, 3)))
+
+    for label, prefix in (("Скульптура", "sculpture"), ("Орнаментация", "ornamentation")):
+        if options.get(f"{prefix}_values") and rnd.random() < 0.4:
+            sides = ["не указана/любая"] + options.get(f"{prefix}_sides", [])
+            filters[label] = [(rnd.choice(sides), rnd.choice(options[f"{prefix}_values"]))
+                              for _ in range(rnd.randint(0, 2))]
+
+    if rnd.random() < 0.3:
+        bounds = {"length_min": rnd.choice([10.0, 30.0, 50.0]), "length_max": rnd.choice([40.0, 80.0, 150.0]),
+                  "width_min": rnd.choice([10.0, 30.0]), "width_max": rnd.choice([50.0, 100.0])}
+        filters["Размеры"] = {key: value for key, value in bounds.items() if rnd.random() < 0.5}
+        mode = rnd.choice(list(SIZE_MODES))
+        if mode != DEFAULT_SIZE_MODE:
+            filters["Размеры"]["mode"] = mode
+        if rnd.random() < 0.4:
+            filters["Размеры"]["species"] = True
+
+    if rnd.random() < 0.2:
+        extra = ["", "null", "Девон Средний", "карбон null, null", "DEVON"]
+        periods = options.get("stratigraphic_periods", [])
+        filters["Стратиграфическое распространение"] = rnd.sample(periods, min(len(periods), 2)) + [rnd.choice(extra)]
+
+    ages = list(options.get("stratigraphic_ages", {}).values())
+    if ages and rnd.random() < 0.2:
+        older, younger = rnd.choice(ages), rnd.choice(ages)
+        bounds = {"base": max(older[0], younger[0]), "top": min(older[1], younger[1])}
+        filters[AGE] = {key: value for key, value in bounds.items() if rnd.random() < 0.7}
+
+    if rnd.random() < 0.2:
+        locations = options.get("geographic_locations", [])
+        filters["Географическое распространение"] = [
+            f"Регион: {name}" if rnd.random() < 0.3 else name
+            for name in rnd.sample(locations, min(len(locations), 2))
+        ]
+    return filters
+
+
+# Фильтр не шире filters: убирает значение из поля, добавляет пару, сужает размеры или добавляет поле
+def narrow_filters(rnd, filters, options):
+    narrowed = {label: list(values) if isinstance(values, list) else dict(values)
+                for label, values in filters.items()}
+    or_labels = [label for label, values in narrowed.items()
+                 if isinstance(values, list) and len(values) > 1 and label not in (
+                     "Скульптура", "Орнаментация", STRATIGRAPHY, GEOGRAPHY)]
+    choice = rnd.random()
+    if or_labels and choice < 0.4:
+        values = narrowed[rnd.choice(or_labels)]
+        values.remove(rnd.choice(values))
+    elif choice < 0.6 and options.get("sculpture_values"):
+        sides = [ANY_SIDE] + options.get("sculpture_sides", [])
+        narrowed.setdefault("Скульптура", []).append(
+            (rnd.choice(sides), rnd.choice(options["sculpture_values"])))
+    elif choice < 0.7:
+        sizes = narrowed.setdefault("Размеры", {})
+        sizes["length_max"] = min(sizes.get("length_max", 200.0), rnd.choice([60.0, 100.0, 150.0]))
+    elif choice < 0.8 and AGE in narrowed:
+        age = narrowed[AGE]
+        age["top"] = max(age.get("top", 0.0), rnd.choice([300.0, 330.0, 360.0, 390.0]))
+    else:
+        extra = random_filters(rnd, options)
+        for label, values in extra.items():
+            narrowed.setdefault(label, values)
+    return narrowed
+
+
+# Проверяет счетчики вариантов для фильтров; возвращает текст первого расхождения или None
+def check_facets(index, filters, field_values, pair_values):
+    counts, pair_counts = index.facet_counts(filters, field_values, pair_values)
+    for label, values in counts.items():
+        for value, count in values.items():
+            narrowed = dict(filters, **{label: [value]})
+            expected = len(index.filter_rows(narrowed))
+            if count != expected:
+                return f"{label} = {value}: {count} вместо {expected}"
+    for label, values in pair_counts.items():
+        for (side, value), count in values.items():
+            narrowed = dict(filters, **{label: list(filters.get(label, [])) + [(side, value)]})
+            expected = len(index.filter_rows(narrowed))
+            if count != expected:
+                return f"{label} = ({side}, {value}): {count} вместо {expected}"
+    return None
+
+
+# Пересчитывает ожидаемый остаток каждого признака подсказки поиском по каждому состоянию;
+# возвращает текст первого расхождения или None
+def check_next_characters(index, filters, options):
+    total = len(index.filter_ids(filters))
+    mapping = get_field_mapping()
+    for entry in rank_next_characters(index, filters):
+        label = entry["label"]
+        if label in ("Скульптура", "Орнаментация"):
+            prefix = "sculpture" if label == "Скульптура" else "ornamentation"
+            variants = [dict(filters, **{label: [(ANY_SIDE, value)]}) for value in options[f"{prefix}_values"]]
+        else:
+            variants = [dict(filters, **{label: [value]}) for value in options.get(mapping[label], [])]
+        counts = [len(index.filter_ids(variant)) for variant in variants]
+        described = len(set().union(*(index.filter_ids(variant) for variant in variants)))
+        expected = sum(count * count for count in counts) / sum(counts) + total - described
+        if abs(expected - entry["expected"]) > 1e-6 or described != entry["described"]:
+            return f"{label}: {entry['expected']:.3f} вместо {expected:.3f}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение битового индекса и SQL-поиска")
+    parser.add_argument("--factor", type=int, default=1, help="во сколько раз увеличить число родов")
+    parser.add_argument("--cases", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--facet-cases", type=int, default=20, help="сколько случаев проверять счетчики вариантов")
+    args = parser.parse_args()
+
+    db_path = make_database_copy(args.factor)
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    try:
+        migrate_database(engine)
+        session = sessionmaker(bind=engine)()
+        options = get_all_options(session)
+
+        started = time.perf_counter()
+        index = build_character_index(session)
+        print(f"Индекс по {len(index)} родам построен за {(time.perf_counter() - started) * 1000:.1f} мс")
+
+        mapping = get_field_mapping()
+        field_values = {label: options.get(mapping[label], [])
+                        for label in list(FIELD_SOURCES) + [STRATIGRAPHY, GEOGRAPHY]}
+        pair_values = {
+            "Скульптура": ([ANY_SIDE] + options.get("sculpture_sides", []), options.get("sculpture_values", [])),
+            "Орнаментация": ([ANY_SIDE] + options.get("ornamentation_sides", []),
+                             options.get("ornamentation_values", [])),
+        }
+
+        rnd = random.Random(args.seed)
+        sql_times, index_times, facet_times, next_times = [], [], [], []
+        for case in range(args.cases):
+            filters = random_filters(rnd, options)
+
+            started = time.perf_counter()
+            expected = [tuple(row) for row in filter_genus_table_rows(session, filters)]
+            sql_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            actual = index.filter_rows(filters)
+            index_times.append(time.perf_counter() - started)
+
+            if sorted(expected) != sorted(actual):
+                print(f"РАСХОЖДЕНИЕ в случае {case}: {filters}")
+                print(f"    SQL: {len(expected)} родов, индекс: {len(actual)} родов")
+                sys.exit(1)
+
+            started = time.perf_counter()
+            index.facet_counts(filters, field_values, pair_values)
+            facet_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            rank_next_characters(index, filters)
+            next_times.append(time.perf_counter() - started)
+
+            if case < args.facet_cases:
+                problem = check_facets(index, filters, field_values, pair_values) or \
+                    check_next_characters(index, filters, options)
+                if problem:
+                    print(f"НЕВЕРНЫЙ СЧЕТЧИК в случае {case}: {filters}")
+                    print(f"    {problem}")
+                    sys.exit(1)
+
+        cache_times = {}
+        for search_engine in ("sql", "bitmap"):
+            search_result_cache.clear()
+            times = cache_times[search_engine] = []
+            for case in range(args.cases // 5):
+                chain = [random_filters(rnd, options)]
+                for _ in range(3):
+                    chain.append(narrow_filters(rnd, chain[-1], options))
+                # Пользователь часто возвращается к предыдущему фильтру
+                chain += [chain[-2], chain[-1], chain[1]]
+                for filters in chain:
+                    started = time.perf_counter()
+                    actual = search_genus_table_rows(session, filters, search_engine)
+                    times.append(time.perf_counter() - started)
+                    expected = [tuple(row) for row in filter_genus_table_rows(session, filters)]
+                    if sorted(expected) != sorted(actual):
+                        print(f"РАСХОЖДЕНИЕ КЭША ({search_engine}) в цепочке {case}: {filters}")
+                        print(f"    SQL: {len(expected)} родов, кэш: {len(actual)} родов")
+                        sys.exit(1)
+            print(f"Кэш результатов ({search_engine}): {get_search_cache_stats()}")
+        session.close()
+    finally:
+        engine.dispose()
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    print(f"Совпадают все {args.cases} случаев")
+    print(f"  SQL:    {statistics.median(sql_times) * 1000:8.3f} мс (медиана)")
+    print(f"  индекс: {statistics.median(index_times) * 1000:8.3f} мс (медиана)")
+    print(f"  счетчики вариантов: {statistics.median(facet_times) * 1000:8.3f} мс (медиана)")
+    print(f"  следующий признак:  {statistics.median(next_times) * 1000:8.3f} мс (медиана)")
+    for search_engine, times in cache_times.items():
+        print(f"  {search_engine} через кэш: {statistics.median(times) * 1000:8.3f} мс (медиана)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# Проверка инкрементального обновления матрицы сходства (db/similarity.py):
+# после изменения нескольких родов, удаления одного и пересчета только их строк
+# матрица должна совпадать с рассчитанной заново. Затем новый экземпляр (как после
+# перезапуска) должен взять матрицу с диска, а после изменения рода, о котором
+# хранилище не знает (правка до закрытия приложения или другим процессом), - рассчитать
+# ее заново по несовпавшему отпечатку. Наконец, размеры рода выходят за прежний диапазон,
+# и матрица тоже рассчитывается заново. Печатает время полного расчета и обновлений.
+#
+# Запуск из корня проекта:
+#     python tools/check_similarity.py [--factor 1] [--changes 5] [--seed 0]
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from db.events import GenusChanges
+from db.identification import character_matrix
+from db.migrations import migrate_database
+from db.session import create_db_engine
+from db.similarity import SimilarityStore
+from tools.synthetic_data import make_database_copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка инкрементального обновления матрицы сходства")
+    parser.add_argument("--factor", type=int, default=1, help="во сколько раз увеличить число родов")
+    parser.add_argument("--changes", type=int, default=5, help="сколько родов изменить")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db_path = make_database_copy(args.factor)
+    directory = os.path.dirname(db_path)
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    try:
+        migrate_database(engine)
+        session_factory = sessionmaker(bind=engine)
+        store = SimilarityStore(os.path.join(directory, "similarity.npz"))
+
+        with session_factory() as session:
+            started = time.perf_counter()
+            store.ensure(session)
+            full_ms = (time.perf_counter() - started) * 1000
+
+        rnd = random.Random(args.seed)
+        changed = rnd.sample(store.ids, args.changes + 4)
+        removed, unnoticed, widened, untracked = changed[:4]
+        changed = changed[4:]
+        with session_factory() as session:
+            change_genera(session, rnd, changed)
+            session.execute(text("DELETE FROM genera WHERE id = :id"), {"id": removed})
+            session.commit()
+        character_matrix.invalidate()
+
+        store.mark_changed(changed)
+        with session_factory() as session:
+            started = time.perf_counter()
+            store.ensure(session)
+            incremental_ms = (time.perf_counter() - started) * 1000
+            compare(store, fresh_store(session, directory), "после обновления")
+
+        # Новый экземпляр читает матрицу с диска, как после перезапуска приложения
+        restarted = SimilarityStore(store.path)
+        with session_factory() as session:
+            started = time.perf_counter()
+            restarted.ensure(session)
+            restart_ms = (time.perf_counter() - started) * 1000
+            compare(restarted, store, "после перезапуска")
+
+        # Изменение, не прошедшее через шину: матрица на диске устарела
+        with session_factory() as session:
+            change_genera(session, rnd, [unnoticed])
+            session.commit()
+        character_matrix.invalidate()
+        stale = SimilarityStore(store.path)
+        with session_factory() as session:
+            started = time.perf_counter()
+            stale.ensure(session)
+            stale_ms = (time.perf_counter() - started) * 1000
+            compare(stale, fresh_store(session, directory), "после изменения без шины")
+
+        with session_factory() as session:
+            change_genera(session, rnd, [widened], widen=True)
+            session.commit()
+        character_matrix.invalidate()
+        stale.mark_changed([widened])
+        with session_factory() as session:
+            started = time.perf_counter()
+            stale.ensure(session)
+            widened_ms = (time.perf_counter() - started) * 1000
+            compare(stale, fresh_store(session, directory), "после выхода за диапазон размеров")
+
+        # Изменение, которое шина не смогла отнести к конкретным родам (complete=False)
+        with session_factory() as session:
+            change_genera(session, rnd, [untracked])
+            session.commit()
+        character_matrix.invalidate()
+        stale.on_changes(GenusChanges(complete=False))
+        with session_factory() as session:
+            stale.ensure(session)
+            compare(stale, fresh_store(session, directory), "после неполного изменения")
+    finally:
+        engine.dispose()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"  полный расчет:            {full_ms:8.1f} мс")
+    print(f"  обновление {args.changes} родов:      {incremental_ms:8.1f} мс")
+    print(f"  перезапуск (с диска):     {restart_ms:8.1f} мс")
+    print(f"  устаревший файл:          {stale_ms:8.1f} мс")
+    print(f"  новый диапазон размеров:  {widened_ms:8.1f} мс")
+    print("  совпадает с полным расчетом: да")
+
+
+# Меняет размеры и скульптуру родов; с widen длина выходит далеко за прежний диапазон
+def change_genera(session, rnd, genus_ids, widen=False):
+    for genus_id in genus_ids:
+        low, high = (1000.0, 1200.0) if widen else (rnd.uniform(10, 50), rnd.uniform(50, 150))
+        session.execute(text("UPDATE genera SET length_min = :low, length_max = :high WHERE id = :id"),
+                        {"low": low, "high": high, "id": genus_id})
+        session.execute(text("DELETE FROM spore_diagnosis_sculpture WHERE diagnosis_id = :id"),
+                        {"id": genus_id})
+
+
+def fresh_store(session, directory):
+    fresh = SimilarityStore(os.path.join(directory, "similarity_fresh.npz"))
+    fresh.invalidate()
+    fresh.ensure(session)
+    return fresh
+
+
+def compare(store, expected, stage):
+    if store.ids != expected.ids:
+        print(f"НЕСОВПАДЕНИЕ состава родов {stage}")
+        sys.exit(1)
+    difference = float(np.abs(store.matrix - expected.matrix).max())
+    print(f"  [{len(store.ids)} родов] {stage}: максимальное расхождение {difference:.2e}")
+    if difference > 1e-5 or store.matrix.min() < 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
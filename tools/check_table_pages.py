@@ -0,0 +1,158 @@
+# Проверка постраничной загрузки главной таблицы (get_genus_table_page в db/search.py):
+# страницы подряд по ключу (название, id) должны дать те же строки в том же порядке,
+# что и полный результат поиска, для всех родов и случайных фильтров обоими движками.
+# Затем таблица (QTableView над GenusTableModel) прокручивается к концу, пока модель
+# запрашивает страницы; найденные быстрым поиском роды из незагруженных страниц
+# добавляются заранее и не должны повториться. Печатает время первой страницы
+# и время полного результата.
+#
+# Запуск из корня проекта:
+#     python tools/check_table_pages.py [--factor 1] [--cases 50] [--page N] [--seed 0]
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QTableView
+from sqlalchemy.orm import sessionmaker
+
+from db.crud import get_all_options, get_genus_table_rows, filter_genus_table_rows, table_order_key
+from db.migrations import migrate_database
+from db.search import get_genus_table_page, search_result_cache
+from db.session import create_db_engine
+from tools.check_search_engines import random_filters
+from tools.synthetic_data import make_database_copy
+from ui.ui_genus_table import GenusColumnStore, GenusTableModel, GenusRowsProxyModel
+
+
+# PySide6 6.12 при каждом вызове метода Qt без результата (beginInsertRows, resize, ...)
+# уменьшает счетчик ссылок None, а при выдаче сигнала - True (см. tools/bench_table_model.py).
+# Прокрутка большой таблицы делает тысячи таких вызовов, поэтому ссылки удерживаются заранее
+_none_references = [None] * 1000000
+_true_references = [True] * 100000
+
+
+def fail(message):
+    print(f"  РАСХОЖДЕНИЕ: {message}")
+    sys.exit(1)
+
+
+def timed(action):
+    started = time.perf_counter()
+    result = action()
+    return result, (time.perf_counter() - started) * 1000
+
+
+# Все страницы подряд
+def all_pages(session, filters, page_size, search_engine):
+    rows, after = [], None
+    while True:
+        page, has_more = get_genus_table_page(session, filters, after, page_size, search_engine)
+        rows += page
+        if not has_more:
+            return rows
+        after = table_order_key(page[-1])
+
+
+# Таблица прокручивается к концу, пока есть страницы; found_rows - строки
+# найденных быстрым поиском родов, добавленные до прокрутки
+def scroll_to_end(session, page_size, found_rows):
+    model = GenusTableModel()
+    proxy = GenusRowsProxyModel()
+    proxy.setSourceModel(model)
+    view = QTableView()
+    view.setModel(proxy)
+    view.resize(600, 400)
+    view.show()
+
+    pages = []
+    model.fetch_requested.connect(lambda: pages.append(
+        get_genus_table_page(session, {}, model.loaded_key, page_size, "sql")))
+    first, has_more = get_genus_table_page(session, {}, None, page_size, "sql")
+    model.set_store(GenusColumnStore(first), has_more)
+    model.add_rows(found_rows)
+
+    requests = 0
+    while True:
+        view.scrollToBottom()
+        QApplication.processEvents()
+        if not pages:
+            break
+        requests += 1
+        model.append_page(*pages.pop())
+    view.close()
+    return model.store, requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка постраничной загрузки таблицы")
+    parser.add_argument("--factor", type=int, default=1, help="во сколько раз увеличить число родов")
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--page", type=int, default=None,
+                        help="строк на странице (по умолчанию десятая часть родов)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    db_path = make_database_copy(args.factor)
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    rnd = random.Random(args.seed)
+    first_times, full_times = [], []
+    try:
+        migrate_database(engine)
+        with sessionmaker(bind=engine)() as session:
+            options = get_all_options(session)
+            expected = sorted((tuple(row) for row in get_genus_table_rows(session)), key=table_order_key)
+            # Страница должна быть заметно меньше таблицы, иначе прокрутка ничего не догружает
+            args.page = args.page or max(1, len(expected) // 10)
+            print(f"[{len(expected)} родов, страница - {args.page} строк]")
+            # Время замеряется после первого прохода: запросы уже скомпилированы
+            if all_pages(session, {}, args.page, "sql") != expected:
+                fail("страницы всех родов")
+            _, first_ms = timed(lambda: get_genus_table_page(session, {}, None, args.page))
+            _, full_ms = timed(lambda: sorted(get_genus_table_rows(session), key=table_order_key))
+            print(f"  все роды: первая страница {first_ms:.2f} мс, все строки {full_ms:.2f} мс")
+
+            for search_engine in ("sql", "bitmap"):
+                search_result_cache.clear()
+                for case in range(args.cases):
+                    filters = random_filters(rnd, options)
+                    if not filters:
+                        continue
+                    rows = sorted((tuple(row) for row in filter_genus_table_rows(session, filters)),
+                                  key=table_order_key)
+                    if all_pages(session, filters, args.page, search_engine) != rows:
+                        fail(f"страницы ({search_engine}) для {filters}")
+                    if search_engine == "sql":
+                        _, page_ms = timed(lambda: get_genus_table_page(session, filters, None, args.page,
+                                                                        search_engine))
+                        first_times.append(page_ms)
+                        full_times.append(timed(lambda: filter_genus_table_rows(session, filters))[1])
+            print(f"  фильтры (SQL): первая страница {statistics.median(first_times):.2f} мс, "
+                  f"все строки {statistics.median(full_times):.2f} мс (медианы)")
+
+            found_rows = rnd.sample(expected[args.page:], min(20, max(0, len(expected) - args.page)))
+            store, requests = scroll_to_end(session, args.page, found_rows)
+            actual = [(store.ids[p], store.names[p]) for p in range(len(store))]
+            if actual != [(row[0], row[1]) for row in expected]:
+                fail("строки таблицы после прокрутки к концу")
+            if requests < 2:
+                fail(f"прокрутка к концу: всего {requests} запросов страниц, уменьшите --page")
+            print(f"  прокрутка к концу: {requests} запросов страниц, строки совпадают")
+    finally:
+        engine.dispose()
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    print("  страницы совпадают с полным результатом: да")
+
+
+if __name__ == "__main__":
+    main()
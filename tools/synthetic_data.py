@@ -0,0 +1,111 @@
+# Подготовка синтетических копий БД для проверок и замеров производительности:
+# каждый род со всеми зависимыми строками (диагноз, связи, виды) размножается
+# с новыми идентификаторами, справочники остаются прежними.
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import get_db_path
+from db.fulltext import FULLTEXT_TABLE, fulltext_drop_triggers_sql, fulltext_rebuild_sql, fulltext_trigger_sql
+
+# Таблицы, строки которых принадлежат роду: (таблица, столбец с id рода)
+GENUS_DIAGNOSIS_TABLES = [
+    ("spore_diagnosis_amb", "diagnosis_id"),
+    ("spore_diagnosis_sides_shape", "diagnosis_id"),
+    ("spore_diagnosis_laesurae", "diagnosis_id"),
+    ("spore_diagnosis_laesurae_rays", "diagnosis_id"),
+    ("spore_diagnosis_exine_thickness", "diagnosis_id"),
+    ("spore_diagnosis_exine_structure", "diagnosis_id"),
+    ("spore_diagnosis_sculpture", "diagnosis_id"),
+    ("spore_diagnosis_ornamentation", "diagnosis_id"),
+    ("exine_growth_form", "diagnosis_id"),
+    ("exoexine", "diagnosis_id"),
+    ("intexine", "diagnosis_id"),
+    ("genera_synonyms", "genus_id"),
+    ("genus_geography", "genus_id"),
+    ("genus_stratigraphy", "genus_id"),
+]
+
+
+def _columns(connection, table):
+    return [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+
+
+def _copy_rows(connection, table, key_column, offset, source_filter):
+    columns = _columns(connection, table)
+    select_columns = [f"{column} + {offset}" if column == key_column else column for column in columns]
+    connection.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"SELECT {', '.join(select_columns)} FROM {table} WHERE {source_filter}"
+    )
+
+
+# Увеличивает число родов в БД примерно в factor раз (копии получают суффикс в названии)
+def scale_database(db_path, factor):
+    connection = sqlite3.connect(db_path)
+    try:
+        max_genus = connection.execute("SELECT max(id) FROM genera").fetchone()[0]
+        max_species = connection.execute("SELECT max(id) FROM species").fetchone()[0]
+        genus_columns = _columns(connection, "genera")
+        species_columns = _columns(connection, "species")
+        # Полнотекстовый индекс заполняется один раз после копирования, а не триггерами на каждую строку
+        has_fulltext = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (FULLTEXT_TABLE,)).fetchone() is not None
+        if has_fulltext:
+            for sql in fulltext_drop_triggers_sql():
+                connection.execute(sql)
+
+        for copy in range(1, factor):
+            genus_offset = max_genus * copy
+            species_offset = max_species * copy
+
+            connection.execute(
+                f"INSERT INTO genera ({', '.join(genus_columns)}) SELECT "
+                + ", ".join(
+                    f"id + {genus_offset}" if c == "id"
+                    else f"name || ' {copy}'" if c in ("name", "full_name")
+                    else c
+                    for c in genus_columns
+                )
+                + f" FROM genera WHERE id <= {max_genus}"
+            )
+            _copy_rows(connection, "diagnosis", "genus_id", genus_offset,
+                       f"genus_id <= {max_genus}")
+            for table, key_column in GENUS_DIAGNOSIS_TABLES:
+                _copy_rows(connection, table, key_column, genus_offset, f"{key_column} <= {max_genus}")
+
+            connection.execute(
+                f"INSERT INTO species ({', '.join(species_columns)}) SELECT "
+                + ", ".join(
+                    f"id + {species_offset}" if c == "id"
+                    else f"genus_id + {genus_offset}" if c == "genus_id"
+                    else c
+                    for c in species_columns
+                )
+                + f" FROM species WHERE id <= {max_species}"
+            )
+            for table in ("species_geography", "species_stratigraphy"):
+                _copy_rows(connection, table, "species_id", species_offset, f"species_id <= {max_species}")
+
+        if has_fulltext:
+            for sql in fulltext_rebuild_sql() + fulltext_trigger_sql():
+                connection.execute(sql)
+        connection.commit()
+        connection.execute("ANALYZE")
+    finally:
+        connection.close()
+
+
+# Копирует рабочую БД во временный каталог и при необходимости масштабирует ее
+def make_database_copy(factor=1, source=None):
+    workdir = tempfile.mkdtemp(prefix="miospores_")
+    db_path = os.path.join(workdir, "miospores.db")
+    shutil.copy2(source or get_db_path(), db_path)
+    if factor > 1:
+        scale_database(db_path, factor)
+    return db_path
@@ -0,0 +1,419 @@
+import sys
+from array import array
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex, Signal
+
+# Роли и ориентация - в константах модуля: data() вызывается для каждой видимой ячейки
+# и каждой роли, а обращение к атрибуту Qt в PySide6 заметно дороже сравнения
+_DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+_TOOLTIP_ROLE = Qt.ItemDataRole.ToolTipRole
+_HORIZONTAL = Qt.Orientation.Horizontal
+_VERTICAL = Qt.Orientation.Vertical
+_ROW_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+
+# Строки главной таблицы по столбцам: id родов - в array, тексты - в списках.
+# Повторяющиеся тексты (инфратурма, "-" вместо синонимов) хранятся одной строкой (sys.intern).
+# rows - строки get_genus_table_rows: (id, название, синонимы, инфратурма)
+# в порядке таблицы - по (название, id), см. table_order_key в db/crud.py
+class GenusColumnStore:
+    def __init__(self, rows=()):
+        self.ids = array("q")
+        self.names = []
+        self.synonyms = []
+        self.infraturmas = []
+        self._positions = None
+        self.append(rows)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Номер строки рода или None; словарь строится при первом обращении
+    def position_of(self, genus_id):
+        if self._positions is None:
+            self._positions = {genus_id: position for position, genus_id in enumerate(self.ids)}
+        return self._positions.get(genus_id)
+
+    # Ключ порядка строки: (название, id)
+    def key(self, position):
+        return self.names[position], self.ids[position]
+
+    # Номер, на котором должна стоять строка с ключом key, чтобы порядок сохранился
+    def insert_position(self, key):
+        low, high = 0, len(self.ids)
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    # Добавляет строки в конец (их ключи больше ключа последней строки)
+    def append(self, rows):
+        for genus_id, name, synonyms, infraturma in rows:
+            if self._positions is not None:
+                self._positions[genus_id] = len(self.ids)
+            self.ids.append(genus_id)
+            self.names.append(name)
+            self.synonyms.append(sys.intern(synonyms or "-"))
+            self.infraturmas.append(sys.intern(infraturma or "-"))
+
+    # Вставляет строки подряд, начиная с номера position (rows - в порядке таблицы)
+    def insert_rows(self, position, rows):
+        if position == len(self.ids):
+            self.append(rows)
+            return
+        self.ids[position:position] = array("q", (row[0] for row in rows))
+        self.names[position:position] = [row[1] for row in rows]
+        self.synonyms[position:position] = [sys.intern(row[2] or "-") for row in rows]
+        self.infraturmas[position:position] = [sys.intern(row[3] or "-") for row in rows]
+        self._positions = None
+
+    def insert(self, position, row):
+        genus_id, name, synonyms, infraturma = row
+        self.ids.insert(position, genus_id)
+        self.names.insert(position, name)
+        self.synonyms.insert(position, sys.intern(synonyms or "-"))
+        self.infraturmas.insert(position, sys.intern(infraturma or "-"))
+        # Номера следующих строк сдвинулись; строка в конце их не сдвигает
+        if self._positions is not None and position == len(self.ids) - 1:
+            self._positions[genus_id] = position
+        else:
+            self._positions = None
+
+    def replace(self, position, row):
+        _, name, synonyms, infraturma = row
+        self.names[position] = name
+        self.synonyms[position] = sys.intern(synonyms or "-")
+        self.infraturmas[position] = sys.intern(infraturma or "-")
+
+    # Переносит строку position на место new_position (номер после переноса)
+    def move(self, position, new_position, row):
+        self.remove(position)
+        self.insert(new_position, row)
+
+    def remove(self, position):
+        del self.ids[position]
+        del self.names[position]
+        del self.synonyms[position]
+        del self.infraturmas[position]
+        self._positions = None
+
+
+# Модель строк хранилища. Текст ячейки берется из столбца хранилища
+# при отрисовке, объектов на строку или ячейку не создается.
+# Строки загружаются страницами (keyset-пагинация по ключу (название, id)): когда таблицу
+# прокручивают к концу, представление вызывает fetchMore, модель выдает fetch_requested,
+# а загруженная в фоне страница добавляется через append_page
+class GenusTableModel(QAbstractTableModel):
+    COLUMNS = ["Название рода", "Синонимы", "Инфратурма"]
+
+    fetch_requested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = GenusColumnStore()
+        self._columns = (self.store.names, self.store.synonyms, self.store.infraturmas)
+        # Есть ли страницы дальше, ключ последней строки загруженных страниц
+        # и ждет ли модель следующую страницу
+        self.has_more = False
+        self.loaded_key = None
+        self._fetching = False
+
+    # has_more - строки store - только первая страница результата
+    def set_store(self, store, has_more=False):
+        self.beginResetModel()
+        self.store = store
+        self._columns = (store.names, store.synonyms, store.infraturmas)
+        self.has_more = has_more
+        self.loaded_key = store.key(len(store) - 1) if len(store) else None
+        self._fetching = False
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._fetching = True
+            self.fetch_requested.emit()
+
+    # Следующая страница строк (после loaded_key). Строки, уже попавшие в таблицу
+    # (найденные быстрым поиском или измененные роды), пропускаются
+    def append_page(self, rows, has_more):
+        self._fetching = False
+        self.has_more = has_more
+        if not rows:
+            return
+        self.loaded_key = (rows[-1][1], rows[-1][0])
+        # Строки вставляются блоками между уже стоящими в таблице; обычно вся
+        # страница - один блок в конце таблицы. Блоки - с конца, чтобы номера
+        # мест для предыдущих блоков не сдвигались
+        blocks = {}
+        for row in rows:
+            if self.store.position_of(row[0]) is None:
+                blocks.setdefault(self.store.insert_position((row[1], row[0])), []).append(row)
+        for position in sorted(blocks, reverse=True):
+            self.beginInsertRows(QModelIndex(), position, position + len(blocks[position]) - 1)
+            self.store.insert_rows(position, blocks[position])
+            self.endInsertRows()
+
+    # Страница не загрузилась: следующая прокрутка к концу запросит ее снова
+    def fetch_failed(self):
+        self._fetching = False
+
+    # Попадает ли строка с ключом key в загруженные страницы
+    def _is_loaded(self, key):
+        return not self.has_more or key <= self.loaded_key
+
+    def _insert(self, row):
+        position = self.store.insert_position((row[1], row[0]))
+        self.beginInsertRows(QModelIndex(), position, position)
+        self.store.insert(position, row)
+        self.endInsertRows()
+
+    def _remove(self, position):
+        self.beginRemoveRows(QModelIndex(), position, position)
+        self.store.remove(position)
+        self.endRemoveRows()
+
+    # Вставляет или обновляет строки родов (строки get_genus_table_rows), не сбрасывая модель:
+    # выделение, прокрутка и найденные быстрым поиском строки сохраняются.
+    # Переименованный род переносится на новое место; если оно в еще не загруженных
+    # страницах, строка убирается - она придет со своей страницей
+    def upsert_rows(self, rows):
+        for row in rows:
+            key = (row[1], row[0])
+            position = self.store.position_of(row[0])
+            if position is None:
+                if self._is_loaded(key):
+                    self._insert(row)
+                continue
+            if self.store.key(position) != key:
+                if not self._is_loaded(key):
+                    self._remove(position)
+                    continue
+                position = self._move(position, key, row)
+            self.store.replace(position, row)
+            self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.COLUMNS) - 1))
+
+    # Переносит строку на место по новому ключу; возвращает ее новый номер
+    def _move(self, position, key, row):
+        new_position = self.store.insert_position(key)
+        # insert_position считает и саму строку, если она стоит раньше нового места
+        if new_position > position:
+            new_position -= 1
+        if new_position != position:
+            destination = new_position + 1 if new_position > position else new_position
+            self.beginMoveRows(QModelIndex(), position, position, QModelIndex(), destination)
+            self.store.move(position, new_position, row)
+            self.endMoveRows()
+        return new_position
+
+    # Добавляет строки, которых еще нет в таблице, даже из незагруженных страниц
+    # (роды, найденные быстрым поиском)
+    def add_rows(self, rows):
+        for row in rows:
+            if self.store.position_of(row[0]) is None:
+                self._insert(row)
+
+    # Убирает строки родов genus_ids (тех, что есть в таблице)
+    def remove_genera(self, genus_ids):
+        for genus_id in genus_ids:
+            position = self.store.position_of(genus_id)
+            if position is not None:
+                self._remove(position)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=_DISPLAY_ROLE):
+        if role != _DISPLAY_ROLE:
+            return None
+        return self.COLUMNS[section] if orientation == _HORIZONTAL else section + 1
+
+    def data(self, index, role=_DISPLAY_ROLE):
+        if role != _DISPLAY_ROLE or not index.isValid():
+            return None
+        return self._columns[index.column()][index.row()]
+
+    def text(self, row, column):
+        return self._columns[column][row]
+
+
+# Видимые строки главной таблицы: массив номеров строк исходной модели
+# (все строки или найденные быстрым поиском, в порядке релевантности).
+# Смена найденных строк заменяет только этот массив; подсказки строк
+# (фрагменты с совпадением) хранятся по номеру видимой строки
+class GenusRowsProxyModel(QAbstractProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = None
+        self._tooltips = {}
+        self._proxy_rows = None
+        self._source = None
+
+    def setSourceModel(self, source_model):
+        super().setSourceModel(source_model)
+        self._source = source_model
+        source_model.modelReset.connect(self.show_all)
+        source_model.rowsAboutToBeInserted.connect(self._source_rows_about_to_be_inserted)
+        source_model.rowsInserted.connect(self._source_rows_inserted)
+        source_model.rowsAboutToBeRemoved.connect(self._source_rows_about_to_be_removed)
+        source_model.rowsRemoved.connect(self._source_rows_removed)
+        source_model.rowsAboutToBeMoved.connect(self._source_rows_about_to_be_moved)
+        source_model.rowsMoved.connect(self._source_rows_moved)
+        source_model.dataChanged.connect(self._source_data_changed)
+
+    # Строки исходной модели вставляются и удаляются по одной (GenusTableModel.upsert_rows
+    # и remove_genera). Когда показаны все строки, изменение передается как есть;
+    # среди найденных строк новая строка не появляется, а номера следующих сдвигаются
+    def _source_rows_about_to_be_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _source_rows_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.endInsertRows()
+            return
+        count = last - first + 1
+        self._rows = array("q", (row + count if row >= first else row for row in self._rows))
+        self._proxy_rows = None
+
+    def _source_rows_about_to_be_removed(self, parent, first, last):
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+
+    def _source_rows_removed(self, parent, first, last):
+        if self._rows is None:
+            self.endRemoveRows()
+            return
+        count = last - first + 1
+        removed = [proxy_row for proxy_row, row in enumerate(self._rows) if first <= row <= last]
+        self._rows = array("q", (row - count if row > last else row for row in self._rows))
+        self._proxy_rows = None
+        for proxy_row in reversed(removed):
+            self.beginRemoveRows(QModelIndex(), proxy_row, proxy_row)
+            del self._rows[proxy_row]
+            self._tooltips = {row - (row > proxy_row): tooltip
+                              for row, tooltip in self._tooltips.items() if row != proxy_row}
+            self.endRemoveRows()
+
+    # Перенос одной строки (GenusTableModel.upsert_rows при переименовании рода):
+    # среди найденных строк она остается на своем месте, меняются номера строк исходной модели
+    def _source_rows_about_to_be_moved(self, parent, first, last, destination_parent, destination):
+        if self._rows is None:
+            self.beginMoveRows(QModelIndex(), first, last, QModelIndex(), destination)
+
+    def _source_rows_moved(self, parent, first, last, destination_parent, destination):
+        if self._rows is None:
+            self.endMoveRows()
+            return
+        new_position = destination - 1 if destination > first else destination
+        self._rows = array("q", (_moved_row(row, first, new_position) for row in self._rows))
+        self._proxy_rows = None
+
+    def _source_data_changed(self, top_left, bottom_right, roles=()):
+        last_column = self.columnCount() - 1
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            proxy_index = self.mapFromSource(self._source.index(row, 0))
+            if proxy_index.isValid():
+                self.dataChanged.emit(proxy_index, self.index(proxy_index.row(), last_column))
+
+    # Показывает все строки исходной модели
+    def show_all(self):
+        self.beginResetModel()
+        self._rows = None
+        self._tooltips = {}
+        self._proxy_rows = None
+        self.endResetModel()
+
+    # Показывает только строки rows (array номеров строк исходной модели);
+    # tooltips - подсказки для них в том же порядке или None
+    def set_rows(self, rows, tooltips=None):
+        self.beginResetModel()
+        self._rows = rows
+        self._tooltips = {row: tooltip for row, tooltip in enumerate(tooltips or ()) if tooltip}
+        self._proxy_rows = None
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._source.rowCount() if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._source.columnCount()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def source_row(self, row):
+        return row if self._rows is None else self._rows[row]
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self._source.index(self.source_row(proxy_index.row()), proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self._rows is not None:
+            if self._proxy_rows is None:
+                self._proxy_rows = {source_row: proxy_row for proxy_row, source_row in enumerate(self._rows)}
+            row = self._proxy_rows.get(row)
+            if row is None:
+                return QModelIndex()
+        return self.index(row, source_index.column())
+
+    # Следующая страница нужна, только когда показаны все строки:
+    # найденные быстрым поиском строки уже есть в исходной модели
+    def canFetchMore(self, parent=QModelIndex()):
+        return self._rows is None and self._source.canFetchMore(QModelIndex())
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._source.fetchMore(QModelIndex())
+
+    # Флаги одинаковы для всех ячеек: без обращения к исходной модели через mapToSource
+    def flags(self, index):
+        return _ROW_FLAGS
+
+    def data(self, index, role=_DISPLAY_ROLE):
+        if role == _TOOLTIP_ROLE:
+            return self._tooltips.get(index.row())
+        if role != _DISPLAY_ROLE or not index.isValid():
+            return None
+        # Без промежуточного индекса исходной модели: ячейка читается прямо из столбца
+        return self._source.text(self.source_row(index.row()), index.column())
+
+    def headerData(self, section, orientation, role=_DISPLAY_ROLE):
+        if orientation == _VERTICAL:
+            return section + 1 if role == _DISPLAY_ROLE else None
+        return self._source.headerData(section, orientation, role)
+
+    # Название рода в видимой строке
+    def genus_name(self, row):
+        return self._source.store.names[self.source_row(row)]
+
+
+# Номер строки row после переноса строки position на место new_position
+def _moved_row(row, position, new_position):
+    if row == position:
+        return new_position
+    if position < row <= new_position:
+        return row - 1
+    if new_position <= row < position:
+        return row + 1
+    return row
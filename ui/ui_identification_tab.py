@@ -0,0 +1,75 @@
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QBrush, QColor
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView
+)
+
+
+# Вкладка результатов определения по частичному совпадению признаков
+# (результат identify_genera из db/search.py)
+class IdentificationTab(QWidget):
+    genus_requested = Signal(str)
+
+    COLUMNS = ["№", "Род", "Инфратурма", "Совпадение", "Несовпадения", "Нет данных"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        layout = QVBoxLayout(self)
+        self.summary = QLabel()
+        self.summary.setWordWrap(True)
+        layout.addWidget(self.summary)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.cellDoubleClicked.connect(
+            lambda row, column: self.genus_requested.emit(self.table.item(row, 1).text()))
+        layout.addWidget(self.table)
+
+    def set_results(self, identification, max_mismatches):
+        characters = identification["characters"]
+        results = identification["results"]
+        max_score = identification["max_score"]
+
+        if not characters:
+            self.summary.setText("Не выбрано ни одного признака споры. "
+                                 "Стратиграфия и география при определении не учитываются.")
+        else:
+            self.summary.setText(
+                f"Признаков: {len(characters)} ({', '.join(characters)}). "
+                f"Допустимо несовпадений: {max_mismatches}. Показано родов: {len(results)}. "
+                f"Двойной щелчок открывает описание рода."
+            )
+
+        self.table.setRowCount(len(results))
+        for row, result in enumerate(results):
+            details = result["details"]
+            mismatched = [name for name, match in details.items() if match is False]
+            unknown = [name for name, match in details.items() if match is None]
+            percent = 100 * result["score"] / max_score if max_score else 0
+
+            values = [
+                str(row + 1),
+                result["name"],
+                result["infraturma"],
+                f"{percent:.0f}%",
+                ", ".join(mismatched) or "-",
+                ", ".join(unknown) or "-",
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 3:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    item.setToolTip("\n".join(
+                        f"{name}: {'да' if match else 'нет' if match is False else 'нет данных'}"
+                        for name, match in details.items()))
+                if column == 4 and mismatched:
+                    item.setForeground(QBrush(QColor("#c22828")))
+                self.table.setItem(row, column, item)
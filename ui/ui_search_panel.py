@@ -1,427 +1,628 @@
-from PySide6.QtGui import QDoubleValidator
-from PySide6.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QScrollArea, QLineEdit,
-    QGroupBox, QGridLayout, QPushButton, QTableWidget, QSizePolicy, QTableWidgetItem, QComboBox, QFrame
-)
-from PySide6.QtCore import Qt, QTimer, Signal
-
-from logic.options_manager import get_options_for_field
-from ui.ui_multi_select_combo_box import MultiSelectComboBox
-
-class SearchPanel(QWidget):
-    search_requested = Signal(dict)
-
-    def __init__(self, options_data=None):
-        super().__init__()
-        self.options_data = options_data or {}
-
-        self.setMinimumWidth(420)
-
-        self.fields = {}
-
-        self.search_timer = QTimer()
-        self.search_timer.setInterval(500)
-        self.search_timer.setSingleShot(True)
-        self.search_timer.timeout.connect(self.perform_search)
-
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll.setFrameShape(QFrame.NoFrame)
-
-        container = QWidget()
-        layout = QVBoxLayout(container)
-        layout.setContentsMargins(1, 1, 1, 1)
-        layout.setSpacing(5)
-
-        # Основная группа
-        form_group = QGroupBox("Расширенный поиск")
-        form_group.setStyleSheet('QGroupBox:title {color: #c22828;}')
-        form_group.setStyleSheet("QGroupBox { border: 1px solid #ddd; margin-top: 10px; font-weight: bold;}")
-
-        grid_layout = QGridLayout()
-        grid_layout.setContentsMargins(3, 10, 3, 3)
-        grid_layout.setHorizontalSpacing(5)
-        grid_layout.setVerticalSpacing(5)
-
-        self.label_width = 94
-        labels = [
-            "Инфратурма", "Характер щели разверзания", "Наличие оторочки",
-            "Строение экзины", "Форма споры", "Очертание", "Форма сторон", "Форма углов",
-            "Форма щели разверзания", "Форма лучей щели",
-            "Выраженность ареа", "Толщина экзины", "Структура экзины",
-            "Форма контура споры"
-        ]
-        row = 0
-        for label_text in labels:
-            self.add_multiselect(grid_layout, label_text, row)
-            row += 1
-
-        # Размеры
-        self.add_size_filter(grid_layout, row)
-        row += 1
-
-
-        #Форма разрастания экзины
-        form_group2 = QGroupBox("Форма разрастания экзины")
-        form_group2.setStyleSheet("QGroupBox { font-weight: bold;}")
-        layout2 = QGridLayout()
-
-        growth_labels = ["Тип", "Толщина", "Ширина", "Строение"]
-        for i, label_text in enumerate(growth_labels):
-            self.add_multiselect(layout2, label_text, i)
-
-        form_group2.setLayout(layout2)
-        grid_layout.addWidget(form_group2, row, 0, 1, 2)
-        row += 1
-
-
-        #Экзоэкзина и Интэкзина
-        for label_text in ["Экзоэкзина (толщина)", "Интэкзина (толщина)"]:
-            self.add_multiselect(grid_layout, label_text, row)
-            row += 1
-
-
-        #Скульптура
-        self.sculpture_group = QGroupBox("Скульптура")
-        self.sculpture_group.setStyleSheet("QGroupBox { font-weight: bold;}")
-        self.sculpture_layout = QVBoxLayout()
-        self.sculpture_group.setLayout(self.sculpture_layout)
-
-        self.add_pair("Скульптура")
-
-        self.add_sculpture_button = QPushButton("Добавить")
-        self.add_sculpture_button.clicked.connect(lambda: self.add_pair("Скульптура"))
-
-        self.sculpture_layout.addWidget(self.add_sculpture_button)
-
-        grid_layout.addWidget(self.sculpture_group, row, 0, 1, 2)
-        row += 1
-
-        #Орнаментация
-        self.ornamentation_group = QGroupBox("Орнаментация")
-        self.ornamentation_group.setStyleSheet("QGroupBox { font-weight: bold;}")
-        self.ornamentation_layout = QVBoxLayout()
-        self.ornamentation_group.setLayout(self.ornamentation_layout)
-
-        self.add_pair("Орнаментация")
-
-        self.add_ornamentation_button = QPushButton("Добавить")
-        self.add_ornamentation_button.clicked.connect(lambda: self.add_pair("Орнаментация"))
-        self.ornamentation_layout.addWidget(self.add_ornamentation_button)
-
-        grid_layout.addWidget(self.ornamentation_group, row, 0, 1, 2)
-        row += 1
-
-        # Стратиграфия
-        self.add_stratigraphy_filter(grid_layout, row)
-        row += 1
-
-        self.add_geography_filter(grid_layout, row)
-        row += 1
-
-        #Кнопки
-        btn_layout = QHBoxLayout()
-        self.reset_btn = QPushButton("Сбросить все фильтры")
-        self.reset_btn.setProperty('class', 'danger')
-        btn_layout.addWidget(self.reset_btn)
-        grid_layout.addLayout(btn_layout, row, 0, 1, 2)
-
-        form_group.setLayout(grid_layout)
-        layout.addWidget(form_group)
-        layout.addStretch()
-        scroll.setWidget(container)
-
-        main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-        main_layout.setSpacing(0)
-        main_layout.addWidget(scroll)
-        self.setLayout(main_layout)
-
-    def add_size_filter(self, layout, row):
-        size_group = QGroupBox("Размеры спор (мкм)")
-        size_group.setStyleSheet("QGroupBox { border: 1px solid #ddd; margin-top: 10px; font-weight: bold;}")
-
-        grid = QGridLayout()
-        grid.setContentsMargins(5, 10, 5, 5)
-        grid.setHorizontalSpacing(5)
-        grid.setVerticalSpacing(5)
-
-        # Длина
-        length_label = QLabel("Длина:")
-        self.length_min = QLineEdit()
-        self.length_min.setPlaceholderText("мин")
-        self.length_min.setValidator(QDoubleValidator())
-        self.length_min.textChanged.connect(self.start_search_timer)
-
-        self.length_max = QLineEdit()
-        self.length_max.setPlaceholderText("макс")
-        self.length_max.setValidator(QDoubleValidator())
-        self.length_max.textChanged.connect(self.start_search_timer)
-
-        # Ширина
-        width_label = QLabel("Ширина:")
-        self.width_min = QLineEdit()
-        self.width_min.setPlaceholderText("мин")
-        self.width_min.setValidator(QDoubleValidator())
-        self.width_min.textChanged.connect(self.start_search_timer)
-
-        self.width_max = QLineEdit()
-        self.width_max.setPlaceholderText("макс")
-        self.width_max.setValidator(QDoubleValidator())
-        self.width_max.textChanged.connect(self.start_search_timer)
-
-        # Размещаем элементы
-        grid.addWidget(length_label, 0, 0)
-        grid.addWidget(self.length_min, 0, 1)
-        grid.addWidget(QLabel("-"), 0, 2)
-        grid.addWidget(self.length_max, 0, 3)
-
-        grid.addWidget(width_label, 1, 0)
-        grid.addWidget(self.width_min, 1, 1)
-        grid.addWidget(QLabel("-"), 1, 2)
-        grid.addWidget(self.width_max, 1, 3)
-
-        size_group.setLayout(grid)
-        layout.addWidget(size_group, row, 0, 1, 2)
-
-        # Сохраняем ссылки на поля
-        self.fields["Длина мин"] = self.length_min
-        self.fields["Длина макс"] = self.length_max
-        self.fields["Ширина мин"] = self.width_min
-        self.fields["Ширина макс"] = self.width_max
-
-        validator = QDoubleValidator()
-        validator.setNotation(QDoubleValidator.StandardNotation)
-        validator.setDecimals(4)
-
-        self.length_min.setValidator(validator)
-        self.length_max.setValidator(validator)
-        self.width_min.setValidator(validator)
-        self.width_max.setValidator(validator)
-
-    def add_multiselect(self, layout, label_text, row):
-        options = get_options_for_field(self.options_data, label_text)
-        combo = MultiSelectComboBox(items=options or ["Нет данных"])
-
-        combo.selection_changed.connect(self.start_search_timer)
-
-        label = QLabel(label_text + ":")
-        label.setWordWrap(True)
-        label.setFixedWidth(self.label_width)
-
-        label.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.MinimumExpanding)
-        label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-
-        fm = label.fontMetrics()
-        text = label_text + ":"
-        text_rect = fm.boundingRect(0, 0, self.label_width - 5, 0,
-                                    Qt.TextWordWrap | Qt.AlignLeft, text)
-        min_height = text_rect.height() + 4
-
-        label.setMinimumHeight(min_height)
-
-        # Стилизация
-        label.setStyleSheet("""
-            QLabel {
-                margin: 0px;
-                padding: 2px 0px;
-                border: none;
-            }
-        """)
-
-        combo.setStyleSheet("margin: 0px; padding: 0px;")
-        layout.addWidget(label, row, 0,
-                         alignment=Qt.AlignLeft | Qt.AlignTop)
-        layout.addWidget(combo, row, 1,
-                         alignment=Qt.AlignTop)
-
-        layout.setRowMinimumHeight(row, min_height)
-
-        self.fields[label_text] = combo
-
-    def add_pair(self, category):
-        container = QWidget()
-        container.setStyleSheet("margin: 0; padding: 0;")
-
-        pair_layout = QHBoxLayout(container)
-        pair_layout.setContentsMargins(0, 0, 0, 0)
-        pair_layout.setSpacing(5)
-
-        controls_container = QWidget()
-        controls_layout = QVBoxLayout(controls_container)
-        controls_layout.setContentsMargins(0, 0, 0, 0)
-        controls_layout.setSpacing(6)
-
-        # Сторона
-        side_label = QLabel("Сторона:")
-        side_combo = QComboBox()
-        side_combo.addItem("не указана/любая")
-        side_combo.addItems(get_options_for_field(self.options_data, f"Сторона {category}"))
-        side_combo.currentTextChanged.connect(self.start_search_timer)
-        controls_layout.addWidget(side_label)
-        controls_layout.addWidget(side_combo)
-
-        # Значение
-        value_label = QLabel("Значение:")
-        value_combo = MultiSelectComboBox(items=get_options_for_field(self.options_data,f"Значение {category}"))
-        value_combo.selection_changed.connect(self.start_search_timer)
-        controls_layout.addWidget(value_label)
-        controls_layout.addWidget(value_combo)
-
-        # Кнопка удаления
-        delete_button = QPushButton("×")
-        delete_button.setFixedSize(24, 24)
-        delete_button.setProperty('class', 'danger')
-        # delete_button.setStyleSheet("""
-        #     QPushButton {
-        #         font-size: 14px;
-        #         font-weight: bold;
-        #         color: white;
-        #         background-color: #6f6f6f;
-        #         border: 1px solid #000000;
-        #         border-radius: 12px;
-        #     }
-        #     QPushButton:hover {
-        #         background-color: #ff6666;
-        #     }
-        # """)
-
-        pair_layout.addWidget(controls_container, stretch=1)
-        pair_layout.addWidget(delete_button, alignment=Qt.AlignVCenter)
-
-        def remove_pair():
-            if category == "Скульптура":
-                self.sculpture_layout.removeWidget(container)
-                self.fields["Скульптура"].remove((side_combo, value_combo))
-            elif category == "Орнаментация":
-                self.ornamentation_layout.removeWidget(container)
-                self.fields["Орнаментация"].remove((side_combo, value_combo))
-            container.deleteLater()
-
-        delete_button.clicked.connect(lambda: [remove_pair(), self.start_search_timer()])
-
-        if category == "Скульптура":
-            self.sculpture_layout.insertWidget(self.sculpture_layout.count() - 1, container)
-            if "Скульптура" not in self.fields:
-                self.fields["Скульптура"] = []
-            self.fields["Скульптура"].append((side_combo, value_combo))
-        elif category == "Орнаментация":
-            self.ornamentation_layout.insertWidget(self.ornamentation_layout.count() - 1, container)
-            if "Орнаментация" not in self.fields:
-                self.fields["Орнаментация"] = []
-            self.fields["Орнаментация"].append((side_combo, value_combo))
-
-
-    def add_stratigraphy_filter(self, parent_layout, row):
-        label_text = "Стратиграфическое распространение"
-        options = get_options_for_field(self.options_data, label_text)
-
-        group_box = QGroupBox(label_text)
-        group_box.setStyleSheet("QGroupBox { font-weight: bold; }")
-        vbox = QVBoxLayout(group_box)
-        vbox.setContentsMargins(0, 0, 0, 0)
-
-        combo = MultiSelectComboBox(items=options or ["Нет данных"])
-        combo.selection_changed.connect(self.start_search_timer)
-
-        vbox.addWidget(combo)
-        parent_layout.addWidget(group_box, row, 0, 1, 2)
-        self.fields[label_text] = combo
-
-    def add_geography_filter(self, parent_layout, row):
-        label_text = "Географическое распространение"
-        options = get_options_for_field(self.options_data, label_text)
-
-        group_box = QGroupBox(label_text)
-        group_box.setStyleSheet("QGroupBox { font-weight: bold; }")
-        vbox = QVBoxLayout(group_box)
-        vbox.setContentsMargins(0, 0, 0, 0)
-
-        combo = MultiSelectComboBox(items=options or ["Нет данных"])
-        combo.selection_changed.connect(self.start_search_timer)
-
-        vbox.addWidget(combo)
-        parent_layout.addWidget(group_box, row, 0, 1, 2)
-        self.fields[label_text] = combo
-
-    def get_filters(self):
-        filters = {}
-
-        # Обработка размеров
-        size_filters = {}
-        if self.length_min.text():
-            size_filters["length_min"] = float(self.length_min.text())
-        if self.length_max.text():
-            size_filters["length_max"] = float(self.length_max.text())
-        if self.width_min.text():
-            size_filters["width_min"] = float(self.width_min.text())
-        if self.width_max.text():
-            size_filters["width_max"] = float(self.width_max.text())
-
-        if size_filters:
-            filters["Размеры"] = size_filters
-
-        for label, combo_pairs in self.fields.items():
-            if label in ["Длина мин", "Длина макс", "Ширина мин", "Ширина макс"]:
-                continue
-            if label in ["Скульптура", "Орнаментация"]:
-                # Обработка скульптуры и орнаментации
-                filters[label] = []
-                for side_combo, value_combo in combo_pairs:
-                    side_selected = side_combo.currentText()
-                    values_selected = value_combo.selectedItems()
-
-                    if side_selected and values_selected:
-                        for value in values_selected:
-                            filters[label].append((side_selected, value))
-            else:
-                # Обработка обычных полей
-                combo = combo_pairs  # Это одиночный комбобокс (мультиселект)
-                selected = combo.selectedItems()
-                if selected:
-                    filters[label] = selected
-
-        return filters
-
-    def start_search_timer(self):
-        self.search_timer.start()
-
-    def perform_search(self):
-        filters = self.get_filters()
-        self.search_requested.emit(filters)
-
-    def reset_filters(self):
-        self.search_timer.stop()
-
-        # Сброс полей размеров
-        self.length_min.clear()
-        self.length_max.clear()
-        self.width_min.clear()
-        self.width_max.clear()
-
-        #Остальные поля
-        for field_name, field_value in self.fields.items():
-            if isinstance(field_value, MultiSelectComboBox):
-                field_value.clear_selection()
-            elif isinstance(field_value, list):
-                for side_combo, value_combo in field_value:
-                    side_combo.setCurrentIndex(0)
-                    value_combo.clear_selection()
-
-        self.clear_dynamic_pairs()
-        self.search_requested.emit({})
-
-    def clear_dynamic_pairs(self):
-        while len(self.fields.get("Скульптура", [])) > 1:
-            pair = self.fields["Скульптура"][-1]
-            self.sculpture_layout.removeWidget(pair[0].parent().parent())
-            self.fields["Скульптура"].remove(pair)
-            pair[0].parent().parent().deleteLater()
-
-        while len(self.fields.get("Орнаментация", [])) > 1:
-            pair = self.fields["Орнаментация"][-1]
-            self.ornamentation_layout.removeWidget(pair[0].parent().parent())
-            self.fields["Орнаментация"].remove(pair)
+from PySide6.QtGui import QDoubleValidator
+from PySide6.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QScrollArea, QLineEdit,
+    QGroupBox, QGridLayout, QPushButton, QTableWidget, QSizePolicy, QTableWidgetItem, QComboBox, QFrame,
+    QSpinBox, QCheckBox
+)
+from PySide6.QtCore import Qt, QTimer, Signal
+
+from config import IDENTIFICATION_MAX_MISMATCHES
+from db.size_index import SIZE_MODES, DEFAULT_SIZE_MODE
+from logic.options_manager import get_options_for_field
+from ui.ui_multi_select_combo_box import MultiSelectComboBox
+
+class SearchPanel(QWidget):
+    # Сколько признаков показывать в подсказке "Следующий признак"
+    NEXT_CHARACTERS_SHOWN = 5
+
+    search_requested = Signal(dict)
+    # Текущие фильтры при каждом изменении (без задержки search_timer)
+    filters_changed = Signal(dict)
+    # Определение по частичному совпадению: фильтры и допустимое число несовпадений
+    identify_requested = Signal(dict, int)
+    # Поиск видов по тем же фильтрам
+    species_search_requested = Signal(dict)
+
+    def __init__(self, options_data=None):
+        super().__init__()
+        self.options_data = options_data or {}
+
+        self.setMinimumWidth(420)
+
+        self.fields = {}
+
+        self.search_timer = QTimer()
+        self.search_timer.setInterval(500)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self.perform_search)
+
+        self.scroll = scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        scroll.setFrameShape(QFrame.NoFrame)
+
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(1, 1, 1, 1)
+        layout.setSpacing(5)
+
+        # Подсказка: какие признаки сильнее всего сократят список кандидатов
+        next_group = QGroupBox("Следующий признак")
+        next_group.setStyleSheet("QGroupBox { border: 1px solid #ddd; margin-top: 10px; font-weight: bold;}")
+        next_layout = QVBoxLayout(next_group)
+        next_layout.setContentsMargins(5, 10, 5, 5)
+        self.next_characters_label = QLabel("-")
+        self.next_characters_label.setWordWrap(True)
+        self.next_characters_label.setTextFormat(Qt.RichText)
+        self.next_characters_label.linkActivated.connect(self.focus_field)
+        next_layout.addWidget(self.next_characters_label)
+        layout.addWidget(next_group)
+
+        # Основная группа
+        form_group = QGroupBox("Расширенный поиск")
+        form_group.setStyleSheet('QGroupBox:title {color: #c22828;}')
+        form_group.setStyleSheet("QGroupBox { border: 1px solid #ddd; margin-top: 10px; font-weight: bold;}")
+
+        grid_layout = QGridLayout()
+        grid_layout.setContentsMargins(3, 10, 3, 3)
+        grid_layout.setHorizontalSpacing(5)
+        grid_layout.setVerticalSpacing(5)
+
+        self.label_width = 94
+        labels = [
+            "Инфратурма", "Характер щели разверзания", "Наличие оторочки",
+            "Строение экзины", "Форма споры", "Очертание", "Форма сторон", "Форма углов",
+            "Форма щели разверзания", "Форма лучей щели",
+            "Выраженность ареа", "Толщина экзины", "Структура экзины",
+            "Форма контура споры"
+        ]
+        row = 0
+        for label_text in labels:
+            self.add_multiselect(grid_layout, label_text, row)
+            row += 1
+
+        # Размеры
+        self.add_size_filter(grid_layout, row)
+        row += 1
+
+
+        #Форма разрастания экзины
+        form_group2 = QGroupBox("Форма разрастания экзины")
+        form_group2.setStyleSheet("QGroupBox { font-weight: bold;}")
+        layout2 = QGridLayout()
+
+        growth_labels = ["Тип", "Толщина", "Ширина", "Строение"]
+        for i, label_text in enumerate(growth_labels):
+            self.add_multiselect(layout2, label_text, i)
+
+        form_group2.setLayout(layout2)
+        grid_layout.addWidget(form_group2, row, 0, 1, 2)
+        row += 1
+
+
+        #Экзоэкзина и Интэкзина
+        for label_text in ["Экзоэкзина (толщина)", "Интэкзина (толщина)"]:
+            self.add_multiselect(grid_layout, label_text, row)
+            row += 1
+
+
+        #Скульптура
+        self.sculpture_group = QGroupBox("Скульптура")
+        self.sculpture_group.setStyleSheet("QGroupBox { font-weight: bold;}")
+        self.sculpture_layout = QVBoxLayout()
+        self.sculpture_group.setLayout(self.sculpture_layout)
+
+        self.add_pair("Скульптура")
+
+        self.add_sculpture_button = QPushButton("Добавить")
+        self.add_sculpture_button.clicked.connect(lambda: self.add_pair("Скульптура"))
+
+        self.sculpture_layout.addWidget(self.add_sculpture_button)
+
+        grid_layout.addWidget(self.sculpture_group, row, 0, 1, 2)
+        row += 1
+
+        #Орнаментация
+        self.ornamentation_group = QGroupBox("Орнаментация")
+        self.ornamentation_group.setStyleSheet("QGroupBox { font-weight: bold;}")
+        self.ornamentation_layout = QVBoxLayout()
+        self.ornamentation_group.setLayout(self.ornamentation_layout)
+
+        self.add_pair("Орнаментация")
+
+        self.add_ornamentation_button = QPushButton("Добавить")
+        self.add_ornamentation_button.clicked.connect(lambda: self.add_pair("Орнаментация"))
+        self.ornamentation_layout.addWidget(self.add_ornamentation_button)
+
+        grid_layout.addWidget(self.ornamentation_group, row, 0, 1, 2)
+        row += 1
+
+        # Стратиграфия
+        self.add_stratigraphy_filter(grid_layout, row)
+        row += 1
+
+        self.add_age_filter(grid_layout, row)
+        row += 1
+
+        self.add_geography_filter(grid_layout, row)
+        row += 1
+
+        # Определение: признаки не обязаны совпадать все
+        identify_layout = QHBoxLayout()
+        identify_layout.addWidget(QLabel("Допустимо несовпадений:"))
+        self.mismatches_spin = QSpinBox()
+        self.mismatches_spin.setRange(0, 20)
+        self.mismatches_spin.setValue(IDENTIFICATION_MAX_MISMATCHES)
+        identify_layout.addWidget(self.mismatches_spin)
+        self.identify_btn = QPushButton("Определить")
+        self.identify_btn.setToolTip("Ранжировать роды по числу совпавших признаков")
+        self.identify_btn.clicked.connect(self.request_identification)
+        identify_layout.addWidget(self.identify_btn, 1)
+        grid_layout.addLayout(identify_layout, row, 0, 1, 2)
+        row += 1
+
+        self.species_btn = QPushButton("Найти виды")
+        self.species_btn.setToolTip("Размеры, стратиграфия и география - видов, признаки диагноза - их родов")
+        self.species_btn.clicked.connect(self.request_species_search)
+        grid_layout.addWidget(self.species_btn, row, 0, 1, 2)
+        row += 1
+
+        #Кнопки
+        btn_layout = QHBoxLayout()
+        self.reset_btn = QPushButton("Сбросить все фильтры")
+        self.reset_btn.setProperty('class', 'danger')
+        btn_layout.addWidget(self.reset_btn)
+        grid_layout.addLayout(btn_layout, row, 0, 1, 2)
+
+        form_group.setLayout(grid_layout)
+        layout.addWidget(form_group)
+        layout.addStretch()
+        scroll.setWidget(container)
+
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+        main_layout.setSpacing(0)
+        main_layout.addWidget(scroll)
+        self.setLayout(main_layout)
+
+    def add_size_filter(self, layout, row):
+        size_group = QGroupBox("Размеры спор (мкм)")
+        size_group.setStyleSheet("QGroupBox { border: 1px solid #ddd; margin-top: 10px; font-weight: bold;}")
+
+        grid = QGridLayout()
+        grid.setContentsMargins(5, 10, 5, 5)
+        grid.setHorizontalSpacing(5)
+        grid.setVerticalSpacing(5)
+
+        # Длина
+        length_label = QLabel("Длина:")
+        self.length_min = QLineEdit()
+        self.length_min.setPlaceholderText("мин")
+        self.length_min.setValidator(QDoubleValidator())
+        self.length_min.textChanged.connect(self.start_search_timer)
+
+        self.length_max = QLineEdit()
+        self.length_max.setPlaceholderText("макс")
+        self.length_max.setValidator(QDoubleValidator())
+        self.length_max.textChanged.connect(self.start_search_timer)
+
+        # Ширина
+        width_label = QLabel("Ширина:")
+        self.width_min = QLineEdit()
+        self.width_min.setPlaceholderText("мин")
+        self.width_min.setValidator(QDoubleValidator())
+        self.width_min.textChanged.connect(self.start_search_timer)
+
+        self.width_max = QLineEdit()
+        self.width_max.setPlaceholderText("макс")
+        self.width_max.setValidator(QDoubleValidator())
+        self.width_max.textChanged.connect(self.start_search_timer)
+
+        # Размещаем элементы
+        grid.addWidget(length_label, 0, 0)
+        grid.addWidget(self.length_min, 0, 1)
+        grid.addWidget(QLabel("-"), 0, 2)
+        grid.addWidget(self.length_max, 0, 3)
+
+        grid.addWidget(width_label, 1, 0)
+        grid.addWidget(self.width_min, 1, 1)
+        grid.addWidget(QLabel("-"), 1, 2)
+        grid.addWidget(self.width_max, 1, 3)
+
+        # Режим сравнения диапазонов (см. SIZE_MODES в db/size_index.py)
+        self.size_mode = QComboBox()
+        for mode, title in SIZE_MODES.items():
+            self.size_mode.addItem(title, mode)
+        self.size_mode.setCurrentIndex(self.size_mode.findData(DEFAULT_SIZE_MODE))
+        self.size_mode.currentIndexChanged.connect(self.update_size_mode)
+        self.size_mode.currentIndexChanged.connect(self.start_search_timer)
+        grid.addWidget(self.size_mode, 2, 0, 1, 4)
+
+        self.size_species = QCheckBox("Учитывать размеры видов")
+        self.size_species.setToolTip("Род подходит, если подходит он сам или хотя бы один из его видов")
+        self.size_species.toggled.connect(self.start_search_timer)
+        grid.addWidget(self.size_species, 3, 0, 1, 4)
+
+        size_group.setLayout(grid)
+        layout.addWidget(size_group, row, 0, 1, 2)
+
+        # Сохраняем ссылки на поля
+        self.fields["Длина мин"] = self.length_min
+        self.fields["Длина макс"] = self.length_max
+        self.fields["Ширина мин"] = self.width_min
+        self.fields["Ширина макс"] = self.width_max
+
+        validator = QDoubleValidator()
+        validator.setNotation(QDoubleValidator.StandardNotation)
+        validator.setDecimals(4)
+
+        self.length_min.setValidator(validator)
+        self.length_max.setValidator(validator)
+        self.width_min.setValidator(validator)
+        self.width_max.setValidator(validator)
+
+    # В режиме "точка" задается одно значение: поля "макс" не используются
+    def update_size_mode(self):
+        is_point = self.size_mode.currentData() == "point"
+        for field in (self.length_max, self.width_max):
+            field.setEnabled(not is_point)
+        self.length_min.setPlaceholderText("значение" if is_point else "мин")
+        self.width_min.setPlaceholderText("значение" if is_point else "мин")
+
+    def add_multiselect(self, layout, label_text, row):
+        options = get_options_for_field(self.options_data, label_text)
+        combo = MultiSelectComboBox(items=options or ["Нет данных"])
+
+        combo.selection_changed.connect(self.start_search_timer)
+
+        label = QLabel(label_text + ":")
+        label.setWordWrap(True)
+        label.setFixedWidth(self.label_width)
+
+        label.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.MinimumExpanding)
+        label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+
+        fm = label.fontMetrics()
+        text = label_text + ":"
+        text_rect = fm.boundingRect(0, 0, self.label_width - 5, 0,
+                                    Qt.TextWordWrap | Qt.AlignLeft, text)
+        min_height = text_rect.height() + 4
+
+        label.setMinimumHeight(min_height)
+
+        # Стилизация
+        label.setStyleSheet("""
+            QLabel {
+                margin: 0px;
+                padding: 2px 0px;
+                border: none;
+            }
+        """)
+
+        combo.setStyleSheet("margin: 0px; padding: 0px;")
+        layout.addWidget(label, row, 0,
+                         alignment=Qt.AlignLeft | Qt.AlignTop)
+        layout.addWidget(combo, row, 1,
+                         alignment=Qt.AlignTop)
+
+        layout.setRowMinimumHeight(row, min_height)
+
+        self.fields[label_text] = combo
+
+    def add_pair(self, category):
+        container = QWidget()
+        container.setStyleSheet("margin: 0; padding: 0;")
+
+        pair_layout = QHBoxLayout(container)
+        pair_layout.setContentsMargins(0, 0, 0, 0)
+        pair_layout.setSpacing(5)
+
+        controls_container = QWidget()
+        controls_layout = QVBoxLayout(controls_container)
+        controls_layout.setContentsMargins(0, 0, 0, 0)
+        controls_layout.setSpacing(6)
+
+        # Сторона
+        side_label = QLabel("Сторона:")
+        side_combo = QComboBox()
+        side_combo.addItem("не указана/любая")
+        side_combo.addItems(get_options_for_field(self.options_data, f"Сторона {category}"))
+        side_combo.currentTextChanged.connect(self.start_search_timer)
+        controls_layout.addWidget(side_label)
+        controls_layout.addWidget(side_combo)
+
+        # Значение
+        value_label = QLabel("Значение:")
+        value_combo = MultiSelectComboBox(items=get_options_for_field(self.options_data,f"Значение {category}"))
+        value_combo.selection_changed.connect(self.start_search_timer)
+        controls_layout.addWidget(value_label)
+        controls_layout.addWidget(value_combo)
+
+        # Кнопка удаления
+        delete_button = QPushButton("×")
+        delete_button.setFixedSize(24, 24)
+        delete_button.setProperty('class', 'danger')
+        # delete_button.setStyleSheet("""
+        #     QPushButton {
+        #         font-size: 14px;
+        #         font-weight: bold;
+        #         color: white;
+        #         background-color: #6f6f6f;
+        #         border: 1px solid #000000;
+        #         border-radius: 12px;
+        #     }
+        #     QPushButton:hover {
+        #         background-color: #ff6666;
+        #     }
+        # """)
+
+        pair_layout.addWidget(controls_container, stretch=1)
+        pair_layout.addWidget(delete_button, alignment=Qt.AlignVCenter)
+
+        def remove_pair():
+            if category == "Скульптура":
+                self.sculpture_layout.removeWidget(container)
+                self.fields["Скульптура"].remove((side_combo, value_combo))
+            elif category == "Орнаментация":
+                self.ornamentation_layout.removeWidget(container)
+                self.fields["Орнаментация"].remove((side_combo, value_combo))
+            container.deleteLater()
+
+        delete_button.clicked.connect(lambda: [remove_pair(), self.start_search_timer()])
+
+        if category == "Скульптура":
+            self.sculpture_layout.insertWidget(self.sculpture_layout.count() - 1, container)
+            if "Скульптура" not in self.fields:
+                self.fields["Скульптура"] = []
+            self.fields["Скульптура"].append((side_combo, value_combo))
+        elif category == "Орнаментация":
+            self.ornamentation_layout.insertWidget(self.ornamentation_layout.count() - 1, container)
+            if "Орнаментация" not in self.fields:
+                self.fields["Орнаментация"] = []
+            self.fields["Орнаментация"].append((side_combo, value_combo))
+
+
+    def add_stratigraphy_filter(self, parent_layout, row):
+        label_text = "Стратиграфическое распространение"
+        options = get_options_for_field(self.options_data, label_text)
+
+        group_box = QGroupBox(label_text)
+        group_box.setStyleSheet("QGroupBox { font-weight: bold; }")
+        vbox = QVBoxLayout(group_box)
+        vbox.setContentsMargins(0, 0, 0, 0)
+
+        combo = MultiSelectComboBox(items=options or ["Нет данных"])
+        combo.selection_changed.connect(self.start_search_timer)
+
+        vbox.addWidget(combo)
+        parent_layout.addWidget(group_box, row, 0, 1, 2)
+        self.fields[label_text] = combo
+
+    # Интервал возраста: роды, встречающиеся хоть где-то между двумя подразделениями
+    # (фильтр "Возраст", см. db/chronostratigraphy.py). Списки - в геологическом порядке
+    def add_age_filter(self, parent_layout, row):
+        ages = self.options_data.get("stratigraphic_ages", {})
+
+        group_box = QGroupBox("Возраст")
+        group_box.setStyleSheet("QGroupBox { font-weight: bold; }")
+        grid = QGridLayout(group_box)
+        grid.setContentsMargins(5, 10, 5, 5)
+
+        self.age_from = QComboBox()
+        self.age_to = QComboBox()
+        for combo in (self.age_from, self.age_to):
+            combo.addItem("любой", None)
+            for label, (age_base, age_top) in ages.items():
+                combo.addItem(label, (age_base, age_top))
+                combo.setItemData(combo.count() - 1, f"{age_base:g} - {age_top:g} млн лет", Qt.ToolTipRole)
+            combo.currentIndexChanged.connect(self.start_search_timer)
+
+        grid.addWidget(QLabel("от:"), 0, 0)
+        grid.addWidget(self.age_from, 0, 1)
+        grid.addWidget(QLabel("до:"), 1, 0)
+        grid.addWidget(self.age_to, 1, 1)
+        grid.setColumnStretch(1, 1)
+        parent_layout.addWidget(group_box, row, 0, 1, 2)
+
+    # Границы фильтра "Возраст" по выбранным подразделениям; порядок "от" и "до" не важен
+    def get_age_filter(self):
+        from_ages, to_ages = (combo.currentData() for combo in (self.age_from, self.age_to))
+        if from_ages is None and to_ages is None:
+            return None
+        if from_ages is not None and to_ages is not None:
+            return {"base": max(from_ages[0], to_ages[0]), "top": min(from_ages[1], to_ages[1])}
+        if from_ages is not None:
+            return {"base": from_ages[0]}
+        return {"top": to_ages[1]}
+
+    def add_geography_filter(self, parent_layout, row):
+        label_text = "Географическое распространение"
+        options = get_options_for_field(self.options_data, label_text)
+
+        group_box = QGroupBox(label_text)
+        group_box.setStyleSheet("QGroupBox { font-weight: bold; }")
+        vbox = QVBoxLayout(group_box)
+        vbox.setContentsMargins(0, 0, 0, 0)
+
+        combo = MultiSelectComboBox(items=options or ["Нет данных"])
+        combo.selection_changed.connect(self.start_search_timer)
+
+        vbox.addWidget(combo)
+        parent_layout.addWidget(group_box, row, 0, 1, 2)
+        self.fields[label_text] = combo
+
+    def get_filters(self):
+        filters = {}
+
+        # Обработка размеров
+        size_filters = {}
+        size_mode = self.size_mode.currentData()
+        if self.length_min.text():
+            size_filters["length_min"] = float(self.length_min.text())
+        if self.length_max.text() and size_mode != "point":
+            size_filters["length_max"] = float(self.length_max.text())
+        if self.width_min.text():
+            size_filters["width_min"] = float(self.width_min.text())
+        if self.width_max.text() and size_mode != "point":
+            size_filters["width_max"] = float(self.width_max.text())
+
+        if size_filters:
+            # Режим и виды указываются, только если отличаются от прежнего поведения
+            if size_mode != DEFAULT_SIZE_MODE:
+                size_filters["mode"] = size_mode
+            if self.size_species.isChecked():
+                size_filters["species"] = True
+            filters["Размеры"] = size_filters
+
+        age_filter = self.get_age_filter()
+        if age_filter:
+            filters["Возраст"] = age_filter
+
+        for label, combo_pairs in self.fields.items():
+            if label in ["Длина мин", "Длина макс", "Ширина мин", "Ширина макс"]:
+                continue
+            if label in ["Скульптура", "Орнаментация"]:
+                # Обработка скульптуры и орнаментации
+                filters[label] = []
+                for side_combo, value_combo in combo_pairs:
+                    side_selected = side_combo.currentText()
+                    values_selected = value_combo.selectedItems()
+
+                    if side_selected and values_selected:
+                        for value in values_selected:
+                            filters[label].append((side_selected, value))
+            else:
+                # Обработка обычных полей
+                combo = combo_pairs  # Это одиночный комбобокс (мультиселект)
+                selected = combo.selectedItems()
+                if selected:
+                    filters[label] = selected
+
+        return filters
+
+    def start_search_timer(self):
+        self.search_timer.start()
+        try:
+            filters = self.get_filters()
+        except ValueError:
+            # Размер введен не полностью (например, "-" или ".")
+            return
+        self.filters_changed.emit(filters)
+
+    # Обновляет счетчики вариантов во всех списках (см. get_facet_counts в db/search.py)
+    def update_facet_counts(self, facets):
+        for label, field in self.fields.items():
+            if isinstance(field, MultiSelectComboBox):
+                field.set_counts(facets["fields"].get(label) if facets else None)
+            elif isinstance(field, list):
+                pair_counts = facets["pairs"].get(label, {}) if facets else None
+                for side_combo, value_combo in field:
+                    if pair_counts is None:
+                        value_combo.set_counts(None)
+                        continue
+                    side = side_combo.currentText()
+                    value_combo.set_counts({value: count for (pair_side, value), count in pair_counts.items()
+                                            if pair_side == side})
+        self.update_next_characters(facets["next_characters"] if facets else None)
+
+    # Добавляет в списки новые варианты (options - результат get_all_options
+    # после пополнения справочников); выбранные варианты не меняются
+    def add_options(self, options):
+        for label, field in self.fields.items():
+            if isinstance(field, MultiSelectComboBox):
+                field.add_missing_items(get_options_for_field(options, label))
+            elif isinstance(field, list):
+                for side_combo, value_combo in field:
+                    for side in get_options_for_field(options, f"Сторона {label}"):
+                        if side_combo.findText(side) < 0:
+                            side_combo.addItem(side)
+                    value_combo.add_missing_items(get_options_for_field(options, f"Значение {label}"))
+
+    # Показывает признаки, определение которых сильнее всего сократит список
+    # (см. rank_next_characters в db/key_characters.py)
+    def update_next_characters(self, ranking):
+        if not ranking:
+            self.next_characters_label.setText("-")
+            return
+        lines = []
+        for entry in ranking[:self.NEXT_CHARACTERS_SHOWN]:
+            lines.append(
+                f'<a href="{entry["label"]}">{entry["label"]}</a>: '
+                f'останется ~{entry["expected"]:.0f}, описан у {entry["described"]}, '
+                f'{entry["entropy"]:.1f} бит'
+            )
+        self.next_characters_label.setText("<br>".join(lines))
+
+    # Прокручивает панель к полю и открывает его список
+    def focus_field(self, label):
+        field = self.fields.get(label)
+        if isinstance(field, list):
+            field = field[-1][1] if field else None
+        if field is None:
+            return
+        self.scroll.ensureWidgetVisible(field)
+        field.showPopup()
+
+    def perform_search(self):
+        filters = self.get_filters()
+        self.search_requested.emit(filters)
+
+    def request_identification(self):
+        try:
+            filters = self.get_filters()
+        except ValueError:
+            return
+        self.identify_requested.emit(filters, self.mismatches_spin.value())
+
+    def request_species_search(self):
+        try:
+            filters = self.get_filters()
+        except ValueError:
+            return
+        self.species_search_requested.emit(filters)
+
+    def reset_filters(self):
+        self.search_timer.stop()
+
+        # Сброс полей размеров
+        self.length_min.clear()
+        self.length_max.clear()
+        self.width_min.clear()
+        self.width_max.clear()
+        self.size_mode.blockSignals(True)
+        self.size_mode.setCurrentIndex(self.size_mode.findData(DEFAULT_SIZE_MODE))
+        self.size_mode.blockSignals(False)
+        self.update_size_mode()
+        self.size_species.blockSignals(True)
+        self.size_species.setChecked(False)
+        self.size_species.blockSignals(False)
+        for combo in (self.age_from, self.age_to):
+            combo.blockSignals(True)
+            combo.setCurrentIndex(0)
+            combo.blockSignals(False)
+
+        #Остальные поля
+        for field_name, field_value in self.fields.items():
+            if isinstance(field_value, MultiSelectComboBox):
+                field_value.clear_selection()
+            elif isinstance(field_value, list):
+                for side_combo, value_combo in field_value:
+                    side_combo.setCurrentIndex(0)
+                    value_combo.clear_selection()
+
+        self.clear_dynamic_pairs()
+        self.search_requested.emit({})
+
+    def clear_dynamic_pairs(self):
+        while len(self.fields.get("Скульптура", [])) > 1:
+            pair = self.fields["Скульптура"][-1]
+            self.sculpture_layout.removeWidget(pair[0].parent().parent())
+            self.fields["Скульптура"].remove(pair)
+            pair[0].parent().parent().deleteLater()
+
+        while len(self.fields.get("Орнаментация", [])) > 1:
+            pair = self.fields["Орнаментация"][-1]
+            self.ornamentation_layout.removeWidget(pair[0].parent().parent())
+            self.fields["Орнаментация"].remove(pair)
             pair[0].parent().parent().deleteLater()
\ No newline at end of file
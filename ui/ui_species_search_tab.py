@@ -0,0 +1,111 @@
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableView, QAbstractItemView, QHeaderView
+
+
+# Диапазон размеров для таблицы: "30-40", "80" или "-"
+def format_size_range(low, high):
+    if low is None and high is None:
+        return "-"
+    if low is None or high is None or low == high:
+        value = low if high is None else high
+        return f"{value:g}"
+    return f"{low:g}-{high:g}"
+
+
+# Модель таблицы видов. Строки - результат iter_species_rows в db/crud.py:
+# (id, вид, род, длина мин, длина макс, ширина мин, ширина макс, стратиграфия, география).
+# Строки добавляются частями по мере поступления; QTableView запрашивает
+# данные только видимых ячеек, поэтому размер результата не влияет на отрисовку
+class SpeciesTableModel(QAbstractTableModel):
+    COLUMNS = ["Вид", "Род", "Длина", "Ширина", "Стратиграфия", "География"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        _, species, genus, length_min, length_max, width_min, width_max, stratigraphy, geography = \
+            self._rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return species
+        if column == 1:
+            return genus
+        if column == 2:
+            return format_size_range(length_min, length_max)
+        if column == 3:
+            return format_size_range(width_min, width_max)
+        return stratigraphy if column == 4 else geography
+
+    def genus_name(self, row):
+        return self._rows[row][2]
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+
+# Вкладка результатов поиска видов (search_species_rows в db/search.py)
+class SpeciesSearchTab(QWidget):
+    genus_requested = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        layout = QVBoxLayout(self)
+        self.summary = QLabel()
+        self.summary.setWordWrap(True)
+        layout.addWidget(self.summary)
+
+        self.model = SpeciesTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setWordWrap(False)
+        # Одинаковая высота строк: представлению не нужно измерять каждую строку
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.doubleClicked.connect(
+            lambda index: self.genus_requested.emit(self.model.genus_name(index.row())))
+        layout.addWidget(self.table)
+
+    # Начало нового поиска: прежние результаты убираются
+    def start(self):
+        self.model.clear()
+        self.summary.setText("Поиск видов...")
+
+    def add_rows(self, rows):
+        self.model.append_rows(rows)
+        self.summary.setText(f"Найдено видов: {self.model.rowCount()}...")
+
+    def finish(self, count):
+        self.summary.setText(f"Найдено видов: {count}. Двойной щелчок открывает описание рода.")
+
+    def fail(self, message):
+        self.summary.setText(f"Ошибка при поиске видов: {message}")
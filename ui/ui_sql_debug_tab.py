@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView
+)
+
+from db.instrumentation import sql_recorder
+
+
+# Вкладка отладки: запросы к БД по последним действиям пользователя
+class SqlDebugTab(QWidget):
+    COLUMNS = ["Время", "Действие", "Запросов", "Всего, мс", "Строк", "Самый медленный, мс", "Самый медленный запрос"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        layout = QVBoxLayout(self)
+
+        top_layout = QHBoxLayout()
+        self.summary = QLabel()
+        top_layout.addWidget(self.summary, 1)
+
+        clear_btn = QPushButton("Очистить")
+        clear_btn.clicked.connect(self.clear)
+        top_layout.addWidget(clear_btn)
+        layout.addLayout(top_layout)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+
+        self.refresh()
+
+    def refresh(self):
+        actions = list(reversed(sql_recorder.recent()))
+        self.table.setRowCount(len(actions))
+
+        for row, stats in enumerate(actions):
+            values = [
+                datetime.fromtimestamp(stats.started).strftime("%H:%M:%S"),
+                stats.action,
+                str(stats.statements),
+                f"{stats.duration * 1000:.1f}",
+                str(stats.rows),
+                f"{stats.slowest_duration * 1000:.1f}",
+                stats.slowest_statement,
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+
+        other = sql_recorder.unattributed
+        self.summary.setText(
+            f"Действий: {len(actions)}. Вне действий: запросов {other.statements}, "
+            f"{other.duration * 1000:.1f} мс"
+        )
+
+    def clear(self):
+        sql_recorder.clear()
+        self.refresh()